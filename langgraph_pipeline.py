@@ -41,6 +41,18 @@ logging.basicConfig(
 # ── settings ──────────────────────────────────────────────────────────────────
 USE_OVERLAY = False  # Set to True to enable the stylistic news frame
 USE_MONGO = True     # Set to True to fetch from MongoDB Atlas by default
+CAPTION_BACKEND = "png"  # "png" (PIL caption frames) or "ass" (libass burn-in)
+RENDER_PROFILE = "final"  # "final" (1080x1920@30) or "preview" (540x960@15, fast drafts)
+SEGMENT_RENDER = "graph"  # combined reel: "graph" (one graph) or "parallel" (per-article sub-reels, stitched)
+SMART_RENDER = False  # per-article reels: re-encode only the GOPs an edit touched (fixed 2s closed GOPs)
+# Extra renditions encoded in the same pass as each reel, {file suffix: OutputSpec fields};
+# Reels, Shorts and TikTok all take the 9:16 master. e.g.
+# {"square": {"width": 1080, "height": 1080}, "proxy": {"width": 540, "height": 960, "bitrate": "1M"}}
+REEL_VARIANTS = {}
+REEL_POSTER = False  # also write a poster JPEG next to each reel, from the same pass
+# Keep caption/title frames in memory and pipe them to FFmpeg instead of writing
+# temp PNGs (for slow or network-mounted work directories)
+IN_MEMORY_FRAMES = False
 logger = logging.getLogger("LangGraphPipeline")
 
 
@@ -56,6 +68,7 @@ class ReelResult(TypedDict):
     reel_path: Optional[str]
     status: str  # "success" | "failed"
     error: Optional[str]
+    render_fps: Optional[float]  # achieved encode throughput of the final render
 
 
 class PipelineState(TypedDict):
@@ -487,7 +500,7 @@ def assemble_reel(state: PipelineState) -> dict:
     outro = "assets/mbn_reels_outro1.mp4"
 
     # Generate captions
-    from reel_generator.caption_generator import render_captions_to_images
+    from reel_generator.caption_generator import caption_sources, render_captions_to_images
     from reel_generator.utils import ensure_dir
     temp_dir = "reel_generator/temp"
     ensure_dir(temp_dir)
@@ -497,8 +510,14 @@ def assemble_reel(state: PipelineState) -> dict:
         with open(script_path, "r") as f:
             script_text = f.read()
 
-    caption_data = render_captions_to_images(script_text, temp_dir, typewriter=True, use_overlay=USE_OVERLAY)
-    caption_images = [c["image_path"] for c in caption_data]
+    caption_backend = _caption_backend()
+    caption_images = []
+    if caption_backend == "png":
+        caption_data = render_captions_to_images(
+            script_text, temp_dir, typewriter=True, use_overlay=USE_OVERLAY, profile=RENDER_PROFILE,
+            in_memory=IN_MEMORY_FRAMES,
+        )
+        caption_images = caption_sources(caption_data)
 
     # Build config
     config = {
@@ -509,19 +528,32 @@ def assemble_reel(state: PipelineState) -> dict:
         "caption_images": caption_images,
         "title": current_result.get("title", ""),
         "script": script_text,
-        "use_overlay": USE_OVERLAY
+        "use_overlay": USE_OVERLAY,
+        "caption_backend": caption_backend,
+        "typewriter": True,
+        "render_profile": RENDER_PROFILE,
+        # A TTS retry or voice change only remuxes, unless the timing moved
+        "audio_swap": True,
+        "smart_render": SMART_RENDER,
+        "in_memory_frames": IN_MEMORY_FRAMES,
+        **_renditions(output_path),
     }
 
     try:
         from reel_generator.video_builder import VideoBuilder
         builder = VideoBuilder()
         voice_duration = current_result.get("voice_duration", 0)
-        builder.build_video(config, voice_duration, output_path, temp_dir)
+        if not builder.build_video(config, voice_duration, output_path, temp_dir):
+            raise RuntimeError("FFmpeg render failed (see the log above)")
 
         logger.info(f"✅ Reel complete: {output_path}")
 
         updated = list(state["results"])
-        updated[-1] = {**current_result, "reel_path": output_path, "status": "success"}
+        stats = builder.last_stats
+        updated[-1] = {
+            **current_result, "reel_path": output_path, "status": "success",
+            "render_fps": round(stats.fps, 1) if stats else None,
+        }
         return {"results": updated}
 
     except Exception as e:
@@ -540,6 +572,25 @@ def advance_or_finish(state: PipelineState) -> dict:
 # HELPERS
 # ═══════════════════════════════════════════════════════════════════════════════
 
+def _renditions(output_path: str) -> dict:
+    """VideoBuilder config for REEL_VARIANTS and REEL_POSTER of one reel."""
+    stem = os.path.splitext(output_path)[0]
+    return {
+        "outputs": [{**spec, "path": f"{stem}_{name}.mp4"} for name, spec in REEL_VARIANTS.items()],
+        "poster": f"{stem}.jpg" if REEL_POSTER else None,
+    }
+
+
+def _caption_backend() -> str:
+    """CAPTION_BACKEND, or "png" when FFmpeg has no libass to burn in "ass" captions."""
+    from reel_generator.ass_captions import has_libass
+
+    if CAPTION_BACKEND == "ass" and not has_libass():
+        logger.warning("FFmpeg has no 'subtitles' filter (libass); rendering PNG captions instead")
+        return "png"
+    return CAPTION_BACKEND
+
+
 def _add_result(state: PipelineState, folder: str, **kwargs) -> dict:
     """Append a result entry for a folder."""
     entry: dict[str, Any] = {
@@ -601,7 +652,8 @@ def print_summary(state: PipelineState) -> dict:
     print(f"{'='*60}")
 
     for r in successes:
-        print(f"   ✅ {r['folder']} → {r['reel_path']}")
+        fps = f" ({r['render_fps']} fps)" if r.get("render_fps") else ""
+        print(f"   ✅ {r['folder']} → {r['reel_path']}{fps}")
     for r in failures:
         print(f"   ❌ {r['folder']} — {r.get('error', 'Unknown error')}")
 
@@ -723,9 +775,9 @@ def run_pipeline(drive_url: str = None, folder_name: str = None, count: int = No
 def run_combined_pipeline(drive_url: str, local: bool = False, mock: bool = False):
     """Generate a single combined reel from the top 3 articles (~50s content)."""
     from reel_generator import ReelGenerator
-    from reel_generator.caption_generator import render_captions_to_images
+    from reel_generator.caption_generator import caption_sources, render_captions_to_images
     from reel_generator.video_builder import VideoBuilder
-    from reel_generator.utils import get_audio_duration, ensure_dir, generate_mock_audio
+    from reel_generator.utils import get_audio_duration, ensure_dir, generate_mock_audio, streams_match
 
     logger.info(" Starting COMBINED Reel Pipeline (3 articles → 1 reel)")
 
@@ -878,9 +930,16 @@ OUTPUT: Return 100% spoken text only."""
         for ad in article_data:
             f.write(f"file '{os.path.abspath(ad['audio_path'])}'\n")
 
+    # Stream copy only when every voiceover shares codec/rate/layout (mock
+    # silent audio is mono 44.1k, ElevenLabs output may not be)
+    if streams_match([ad["audio_path"] for ad in article_data], "a"):
+        audio_codec = ["-c", "copy"]
+    else:
+        logger.info("Voiceover formats differ — re-encoding combined audio")
+        audio_codec = ["-c:a", "libmp3lame", "-b:a", "192k", "-ar", "44100"]
     subprocess.run([
         "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-        "-i", audio_list_path, "-c", "copy", concat_audio_path
+        "-i", audio_list_path, *audio_codec, concat_audio_path
     ], check=True, capture_output=True)
 
     total_voice_duration = sum(ad["voice_duration"] for ad in article_data)
@@ -910,8 +969,24 @@ OUTPUT: Return 100% spoken text only."""
     # Generate captions for the combined script
     temp_dir = "reel_generator/temp"
     ensure_dir(temp_dir)
-    caption_data = render_captions_to_images(combined_script, temp_dir, typewriter=False, use_overlay=USE_OVERLAY)
-    caption_images = [c["image_path"] for c in caption_data]
+    caption_backend = _caption_backend()
+    caption_images = []
+    if caption_backend == "png" and SEGMENT_RENDER == "parallel":
+        # Each segment renders its own captions, timed to its own voiceover
+        for k, seg in enumerate(segments):
+            seg_caption_dir = os.path.join(temp_dir, f"captions_seg_{k}")
+            ensure_dir(seg_caption_dir)
+            caption_data = render_captions_to_images(
+                seg["script"], seg_caption_dir, typewriter=False,
+                use_overlay=USE_OVERLAY, profile=RENDER_PROFILE, in_memory=IN_MEMORY_FRAMES,
+            )
+            seg["caption_images"] = caption_sources(caption_data)
+    elif caption_backend == "png":
+        caption_data = render_captions_to_images(
+            combined_script, temp_dir, typewriter=False, use_overlay=USE_OVERLAY, profile=RENDER_PROFILE,
+            in_memory=IN_MEMORY_FRAMES,
+        )
+        caption_images = caption_sources(caption_data)
 
     # Build the combined reel config
     config = {
@@ -923,11 +998,18 @@ OUTPUT: Return 100% spoken text only."""
         "title": "",  # Will use per-segment titles
         "script": combined_script,
         "segments": segments,  # NEW: per-article segment info
-        "use_overlay": USE_OVERLAY
+        "segment_render": SEGMENT_RENDER,
+        "use_overlay": USE_OVERLAY,
+        "caption_backend": caption_backend,
+        "typewriter": False,
+        "render_profile": RENDER_PROFILE,
+        "audio_swap": True,
+        "in_memory_frames": IN_MEMORY_FRAMES,
     }
 
     output_path = "outputs/final_reels/combined_reel.mp4"
     ensure_dir(os.path.dirname(output_path))
+    config.update(_renditions(output_path))
 
     builder = VideoBuilder()
     if builder.build_video(config, total_voice_duration, output_path, temp_dir):
@@ -935,6 +1017,7 @@ OUTPUT: Return 100% spoken text only."""
         print(f"\n✨ SUCCESS! Combined reel ready at: {output_path}")
         print(f"   📰 Articles: {', '.join(ad['folder'] for ad in article_data)}")
         print(f"   ⏱️  Duration: ~{3 + total_voice_duration + 3:.0f}s")
+        print(f"   🚀 Rendered at {builder.last_stats.fps:.1f} fps ({builder.last_stats.speed:.2f}x realtime)")
     else:
         logger.error("❌ Combined reel failed")
 
@@ -963,8 +1046,11 @@ if __name__ == "__main__":
     parser.add_argument("--mock", action="store_true", help="Generate silent mock voiceovers (save credits)")
     parser.add_argument("--mongo", action="store_true", help="Use MongoDB Atlas for article content and media metadata")
     parser.add_argument("--combined", action="store_true", help="Generate one combined reel from top 3 articles")
+    parser.add_argument("--preview", action="store_true", help="Fast 540x960@15fps draft render instead of the final 1080x1920")
     
     args = parser.parse_args()
+    if args.preview:
+        RENDER_PROFILE = "preview"
 
     # Resolve Drive URL: CLI flag → .env → allow empty if --local
     drive_url = args.url or os.getenv("GOOGLE_DRIVE_LINK", "")
@@ -0,0 +1,179 @@
+"""ASS subtitle backend for burned-in captions.
+
+Instead of rasterizing every caption (and every typewriter step) to a PNG
+and overlaying each one, the captions are written to a single Advanced
+SubStation Alpha file and burned in by libass through one `subtitles`
+filter. The typewriter reveal is one event per word step showing the
+visible prefix, wrapped and centred like the PNG frames. Karaoke (\\k) tags
+are not used because libass still draws the shadow of unrevealed words.
+"""
+import logging
+import os
+import subprocess
+import textwrap
+from functools import lru_cache
+
+from .fonts import find_font, get_font
+
+logger = logging.getLogger(__name__)
+
+# Caption looks, in output pixels. "reel" matches the PNG captions rendered by
+# caption_generator (white text, hard black shadow, top of the block at
+# y_ratio); "boxed" matches FacelessVideoService's drawtext captions (white
+# text on a translucent black box, centred on y_ratio).
+STYLES = {
+    "reel": {
+        "font_size": 40, "wrap_width": 35, "anchor": 8,
+        "shadow": 2, "outline": 0, "border_style": 1,
+        "outline_colour": "&H00000000", "back_colour": "&H00000000",
+    },
+    "boxed": {
+        "font_size": 46, "wrap_width": 40, "anchor": 5,
+        "shadow": 0, "outline": 20, "border_style": 3,
+        "outline_colour": "&H80000000", "back_colour": "&H80000000",
+    },
+}
+
+
+def _ass_time(seconds):
+    """Format seconds as an ASS timestamp (H:MM:SS.cc)."""
+    cs = max(0, int(round(seconds * 100)))
+    h, rem = divmod(cs, 360000)
+    m, rem = divmod(rem, 6000)
+    s, cs = divmod(rem, 100)
+    return f"{h}:{m:02}:{s:02}.{cs:02}"
+
+
+def _escape_text(text):
+    return text.replace("\\", "\\\\").replace("{", "(").replace("}", ")")
+
+
+def _typewriter_steps(text, start, end, wrap_width):
+    """Split one caption into per-word (visible_text, t0, t1) reveal steps.
+
+    Word durations are weighted by word length (min 2 chars), the same
+    weighting VideoBuilder uses to time the typewriter PNG frames, and the
+    visible prefix is wrapped the same way the PNG renderer wraps it.
+    """
+    words = text.split()
+    weights = [max(len(w), 2) for w in words]
+    total = sum(weights) or 1
+
+    steps, done = [], 0
+    for i, weight in enumerate(weights):
+        t0 = start + done / total * (end - start)
+        done += weight
+        t1 = start + done / total * (end - start)
+        visible = " ".join(words[:i + 1])
+        lines = textwrap.wrap(visible, width=wrap_width)
+        steps.append(("\\N".join(_escape_text(l) for l in lines), t0, t1))
+    return steps
+
+
+def write_ass(
+    captions,
+    output_path,
+    typewriter=True,
+    y_ratio=0.8,
+    style="reel",
+    font_path=None,
+    width=1080,
+    height=1920,
+):
+    """Write (text, start, end) captions to an ASS file.
+
+    Args:
+        captions: List of (text, start_sec, end_sec) tuples
+        output_path: Where to write the .ass file
+        typewriter: Reveal each caption word by word
+        y_ratio: Vertical caption position as a fraction of the frame height
+        style: Key into STYLES
+        font_path: Preferred font file (falls back to fonts.FONT_PATHS)
+        width, height: Output frame size (PlayResX/PlayResY)
+
+    Returns:
+        (ass_path, fonts_dir) — fonts_dir is passed to the subtitles filter so
+        libass finds the same font the PNG renderer uses.
+    """
+    look = STYLES[style]
+    font_path = find_font(font_path)
+
+    font_name, bold, fonts_dir = "Arial", -1, None
+    ass_size = look["font_size"]
+    if font_path:
+        font = get_font(look["font_size"], font_path)
+        family, weight = font.getname()
+        font_name = family
+        bold = -1 if "bold" in (weight or "").lower() else 0
+        # PIL sizes fonts by em; libass by ascent + descent. Measure the ratio
+        # at a large size so pixel rounding doesn't skew it.
+        ascent, descent = get_font(1000, font_path).getmetrics()
+        ass_size = round(look["font_size"] * (ascent + descent) / 1000, 1)
+        fonts_dir = os.path.dirname(font_path)
+
+    header = (
+        "[Script Info]\n"
+        "ScriptType: v4.00+\n"
+        f"PlayResX: {width}\n"
+        f"PlayResY: {height}\n"
+        "WrapStyle: 2\n"
+        "ScaledBorderAndShadow: yes\n"
+        "\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        f"Style: Caption,{font_name},{ass_size},&H00FFFFFF,&H00FFFFFF,"
+        f"{look['outline_colour']},{look['back_colour']},{bold},0,0,0,100,100,0,0,"
+        f"{look['border_style']},{look['outline']},{look['shadow']},{look['anchor']},0,0,0,1\n"
+        "\n"
+        "[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+
+    x, y = width // 2, int(height * y_ratio)
+    events = []
+    for text, start, end in captions:
+        if end <= start or not text.strip():
+            continue
+        if typewriter:
+            steps = _typewriter_steps(text, start, end, look["wrap_width"])
+        else:
+            lines = textwrap.wrap(text, width=look["wrap_width"])
+            steps = [("\\N".join(_escape_text(l) for l in lines), start, end)]
+        for body, t0, t1 in steps:
+            events.append(
+                f"Dialogue: 0,{_ass_time(t0)},{_ass_time(t1)},Caption,,0,0,0,,"
+                f"{{\\pos({x},{y})}}{body}\n"
+            )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(header)
+        f.writelines(events)
+
+    logger.info(f"ASS captions written: {output_path} ({len(events)} events)")
+    return output_path, fonts_dir
+
+
+@lru_cache(maxsize=None)
+def has_libass():
+    """Whether the ffmpeg on PATH has the libass `subtitles` filter (probed once)."""
+    try:
+        r = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return any(line.split()[1:2] == ["subtitles"] for line in r.stdout.splitlines())
+
+
+def subtitles_filter(ass_path, fonts_dir=None):
+    """Build the `subtitles` filter expression that burns in `ass_path`."""
+    def esc(path):
+        # Filter-graph escaping: backslash, colon and quote are special.
+        return os.path.abspath(path).replace("\\", "/").replace(":", "\\:").replace("'", "\\'")
+
+    expr = f"subtitles=filename='{esc(ass_path)}'"
+    if fonts_dir:
+        expr += f":fontsdir='{esc(fonts_dir)}'"
+    return expr
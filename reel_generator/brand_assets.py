@@ -0,0 +1,74 @@
+"""Pre-conformed brand assets (intro, outro, news overlay).
+
+The brand clips and overlay are the same on every render, but VideoBuilder
+used to decode them at source resolution and scale/crop/fps-convert them
+inside each filter graph. They are now conformed once per asset version
+(content hash) and render profile to exactly what the graph consumes:
+the profile's frame size and fps, yuv420p, square pixels, trimmed to the
+card length. Renders feed the conformed files straight into the graph.
+"""
+import hashlib
+import os
+
+from .clip_cache import KENBURNS_CODEC, ClipCache, _run_clip_ffmpeg, file_digest
+
+BRAND_CACHE_DIR = os.getenv("BRAND_CACHE_DIR", os.path.join("outputs", "cache", "brand"))
+# Bump when the conform recipe changes so stale assets are re-made.
+BRAND_VERSION = 1
+
+VIDEO_EXTS = ('.mp4', '.mov', '.webm', '.mkv')
+
+_default_cache = None
+
+
+def brand_cache():
+    """Process-wide cache for conformed brand assets (small, so a fixed budget)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ClipCache(BRAND_CACHE_DIR, max_mb=512)
+    return _default_cache
+
+
+def _key(path, recipe):
+    return hashlib.sha256(f"{file_digest(path)}|brand{BRAND_VERSION}|{recipe}".encode()).hexdigest()
+
+
+def conform_card(path, duration=3.0, width=1080, height=1920, fps=30, cache=None):
+    """Intro/outro card (video or still) as a ready-to-xfade clip.
+
+    Cover-scaled and cropped to width x height, resampled to fps, yuv420p
+    with SAR 1, exactly `duration` seconds long and without audio.
+    """
+    cache = cache or brand_cache()
+    is_video = os.path.splitext(path)[1].lower() in VIDEO_EXTS
+    vf = (
+        f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+        f"crop={width}:{height},fps={fps},setsar=1"
+    )
+    recipe = f"card|{duration}|{width}x{height}@{fps}|{vf}|{' '.join(KENBURNS_CODEC)}"
+
+    def render(out):
+        src = ["-i", path] if is_video else ["-loop", "1", "-i", path]
+        cmd = [
+            "ffmpeg", "-y", "-t", str(duration), *src,
+            "-vf", vf,
+            "-frames:v", str(int(round(duration * fps))),
+            "-an",
+            *KENBURNS_CODEC,
+            out,
+        ]
+        _run_clip_ffmpeg(cmd, f"Conforming brand asset {path}")
+
+    return cache.get(_key(path, recipe), render)
+
+
+def conform_overlay(path, width=1080, height=1920, cache=None):
+    """Full-frame overlay PNG scaled to width x height, alpha preserved."""
+    cache = cache or brand_cache()
+    vf = f"scale={width}:{height},format=rgba"
+
+    def render(out):
+        cmd = ["ffmpeg", "-y", "-i", path, "-vf", vf, "-frames:v", "1", out]
+        _run_clip_ffmpeg(cmd, f"Conforming overlay {path}")
+
+    return cache.get(_key(path, f"overlay|{vf}"), render, ext=".png")
@@ -28,10 +28,178 @@ def split_into_chunks(text):
         
     return processed_chunks
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-def render_captions_to_images(script, temp_dir, typewriter=True, use_overlay=True):
+from .fonts import get_font, text_bbox
+from .render_budget import available_cpus
+from .render_profile import get_profile
+from .sprites import make_sprite, save_sprite
+
+MAX_CHARS_FROM_WIDTH = 35
+# Caption render processes; 0 = one per available CPU
+CAPTION_WORKERS = int(os.getenv("CAPTION_WORKERS", "0"))
+# Below this many frames, starting a pool costs more than it saves
+MIN_PARALLEL_FRAMES = 24
+
+
+def _line_strip(line, size, shadow):
+    """Rasterize one caption line (shadow, then text) onto its own strip.
+
+    Returns (strip, margin); the text origin sits at (margin, margin).
+    """
+    font = get_font(size)
+    bbox = text_bbox(line, size)
+    margin = shadow + 2
+    strip = Image.new('RGBA', (bbox[2] + 2 * margin, bbox[3] + 2 * margin), (0, 0, 0, 0))
+    strip_draw = ImageDraw.Draw(strip)
+    strip_draw.text((margin + shadow, margin + shadow), line, font=font, fill="black")
+    strip_draw.text((margin, margin), line, font=font, fill="white")
+    return strip, margin
+
+
+def _line_metrics(text, size):
+    """(right edge, width, height) of `text` as textbbox measures it."""
+    bbox = text_bbox(text, size)
+    return bbox[2], bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+
+def _layout_sentence(words, size, shadow):
+    """Wrap a sentence once and rasterize each of its lines once.
+
+    Returns [(strip, margin, prefixes)] per line, where prefixes[k] holds
+    the metrics of the line's first k+1 words. textwrap is greedy, so any
+    word prefix of the sentence wraps onto the same lines. None when a
+    line break falls inside a word (over-long or hyphenated words).
+    """
+    lines = textwrap.wrap(" ".join(words), width=MAX_CHARS_FROM_WIDTH)
+    if [w for line in lines for w in line.split()] != words:
+        return None
+    layout = []
+    for line in lines:
+        line_words = line.split()
+        strip, margin = _line_strip(line, size, shadow)
+        prefixes = [
+            _line_metrics(" ".join(line_words[:k + 1]), size)
+            for k in range(len(line_words))
+        ]
+        layout.append((strip, margin, prefixes))
+    return layout
+
+
+def _visible_lines(layout, word_step):
+    """Lines of `layout` showing words 0..word_step: [(strip, margin, metrics)]."""
+    visible = []
+    for strip, margin, prefixes in layout:
+        if word_step < len(prefixes):
+            visible.append((strip, margin, prefixes[word_step]))
+            break
+        visible.append((strip, margin, prefixes[-1]))
+        word_step -= len(prefixes)
+    return visible
+
+
+def _compose_caption(visible, profile, use_overlay, shadow):
+    """Caption image from pre-rasterized lines, sized to the text block.
+
+    Each line is centred on the width of its visible words; a partial line
+    is its strip cut off after the last visible word. Returns (image, (x, y))
+    with the image's top-left corner in the frame.
+    """
+    spacing = profile.px(10)
+
+    # Position: Shift up if overlay is used, otherwise use default
+    ratio = 0.75 if use_overlay else 0.8
+    current_y = int(profile.height * ratio)
+
+    placed = []
+    for strip, margin, (right, w, h) in visible:
+        x = (profile.width - w) // 2
+        # Keep the shadow of the last visible word, not the next word
+        strip = strip.crop((0, 0, min(strip.width, margin + right + shadow + 1), strip.height))
+        placed.append((strip, x - margin, current_y - margin))
+        current_y += h + spacing
+
+    # The block's box in the frame, clipped to the frame
+    x0 = max(0, min(left for _, left, _ in placed))
+    y0 = max(0, min(top for _, _, top in placed))
+    x1 = min(profile.width, max(left + strip.width for strip, left, _ in placed))
+    y1 = min(profile.height, max(top + strip.height for strip, _, top in placed))
+    img = Image.new('RGBA', (max(1, x1 - x0), max(1, y1 - y0)), (0, 0, 0, 0))
+    for strip, left, top in placed:
+        # alpha_composite needs a non-negative destination
+        strip = strip.crop((max(0, x0 - left), max(0, y0 - top), strip.width, strip.height))
+        img.alpha_composite(strip, (max(0, left - x0), max(0, top - y0)))
+    return img, (x0, y0)
+
+
+def _render_sentence(job):
+    """Render one sentence's caption frames; returns its caption_data entries.
+
+    Runs in a pool worker, so it takes and returns plain picklable values.
+    """
+    chunk_idx, chunk, first_frame, temp_dir, typewriter, use_overlay, profile, in_memory = job
+    # Fonts and measurements come from the process-wide registry (fonts.py)
+    size = profile.px(40)
+    shadow = profile.px(2)
+
+    words = chunk.split()
+    num_words = len(words)
+    layout = _layout_sentence(words, size, shadow)
+
+    # In static mode, only render the full sentence
+    word_steps = range(num_words) if typewriter else [num_words - 1]
+
+    entries = []
+    for frame_counter, word_step in enumerate(word_steps, first_frame):
+        # Show words 0..word_step
+        visible_text = " ".join(words[:word_step + 1])
+
+        if layout is not None:
+            visible = _visible_lines(layout, word_step)
+        else:
+            # A break inside a word can move as words are added: wrap this step alone
+            visible = []
+            for line in textwrap.wrap(visible_text, width=MAX_CHARS_FROM_WIDTH):
+                strip, margin = _line_strip(line, size, shadow)
+                visible.append((strip, margin, _line_metrics(line, size)))
+        img, offset = _compose_caption(visible, profile, use_overlay, shadow)
+
+        # A sprite of the text block; its frame position travels in the PNG
+        frame_size = (profile.width, profile.height)
+        if in_memory:
+            sprite, png_path = make_sprite(img, frame_size, offset), None
+            x, y = sprite.x, sprite.y
+        else:
+            png_path = os.path.join(temp_dir, f"caption_{frame_counter}.png")
+            x, y = save_sprite(img, png_path, frame_size, offset)
+        entry = {
+            "text": visible_text,
+            "image_path": png_path,
+            "x": x,
+            "y": y,
+            "chunk_idx": chunk_idx,
+            "word_idx": word_step,
+            "total_words": num_words,
+        }
+        if in_memory:
+            entry["image"] = sprite
+        entries.append(entry)
+    return entries
+
+
+def _caption_workers(jobs, frames):
+    """Pool size for `jobs` sentences making `frames` frames; 1 renders inline."""
+    if frames < MIN_PARALLEL_FRAMES:
+        return 1
+    return max(1, min(len(jobs), CAPTION_WORKERS or available_cpus()))
+
+
+def render_captions_to_images(script, temp_dir, typewriter=True, use_overlay=True, profile=None,
+                              in_memory=False):
     """Render caption PNGs.
     
     Args:
@@ -39,96 +207,38 @@ def render_captions_to_images(script, temp_dir, typewriter=True, use_overlay=Tru
         temp_dir: Directory to save PNGs
         typewriter: If True, renders word-by-word progressive PNGs.
         use_overlay: If True, shifts text up to fit the news frame.
+        profile: RenderProfile or profile name; frame size and text scale
+            follow it (defaults to "final", 1080x1920).
+        in_memory: If True, nothing is written: each entry's "image" holds
+            a sprites.Sprite and "image_path" is None.
+
+    Each sentence is wrapped and rasterized once; the progressive frames
+    reveal its words from that layout instead of redrawing the text. The
+    PNGs are sprites cropped to the text, with their frame position in the
+    PNG and as x/y in the returned entries (see reel_generator.sprites).
+    Sentences are rendered across a process pool (CAPTION_WORKERS); frame
+    numbering and entry order are the same as a sequential render.
     """
-    chunks = split_into_chunks(script)
-    caption_data = []
-    
-    # Try to find a font
-    font_paths = [
-        "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
-        "/System/Library/Fonts/Helvetica.ttc",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-    ]
-    font = None
-    for path in font_paths:
-        if os.path.exists(path):
-            try:
-                font = ImageFont.truetype(path, 40)
-                break
-            except:
-                continue
-    
-    if font is None:
-        font = ImageFont.load_default()
+    profile = get_profile(profile)
+    jobs = []
+    frame_counter = 0
+    for chunk_idx, chunk in enumerate(split_into_chunks(script)):
+        jobs.append((chunk_idx, chunk, frame_counter, temp_dir, typewriter, use_overlay, profile,
+                     in_memory))
+        frame_counter += len(chunk.split()) if typewriter else 1
 
-    import textwrap
-    MAX_CHARS_FROM_WIDTH = 35 
+    workers = _caption_workers(jobs, frame_counter)
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return [entry for entries in pool.map(_render_sentence, jobs) for entry in entries]
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"Caption pool failed ({e}); rendering captions in-process")
+    return [entry for job in jobs for entry in _render_sentence(job)]
 
-    frame_counter = 0
-    for chunk_idx, chunk in enumerate(chunks):
-        words = chunk.split()
-        num_words = len(words)
-        
-        # In static mode, only render the full sentence
-        word_steps = range(num_words) if typewriter else [num_words - 1]
-        
-        for word_step in word_steps:
-            # Show words 0..word_step
-            visible_text = " ".join(words[:word_step + 1])
-            
-            # Create a transparent image for the caption
-            img = Image.new('RGBA', (1080, 1920), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
-            
-            # Wrap text
-            lines = textwrap.wrap(visible_text, width=MAX_CHARS_FROM_WIDTH)
-            
-            # Calculate total text height
-            line_heights = []
-            line_widths = []
-            total_text_height = 0
-            spacing = 10
-            
-            for line in lines:
-                bbox = draw.textbbox((0, 0), line, font=font)
-                w = bbox[2] - bbox[0]
-                h = bbox[3] - bbox[1]
-                line_widths.append(w)
-                line_heights.append(h)
-                total_text_height += h
-                
-            total_text_height += (len(lines) - 1) * spacing
-            
-            # Position: Shift up if overlay is used, otherwise use default
-            ratio = 0.75 if use_overlay else 0.8
-            start_y = int(1920 * ratio) 
-            
-            current_y = start_y
-            
-            for j, line in enumerate(lines):
-                w = line_widths[j]
-                h = line_heights[j]
-                x = (1080 - w) // 2
-                
-                # Draw shadow
-                draw.text((x+2, current_y+2), line, font=font, fill="black")
-                # Draw text
-                draw.text((x, current_y), line, font=font, fill="white")
-                
-                current_y += h + spacing
-            
-            png_path = os.path.join(temp_dir, f"caption_{frame_counter}.png")
-            img.save(png_path)
-            caption_data.append({
-                "text": visible_text,
-                "image_path": png_path,
-                "chunk_idx": chunk_idx,
-                "word_idx": word_step,
-                "total_words": num_words,
-            })
-            frame_counter += 1
-        
-    return caption_data
+def caption_sources(caption_data):
+    """VideoBuilder caption_images for caption_data: PNG paths, or in-memory Sprites."""
+    return [c["image_path"] or c["image"] for c in caption_data]
 
 def generate_srt(script, voice_duration, output_path, start_offset=3.0):
     # We'll keep SRT generation for reference, but we primarily need the timing data
@@ -0,0 +1,195 @@
+"""Content-addressed on-disk cache of rendered clips.
+
+Ken Burns motion clips are the most expensive part of a render (zoompan
+runs per output frame) and the same article images are rendered again on
+re-runs after TTS failures and again for the combined digest. Clips are
+keyed on the image bytes plus everything that changes the rendered frames
+(frame count, zoom direction, size, fps, encoder args), so a hit is safe to
+reuse from either VideoBuilder or FacelessVideoService. Entries are evicted
+least-recently-used once the directory exceeds its size budget.
+"""
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+
+from .motion import scale_motion
+from .render_budget import BUDGET
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CLIP_CACHE_DIR", os.path.join("outputs", "cache", "clips"))
+# Size budget in MB; 0 disables the cache (clips are rendered inline)
+CACHE_MAX_MB = int(os.getenv("CLIP_CACHE_MAX_MB", "2048"))
+
+# Bump when the motion recipe changes so stale clips are never reused.
+KENBURNS_VERSION = 1
+# Cached clips are decoded again by every render that reuses them, so they
+# are kept visually lossless rather than mathematically lossless (~10x
+# smaller than -qp 0 for photo zooms).
+KENBURNS_CODEC = [
+    "-c:v", "libx264", "-preset", "veryfast", "-crf", "14", "-pix_fmt", "yuv420p",
+]
+
+_digest_lock = threading.Lock()
+_digests = {}
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, memoised on (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digests:
+            return _digests[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digests[memo_key] = digest
+    return digest
+
+
+def _run_clip_ffmpeg(cmd, what):
+    """Run a short cache-fill FFmpeg command in a render slot; raises RuntimeError with its stderr.
+
+    Unlike ffmpeg_progress.run_ffmpeg this reports no progress and keeps no log.
+    """
+    with BUDGET.slot() as slot:
+        proc = subprocess.Popen(BUDGET.apply(cmd, slot), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        BUDGET.pin_process(proc.pid, slot)
+        _, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"{what} failed: {stderr.decode() or 'Unknown'}")
+
+
+def kenburns_filter(frames, zoom_in, width=1080, height=1920, fps=30, engine="zoompan"):
+    """Scale/crop/motion chain for one still image.
+
+    The image is cover-scaled onto a canvas with a margin (200px at 1080
+    wide) around the output and zoomed 1.0 → 1.15 (zoom_in) or 1.15 → 1.0,
+    producing `frames` frames. The per-frame step is defined at 30fps, so
+    lower frame rates cover the same motion per second. engine is
+    "zoompan" or "scale" (see reel_generator.motion); both follow the
+    same zoom curve.
+    """
+    margin = round(200 * width / 1080)
+    sw = width + margin
+    step = f"{0.0008 * 30 / fps:g}"
+    head = (
+        f"scale={sw}:{int(sw * 16 / 9)}:force_original_aspect_ratio=increase,"
+        f"crop={sw}:{height + margin},"
+    )
+    if engine == "scale":
+        return head + scale_motion(frames, zoom_in, step, width, height, fps)
+    if engine != "zoompan":
+        raise ValueError(f"Unknown motion engine '{engine}'")
+    z = f"min(zoom+{step},1.15)" if zoom_in else f"if(eq(on,1),1.15,max(zoom-{step},1.0))"
+    return (
+        f"{head}"
+        f"zoompan=z='{z}':d={frames}:"
+        f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
+        f"s={width}x{height}:fps={fps}"
+    )
+
+
+def render_kenburns(image, out, frames, zoom_in, width=1080, height=1920, fps=30,
+                    threads=0, engine="zoompan"):
+    """Render a `frames`-long Ken Burns clip of `image` to `out`.
+
+    engine is passed to kenburns_filter. threads=0 leaves the encoder's
+    thread count to the render budget.
+    """
+    cmd = [
+        "ffmpeg", "-y",
+        "-i", image,
+        "-vf", f"{kenburns_filter(frames, zoom_in, width, height, fps, engine)},setsar=1",
+        "-frames:v", str(frames),
+        *KENBURNS_CODEC,
+        *(["-threads", str(threads)] if threads > 0 else []),
+        out,
+    ]
+    _run_clip_ffmpeg(cmd, f"Ken Burns render for {image}")
+
+
+class ClipCache:
+    def __init__(self, root=None, max_mb=None):
+        self.root = root or CACHE_DIR
+        self.max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def path(self, key, ext=".mp4"):
+        return os.path.join(self.root, key[:2], key + ext)
+
+    def get(self, key, render, ext=".mp4"):
+        """Return the cached file for `key`, calling render(tmp_path) on a miss.
+
+        The render writes to a private temp name that is atomically moved into
+        place, so concurrent renders of the same key never expose a partial file.
+        """
+        path = self.path(key, ext)
+        if os.path.isfile(path):
+            os.utime(path)  # mark as recently used
+            logger.debug(f"Clip cache hit: {path}")
+            return path
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path[:-len(ext)]}.tmp{os.getpid()}_{threading.get_ident()}{ext}"
+        try:
+            render(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict(keep=path)
+        return path
+
+    def kenburns(self, image, frames, zoom_in, width=1080, height=1920, fps=30,
+                 threads=0, engine="zoompan"):
+        """Cached Ken Burns clip of `image` (see render_kenburns)."""
+        params = (
+            f"kb{KENBURNS_VERSION}|{engine}|{frames}|{int(zoom_in)}|"
+            f"{width}x{height}@{fps}|{' '.join(KENBURNS_CODEC)}"
+        )
+        key = hashlib.sha256(f"{file_digest(image)}|{params}".encode()).hexdigest()
+        return self.get(key, lambda out: render_kenburns(
+            image, out, frames, zoom_in, width, height, fps, threads, engine
+        ))
+
+    def evict(self, keep=None):
+        """Drop least-recently-used entries until the cache fits max_bytes.
+
+        `keep` (the entry just written) is never evicted, even if it alone
+        exceeds the budget, since the caller is about to read it.
+        """
+        with self._lock:
+            entries = []
+            for dirpath, _, files in os.walk(self.root):
+                for name in files:
+                    p = os.path.join(dirpath, name)
+                    if ".tmp" in name:
+                        continue
+                    try:
+                        st = os.stat(p)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in entries)
+            for _, size, p in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if p == keep:
+                    continue
+                try:
+                    os.remove(p)
+                    total -= size
+                    logger.debug(f"Clip cache evicted: {p}")
+                except FileNotFoundError:
+                    pass
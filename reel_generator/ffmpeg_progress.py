@@ -0,0 +1,241 @@
+"""Live progress for long FFmpeg renders.
+
+Renders run with `-progress pipe:1`, and the key=value blocks FFmpeg
+writes about twice a second are parsed while the render runs. Each update
+(frame, achieved fps, speed, ETA) goes to the log and an optional
+callback. The final RenderStats is returned so callers can keep the
+achieved throughput with the render's result.
+
+FFmpeg's stderr is streamed line by line to a per-render log file under
+FFMPEG_LOG_DIR, which rotates at FFMPEG_LOG_MAX_MB. Only a bounded tail is
+kept in memory for the error message, so memory does not grow with render
+length or with the number of concurrent renders.
+"""
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from .frame_pipe import FramePipes
+from .render_budget import BUDGET, RenderBudget
+
+logger = logging.getLogger(__name__)
+
+# Seconds between INFO progress lines per render; every update is logged at DEBUG
+LOG_INTERVAL = 5.0
+
+FFMPEG_LOG_DIR = os.getenv("FFMPEG_LOG_DIR", os.path.join("outputs", "logs", "ffmpeg"))
+# Per-render log size before it rotates to <name>.1 (one backup kept)
+FFMPEG_LOG_MAX_MB = float(os.getenv("FFMPEG_LOG_MAX_MB", "10"))
+# Newest per-render logs kept in FFMPEG_LOG_DIR; older ones are pruned
+FFMPEG_LOG_KEEP = int(os.getenv("FFMPEG_LOG_KEEP", "200"))
+# stderr kept in memory for error messages
+TAIL_LINES = 50
+TAIL_LINE_CHARS = 1000
+
+
+@dataclass
+class RenderStats:
+    stage: str
+    frames: int = 0
+    out_time: float = 0.0  # seconds of output written
+    elapsed: float = 0.0   # wall-clock seconds
+    speed: float = 0.0     # output seconds per wall-clock second
+    log_path: Optional[str] = None  # FFmpeg's stderr for this render
+
+    @property
+    def fps(self) -> float:
+        """Average frames encoded per wall-clock second."""
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "fps": round(self.fps, 2)}
+
+
+def parse_progress(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Yield one dict per `-progress` block; each block ends with progress=continue|end."""
+    block = {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key == "progress":
+            yield block
+            block = {}
+
+
+def _out_seconds(block: Dict[str, str]) -> float:
+    # out_time_ms is microseconds too (a long-standing FFmpeg misnomer)
+    value = block.get("out_time_us") or block.get("out_time_ms")
+    try:
+        return max(0.0, int(value) / 1e6)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class StderrLog:
+    """Drains an FFmpeg stderr pipe into a rotating file, keeping a short tail.
+
+    log_dir=None keeps only the tail.
+    """
+
+    def __init__(self, stage: str, log_dir: Optional[str] = FFMPEG_LOG_DIR,
+                 max_mb: float = FFMPEG_LOG_MAX_MB, keep: int = FFMPEG_LOG_KEEP):
+        self.tail = deque(maxlen=TAIL_LINES)
+        self.path = None
+        self._max_bytes = int(max_mb * 1024 * 1024)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            _prune(log_dir, keep - 1)
+            name = re.sub(r"[^\w.-]+", "_", stage).strip("_") or "ffmpeg"
+            self.path = os.path.join(
+                log_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_{name}_{uuid.uuid4().hex[:6]}.log"
+            )
+
+    def drain(self, pipe) -> None:
+        f = self._open(self.path) if self.path else None
+        written = 0
+        for line in pipe:
+            self.tail.append(line[:TAIL_LINE_CHARS])
+            if f is None:
+                continue
+            try:
+                f.write(line)
+                written += len(line)
+                if self._max_bytes and written >= self._max_bytes:
+                    f.close()
+                    os.replace(self.path, self.path + ".1")
+                    f, written = self._open(self.path), 0
+            except OSError as e:
+                # Keep draining the pipe; only the file copy is lost
+                logger.warning(f"FFmpeg log {self.path} unavailable: {e}")
+                try:
+                    f.close()
+                except OSError:
+                    pass
+                f = None
+        if f is not None:
+            f.close()
+
+    @staticmethod
+    def _open(path):
+        try:
+            return open(path, "w")
+        except OSError as e:
+            logger.warning(f"FFmpeg log {path} unavailable: {e}")
+            return None
+
+    def text(self) -> str:
+        return "".join(self.tail)
+
+
+def _prune(log_dir: str, keep: int) -> None:
+    """Delete all but the newest `keep` render logs (with their rotations)."""
+    try:
+        logs = [e for e in os.scandir(log_dir) if e.is_file() and e.name.endswith(".log")]
+    except OSError:
+        return
+    logs.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in logs[max(keep, 0):]:
+        for path in (entry.path, entry.path + ".1"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def run_ffmpeg(
+    cmd: list,
+    stage: str,
+    duration: Optional[float] = None,
+    on_progress: Optional[Callable[[Dict], None]] = None,
+    log_dir: Optional[str] = FFMPEG_LOG_DIR,
+    budget: Optional[RenderBudget] = None,
+) -> RenderStats:
+    """Run an FFmpeg command, reporting progress; raises RuntimeError with stderr on failure.
+
+    `duration` is the expected output length in seconds, used for percent
+    and ETA. `on_progress` receives a dict per update: stage, frame, fps,
+    speed, out_time, percent and eta (the last two None without duration).
+    stderr goes to a per-render file in `log_dir` (None: not written).
+    The render waits for a slot in `budget` (default: the process-wide
+    BUDGET), which also sets its thread counts. In-memory inputs in `cmd`
+    (frame_pipe.RawFrames) are fed to FFmpeg over pipes.
+    """
+    budget = budget or BUDGET
+    with budget.slot() as slot:
+        cmd = budget.apply(cmd, slot)
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        logger.debug(f"FFmpeg [{stage}] slot: {slot.threads} threads, CPUs {slot.cpu_ids or 'any'}")
+        return _run(cmd, stage, duration, on_progress, log_dir, budget, slot)
+
+
+def _run(cmd, stage, duration, on_progress, log_dir, budget, slot) -> RenderStats:
+    stderr = StderrLog(stage, log_dir)
+    stats = RenderStats(stage, log_path=stderr.path)
+    start = last_log = time.monotonic()
+    pipes = FramePipes(cmd)
+    try:
+        proc = subprocess.Popen(
+            pipes.cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            text=True, errors="replace", pass_fds=pipes.pass_fds,
+        )
+    except BaseException:
+        pipes.close()
+        raise
+    pipes.start()
+    budget.pin_process(proc.pid, slot)
+    # Drain stderr alongside stdout so a chatty FFmpeg cannot block on a full pipe
+    reader = threading.Thread(target=stderr.drain, args=(proc.stderr,), daemon=True)
+    reader.start()
+    try:
+        for block in parse_progress(proc.stdout):
+            now = time.monotonic()
+            stats.elapsed = now - start
+            stats.frames = int(block.get("frame") or stats.frames)
+            stats.out_time = _out_seconds(block)
+            stats.speed = stats.out_time / stats.elapsed if stats.elapsed > 0 else 0.0
+
+            percent = eta = None
+            if duration:
+                percent = min(100.0, 100.0 * stats.out_time / duration)
+                if stats.speed > 0:
+                    eta = max(0.0, (duration - stats.out_time) / stats.speed)
+            if on_progress:
+                on_progress({
+                    "stage": stage, "frame": stats.frames, "fps": stats.fps,
+                    "speed": stats.speed, "out_time": stats.out_time,
+                    "percent": percent, "eta": eta,
+                })
+
+            msg = (
+                f"FFmpeg [{stage}] frame={stats.frames} fps={stats.fps:.1f} "
+                f"speed={stats.speed:.2f}x"
+                + (f" {percent:.0f}%" if percent is not None else "")
+                + (f" eta={eta:.0f}s" if eta is not None else "")
+            )
+            if now - last_log >= LOG_INTERVAL or block["progress"] == "end":
+                logger.info(msg)
+                last_log = now
+            else:
+                logger.debug(msg)
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.wait()
+        reader.join()
+        pipes.close()
+
+    stats.elapsed = time.monotonic() - start
+    if proc.returncode != 0:
+        where = f" (full log: {stderr.path})" if stderr.path else ""
+        raise RuntimeError(f"FFmpeg [{stage}] failed{where}: {stderr.text() or 'Unknown'}")
+    return stats
@@ -0,0 +1,118 @@
+"""Minimal FFmpeg filter-graph builder.
+
+Collects inputs and filter nodes, de-duplicates identical inputs (same file
+with the same input options is opened once and its stream referenced from
+every node that needs it), and writes the graph to a file for
+`-filter_complex_script` so long graphs stay out of argv and the logs.
+In-memory inputs (frame_pipe.RawFrames) are registered like files and
+streamed to FFmpeg over a pipe when the command runs.
+"""
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Union
+
+
+@dataclass
+class Node:
+    inputs: List[str]
+    filters: List[str]
+    outputs: List[str] = field(default_factory=list)
+
+    def render(self) -> str:
+        ins = "".join(f"[{label}]" for label in self.inputs)
+        outs = "".join(f"[{label}]" for label in self.outputs)
+        return f"{ins}{','.join(self.filters)}{outs}"
+
+
+def filter_names(chain: str) -> List[str]:
+    """Names of the filters in a comma-separated chain, ignoring quoted commas."""
+    names, depth_quote, start = [], False, 0
+    i = 0
+    while i < len(chain):
+        c = chain[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "'":
+            depth_quote = not depth_quote
+        elif c == "," and not depth_quote:
+            names.append(chain[start:i])
+            start = i + 1
+        i += 1
+    names.append(chain[start:])
+    return [n.split("=", 1)[0].strip() for n in names if n.strip()]
+
+
+class FilterGraph:
+    def __init__(self):
+        self._input_args: list = []
+        self._inputs: Dict[tuple, int] = {}
+        self._labels = set()
+        self.nodes: List[Node] = []
+        self.deduped_inputs = 0
+
+    def input(self, path, *options: str) -> int:
+        """Register `path` (with input `options` such as -loop/-t); returns its index.
+
+        Re-registering the same file with the same options returns the
+        existing index instead of opening the file again. `path` may also
+        be an in-memory source with input_options() (frame_pipe.RawFrames);
+        it stays in input_args as is, for run_ffmpeg to pipe.
+        """
+        if isinstance(path, str):
+            key = (options, os.path.abspath(path))
+        else:
+            key = (options, id(path))
+            options = (*options, *path.input_options())
+        if key in self._inputs:
+            self.deduped_inputs += 1
+            return self._inputs[key]
+        idx = len(self._inputs)
+        self._inputs[key] = idx
+        self._input_args.extend([*options, "-i", path])
+        return idx
+
+    def add(self, inputs: Sequence[str], filters: Union[str, Sequence[str]],
+            output: Union[str, Sequence[str]]) -> Union[str, List[str]]:
+        """Add a node reading `inputs` labels through `filters` into `output`.
+
+        Input stream references are written as "3:v"; returns `output` so
+        nodes can be chained. A list of labels names each output of a
+        multi-output filter such as split.
+        """
+        outputs = [output] if isinstance(output, str) else list(output)
+        for label in outputs:
+            if label in self._labels:
+                raise ValueError(f"Filter graph label '{label}' is already defined")
+        self._labels.update(outputs)
+        if isinstance(filters, str):
+            filters = [filters]
+        self.nodes.append(Node(list(inputs), list(filters), outputs))
+        return output
+
+    @property
+    def input_args(self) -> List[str]:
+        return list(self._input_args)
+
+    def render(self) -> str:
+        return ";\n".join(node.render() for node in self.nodes)
+
+    def write_script(self, path: str) -> str:
+        """Write the graph for `-filter_complex_script`; returns the path."""
+        with open(path, "w") as f:
+            f.write(self.render() + "\n")
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """Input, node and per-filter counts (e.g. overlay, xfade) for logging."""
+        counts = Counter()
+        for node in self.nodes:
+            for chain in node.filters:
+                counts.update(filter_names(chain))
+        return {
+            "inputs": len(self._inputs),
+            "deduped_inputs": self.deduped_inputs,
+            "nodes": len(self.nodes),
+            **dict(counts),
+        }
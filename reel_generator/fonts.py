@@ -0,0 +1,60 @@
+"""Process-wide font registry and text-measurement cache.
+
+The caption, title and ASS renderers share one bold font. Probing the
+candidate paths and loading a FreeType face happens once per (path, size)
+for the life of the process, and text measurements are memoized by
+(text, size, path), so repeated lines (every typewriter step of a
+sentence, the same title across renders) are only measured once.
+"""
+import os
+from functools import lru_cache
+
+from PIL import ImageFont
+
+FONT_PATHS = [
+    "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+]
+
+# Distinct (text, size, path) measurements kept; a reel needs a few hundred
+MEASURE_CACHE_SIZE = 8192
+
+
+def find_font(font_path=None):
+    """Return the first usable bold font path (explicit path wins)."""
+    if font_path and os.path.exists(font_path):
+        return font_path
+    return _default_font_path()
+
+
+@lru_cache(maxsize=None)
+def _default_font_path():
+    for path in FONT_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def get_font(size, path=None):
+    """The bold font at `size` px (Pillow's default font if none loads).
+
+    The returned font is shared: callers must not modify it.
+    """
+    for candidate in ([path] if path else []) + FONT_PATHS:
+        if os.path.exists(candidate):
+            try:
+                return ImageFont.truetype(candidate, size)
+            except OSError:
+                continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def text_bbox(text, size, path=None):
+    """Bounding box of `text` drawn at (0, 0) in get_font(size, path).
+
+    Same box as ImageDraw.textbbox((0, 0), text, font=font).
+    """
+    return get_font(size, path).getbbox(text)
@@ -0,0 +1,108 @@
+"""In-memory RGBA frames streamed to FFmpeg over pipes.
+
+With in-memory frames, captions and titles never become temp PNGs: a
+RawFrames source is registered as a FilterGraph input like a file, and
+run_ffmpeg gives each source its own pipe (`-i pipe:N`, rawvideo with
+alpha) that a feeder thread fills while FFmpeg reads it. Frames are held
+as run lengths of small positioned images, so a 30s caption track costs
+one sprite per caption in memory, not one full frame per output frame.
+"""
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+# A run: `count` frames showing `image` pasted at (x, y), or blank frames
+Run = Tuple[Optional[Tuple[Image.Image, Tuple[int, int]]], int]
+
+
+class RawFrames:
+    """A rawvideo RGBA input of `size` frames at `fps`, built from runs."""
+
+    def __init__(self, size: Tuple[int, int], runs: Sequence[Run], fps: float = 25):
+        self.size = tuple(size)
+        self.runs = list(runs)
+        self.fps = fps
+
+    @classmethod
+    def still(cls, image: Image.Image) -> "RawFrames":
+        """A single frame; overlay repeats it for the whole render, like a PNG input."""
+        return cls(image.size, [((image, (0, 0)), 1)])
+
+    @property
+    def frame_count(self) -> int:
+        return sum(count for _, count in self.runs)
+
+    def input_options(self) -> List[str]:
+        w, h = self.size
+        return ["-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w}x{h}", "-framerate", str(self.fps)]
+
+    def _frame(self, placed) -> bytes:
+        if placed is None:
+            return bytes(self.size[0] * self.size[1] * 4)
+        image, (x, y) = placed
+        if image.size == self.size and (x, y) == (0, 0) and image.mode == "RGBA":
+            return image.tobytes()
+        frame = Image.new("RGBA", self.size, (0, 0, 0, 0))
+        frame.paste(image.convert("RGBA"), (x, y))
+        return frame.tobytes()
+
+    def write(self, fd: int) -> None:
+        """Write every frame to `fd` and close it.
+
+        A reader that stops early (FFmpeg failed or had all it needed) is
+        not an error here; FFmpeg's exit status reports failures.
+        """
+        try:
+            with open(fd, "wb") as f:
+                for placed, count in self.runs:
+                    data = self._frame(placed)
+                    for _ in range(count):
+                        f.write(data)
+        except (BrokenPipeError, OSError):
+            pass
+
+    def __str__(self) -> str:
+        w, h = self.size
+        return f"<{self.frame_count} in-memory {w}x{h} rgba frames>"
+
+
+class FramePipes:
+    """The pipes feeding one FFmpeg command's in-memory inputs.
+
+    `cmd` has each RawFrames argument replaced with `pipe:<fd>`; start the
+    process with `pass_fds=pipes.pass_fds`, then call start() to hand the
+    read ends over and begin feeding, and close() once it exits.
+    """
+
+    def __init__(self, cmd: list):
+        self.cmd: List[str] = []
+        self.pass_fds: List[int] = []
+        self._feeds = []
+        self._threads: List[threading.Thread] = []
+        for arg in cmd:
+            if isinstance(arg, RawFrames):
+                read_fd, write_fd = os.pipe()
+                self.pass_fds.append(read_fd)
+                self._feeds.append((arg, write_fd))
+                arg = f"pipe:{read_fd}"
+            self.cmd.append(arg)
+
+    def start(self) -> None:
+        for fd in self.pass_fds:
+            os.close(fd)
+        self.pass_fds = []
+        for source, write_fd in self._feeds:
+            thread = threading.Thread(target=source.write, args=(write_fd,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self) -> None:
+        if not self._threads:
+            # The process never started: nothing owns the pipes
+            for fd in self.pass_fds + [w for _, w in self._feeds]:
+                os.close(fd)
+            self.pass_fds, self._feeds = [], []
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,43 @@
+"""Ken Burns motion engines.
+
+"zoompan" is the FFmpeg zoompan filter (see clip_cache.kenburns_filter).
+"scale" follows the same zoom curves with one scale per frame: the canvas
+is duplicated into `frames` frames, each scaled by its zoom factor
+(eval=frame) with a bilinear scaler and centre-cropped to the output.
+zoompan resizes every frame with a bicubic scaler set up afresh per frame,
+which makes it the slower of the two.
+"""
+
+MOTION_ENGINES = ("zoompan", "scale")
+
+ZOOM_MAX = 1.15
+
+
+def zoom_expr(zoom_in, step):
+    """Zoom factor of frame `n`, as an FFmpeg expression matching zoompan's.
+
+    zoom in:  min(zoom+step,1.15), starting from zoompan's initial 1.0
+    zoom out: if(eq(on,1),1.15,max(zoom-step,1.0)); frame 0 evaluates
+              to 1.0 before the jump to 1.15, kept for output parity
+    """
+    if zoom_in:
+        return f"min(1+{step}*(n+1),{ZOOM_MAX})"
+    return f"if(eq(n,0),1,max({ZOOM_MAX}-{step}*(n-1),1))"
+
+
+def scale_motion(frames, zoom_in, step, width, height, fps):
+    """Filter chain taking the Ken Burns canvas to `frames` zoomed frames.
+
+    The canvas is converted once, before fps/tpad clone it; fps may emit
+    more than one frame for the still, hence the trim. Scaled sizes stay
+    even so the centre crop lands on whole chroma samples. crop keeps the
+    input size it was configured with, so its offsets follow `n` too.
+    """
+    z = zoom_expr(zoom_in, step)
+    return (
+        f"format=yuv420p,fps={fps},tpad=stop={frames - 1}:stop_mode=clone,trim=end_frame={frames},"
+        f"scale=w='2*round({width}*{z}/2)':h='2*round({height}*{z}/2)'"
+        f":eval=frame:flags=fast_bilinear,"
+        f"crop={width}:{height}"
+        f":x='round({width}*{z}/2)-{width // 2}':y='round({height}*{z}/2)-{height // 2}'"
+    )
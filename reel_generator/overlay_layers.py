@@ -0,0 +1,93 @@
+"""Pre-flattened static overlay layers.
+
+Titles and the news frame are full-frame RGBA PNGs that used to be blended
+one overlay node each, so a titled, framed frame paid for two full-frame
+blends. The timeline is instead cut into windows with a constant set of
+active layers, each distinct set is alpha-composited once with Pillow, and
+the graph runs one overlay per set: every frame gets at most one blend.
+Sprites (see reel_generator.sprites) are composited at their offset, and
+each flattened set is saved as a sprite of its visible pixels, or kept in
+memory as a Sprite.
+"""
+import os
+
+from PIL import Image
+
+from .sprites import make_sprite, open_sprite, save_sprite
+
+
+def layer_windows(layers):
+    """Group the timeline by which layers are active.
+
+    layers: [(path, t0, t1)] in z-order; t1=None means until the end.
+    Returns [(layer_indices, [(t0, t1), ...])] for every distinct non-empty
+    set, in order of first appearance. Windows are half-open [t0, t1).
+    """
+    bounds = sorted({0.0} | {t for _, t0, t1 in layers for t in (t0, t1) if t is not None})
+    groups = {}
+    for k, start in enumerate(bounds):
+        end = bounds[k + 1] if k + 1 < len(bounds) else None
+        active = tuple(
+            i for i, (_, t0, t1) in enumerate(layers)
+            if t0 <= start and (t1 is None or start < t1)
+        )
+        if not active:
+            continue
+        windows = groups.setdefault(active, [])
+        if windows and windows[-1][1] == start:
+            windows[-1] = (windows[-1][0], end)  # extend a contiguous window
+        else:
+            windows.append((start, end))
+    return list(groups.items())
+
+
+def enable_expr(windows):
+    """FFmpeg enable expression for half-open windows; None if always on."""
+    if windows == [(0.0, None)]:
+        return None
+    terms = [
+        f"gte(t,{t0:.2f})" if t1 is None else f"gte(t,{t0:.2f})*lt(t,{t1:.2f})"
+        for t0, t1 in windows
+    ]
+    return "+".join(terms)
+
+
+def flatten_layers(layers, size, out_dir):
+    """Composite each distinct set of active layers into one PNG.
+
+    Layers are PNG paths or Sprites. Sprites keep their size; full-frame
+    layers not already `size` are resized. Returns [(png_path, windows)];
+    with out_dir=None nothing is written and merged sets are Sprites.
+    """
+    images, conformed = {}, set()
+
+    def layer_image(path):
+        if path not in images:
+            img, offset = open_sprite(path)
+            if offset is not None or img.size == tuple(size):
+                conformed.add(path)
+            else:
+                img = img.resize(size, Image.BICUBIC)
+            images[path] = (img, offset or (0, 0))
+        return images[path]
+
+    flattened = []
+    for n, (active, windows) in enumerate(layer_windows(layers)):
+        if len(active) == 1:
+            path = layers[active[0]][0]
+            layer_image(path)
+            if path in conformed:
+                # Nothing to merge: overlay the layer file itself
+                flattened.append((path, windows))
+                continue
+        canvas = Image.new("RGBA", tuple(size), (0, 0, 0, 0))
+        for i in active:
+            img, offset = layer_image(layers[i][0])
+            canvas.alpha_composite(img, offset)
+        if out_dir is None:
+            flattened.append((make_sprite(canvas, size), windows))
+            continue
+        out = os.path.join(out_dir, f"layers_{n}.png")
+        save_sprite(canvas, out, size)
+        flattened.append((out, windows))
+    return flattened
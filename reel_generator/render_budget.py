@@ -0,0 +1,163 @@
+"""Process-wide CPU budget for FFmpeg renders.
+
+Every FFmpeg render in the process (VideoBuilder, FacelessVideoService,
+Ken Burns clips) takes a slot from one RenderBudget before it starts. The
+slot count and the threads each render gets are sized from the CPUs this
+process can actually use (cgroup CPU quota, affinity mask) rather than
+os.cpu_count(). Without it, every concurrent render starts a full set of
+decoder, filter and encoder threads and the box is oversubscribed.
+
+A slot's thread count is the budget's CPUs shared between the renders
+running when it is admitted, so a lone final render still gets the whole
+machine. Renders queue once FFMPEG_MAX_JOBS are running. The cap is per
+process; separate pipeline processes should split the machine with
+FFMPEG_MAX_JOBS or by CPU quota.
+"""
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Concurrent FFmpeg processes; 0 = one per MIN_JOB_THREADS available CPUs
+FFMPEG_MAX_JOBS = int(os.getenv("FFMPEG_MAX_JOBS", "0"))
+# Pin each render to its own CPUs (Linux only)
+FFMPEG_PIN_CPUS = os.getenv("FFMPEG_PIN_CPUS", "").lower() in ("1", "true", "yes")
+MIN_JOB_THREADS = 2
+# Decoders of stills and intermediate clips gain little past two threads
+DECODER_THREADS = 2
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def cgroup_cpu_quota(root: str = CGROUP_ROOT) -> Optional[float]:
+    """CPUs allowed by the cgroup CPU quota (v2 cpu.max or v1 CFS), None if unlimited."""
+    try:
+        with open(os.path.join(root, "cpu.max")) as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+        return None if quota <= 0 or period <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def allowed_cpu_ids() -> List[int]:
+    """CPU ids in this process's affinity mask."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """CPUs this process can keep busy: affinity mask capped by the cgroup quota."""
+    cpus = len(allowed_cpu_ids())
+    quota = cgroup_cpu_quota(root)
+    if quota:
+        cpus = min(cpus, max(1, math.floor(quota)))
+    return cpus
+
+
+@dataclass
+class Slot:
+    threads: int
+    cpu_ids: List[int] = field(default_factory=list)  # pinned CPUs, empty when not pinning
+
+
+class RenderBudget:
+    def __init__(self, cpus: Optional[int] = None, max_jobs: Optional[int] = None,
+                 pin: bool = FFMPEG_PIN_CPUS):
+        self.cpus = cpus or available_cpus()
+        self.max_jobs = max_jobs or FFMPEG_MAX_JOBS or max(1, self.cpus // MIN_JOB_THREADS)
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+        self._slots = threading.BoundedSemaphore(self.max_jobs)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._free_cpus = allowed_cpu_ids()[:self.cpus]
+
+    def plan(self, jobs: int) -> Tuple[int, int]:
+        """Workers and per-render threads for `jobs` renders fanned out together."""
+        workers = max(1, min(jobs, self.max_jobs))
+        return workers, max(1, self.cpus // workers)
+
+    @contextmanager
+    def slot(self) -> Iterator[Slot]:
+        """Hold one render slot; blocks while max_jobs renders are running."""
+        self._slots.acquire()
+        with self._lock:
+            self._active += 1
+            threads = max(1, self.cpus // self._active)
+            cpu_ids = []
+            if self.pin:
+                # Renders admitted earlier may hold more than their share
+                # now; run unpinned rather than wait when none are free
+                cpu_ids, self._free_cpus = self._free_cpus[:threads], self._free_cpus[threads:]
+                threads = len(cpu_ids) or threads
+        try:
+            yield Slot(threads, cpu_ids)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._free_cpus = sorted(self._free_cpus + cpu_ids)
+            self._slots.release()
+
+    @staticmethod
+    def apply(cmd: list, slot: Slot) -> list:
+        """Add the slot's thread counts to an FFmpeg command.
+
+        Filter graphs get -filter_complex_threads, each video encoder
+        without its own -threads gets the slot's threads (x264 takes its
+        thread count from -threads) and each input decoder gets at most
+        DECODER_THREADS. Thread options already in the command are kept.
+        """
+        threads = str(slot.threads)
+        out = [cmd[0]]
+        if any(a in ("-filter_complex", "-filter_complex_script") for a in cmd) \
+                and "-filter_complex_threads" not in cmd:
+            out += ["-filter_complex_threads", threads]
+        group_start, i = 1, 1  # input options run from the previous input to "-i"
+        while i < len(cmd):
+            arg = cmd[i]
+            if arg == "-i":
+                if "-threads" not in cmd[group_start:i]:
+                    out += ["-threads", str(min(DECODER_THREADS, slot.threads))]
+                group_start = i + 2
+            out.append(arg)
+            if arg in ("-c:v", "-vcodec") and i + 1 < len(cmd) and cmd[i + 1] != "copy":
+                # Output options run until the next encoder (or the end)
+                rest = cmd[i + 2:]
+                end = next((j for j, a in enumerate(rest) if a in ("-c:v", "-vcodec")), len(rest))
+                out.append(cmd[i + 1])
+                if "-threads" not in rest[:end]:
+                    out += ["-threads", threads]
+                i += 2
+                continue
+            i += 1
+        return out
+
+    @staticmethod
+    def pin_process(pid: int, slot: Slot) -> None:
+        """Restrict a started render to the slot's CPUs.
+
+        FFmpeg spawns its worker threads after parsing its arguments, so
+        they inherit the mask set here right after the process starts.
+        """
+        if not slot.cpu_ids:
+            return
+        try:
+            os.sched_setaffinity(pid, slot.cpu_ids)
+        except OSError as e:
+            logger.debug(f"Could not pin FFmpeg {pid} to CPUs {slot.cpu_ids}: {e}")
+
+
+BUDGET = RenderBudget()
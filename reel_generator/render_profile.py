@@ -0,0 +1,77 @@
+"""Render profiles: output geometry and encoder settings per quality tier.
+
+Layout constants across the renderers (font sizes, margins, y offsets) are
+designed for a 1080x1920 frame; RenderProfile.px() scales them to the
+profile's width so a preview is a faithful miniature of the final reel.
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Design resolution every layout constant is expressed in
+BASE_WIDTH = 1080
+BASE_HEIGHT = 1920
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    name: str
+    width: int
+    height: int
+    fps: int
+    preset: str
+    # None keeps each encoder's established default (CRF 18 in
+    # FacelessVideoService, x264's default in VideoBuilder)
+    crf: Optional[int] = None
+
+    @property
+    def scale(self) -> float:
+        return self.width / BASE_WIDTH
+
+    def px(self, value: float) -> int:
+        """Scale a 1080-wide design pixel value to this profile (min 1px)."""
+        return max(1, round(value * self.scale))
+
+
+PROFILES = {
+    "final": RenderProfile("final", BASE_WIDTH, BASE_HEIGHT, 30, "medium"),
+    # Quarter the pixels and half the frames: for iterating on edits
+    "preview": RenderProfile("preview", 540, 960, 15, "ultrafast", 28),
+}
+
+
+def get_profile(profile=None) -> RenderProfile:
+    """Resolve a profile name (or pass a RenderProfile through); None → final."""
+    if isinstance(profile, RenderProfile):
+        return profile
+    name = profile or "final"
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown render profile '{name}' (expected one of {', '.join(PROFILES)})"
+        )
+    return PROFILES[name]
+
+
+@dataclass(frozen=True)
+class OutputSpec:
+    """An extra rendition encoded from the same filter pass as the main output."""
+    path: str
+    # None keeps the profile's size; another aspect ratio is centre-cropped
+    width: Optional[int] = None
+    height: Optional[int] = None
+    # e.g. "1M" for a review proxy; None keeps the profile's quality settings
+    bitrate: Optional[str] = None
+    preset: Optional[str] = None
+
+
+def get_output_spec(spec) -> OutputSpec:
+    """Accept an OutputSpec or a dict of its fields."""
+    if isinstance(spec, OutputSpec):
+        return spec
+    return OutputSpec(**spec)
+
+
+def crop_to_aspect(width: int, height: int, out_width: int, out_height: int) -> Tuple[int, int]:
+    """Largest even centre crop of width x height with the out_width:out_height aspect."""
+    crop_w = min(width, round(height * out_width / out_height))
+    crop_h = min(height, round(width * out_height / out_width))
+    return crop_w - crop_w % 2, crop_h - crop_h % 2
@@ -0,0 +1,94 @@
+"""Cropped overlay sprites that carry their own frame position.
+
+Captions and titles cover a small band of the frame, so instead of a
+mostly empty full-frame RGBA canvas they are saved cropped to their
+visible pixels. The sprite's top-left corner in the frame is stored in
+the PNG itself (a "sprite_offset" text chunk), so every consumer (the
+overlay graph, the caption track, layer flattening) places it without
+extra bookkeeping. A PNG without the chunk is a full-frame layer at 0,0.
+With in-memory frames (see frame_pipe) a Sprite object stands in for the
+PNG path, and the helpers here accept either.
+
+Offsets and sizes are even: FFmpeg's overlay rounds positions on yuv420
+frames down to the chroma grid.
+"""
+import hashlib
+from dataclasses import dataclass
+
+from PIL import Image, PngImagePlugin
+
+OFFSET_KEY = "sprite_offset"
+# Sprites are temp files FFmpeg reads once: zlib level 1 roughly halves
+# caption encode time against Pillow's default 6, for ~15% larger files
+COMPRESS_LEVEL = 1
+
+
+def even_box(box, width, height):
+    """(x0, y0, x1, y1) widened to even coordinates, clipped to the frame."""
+    x0, y0, x1, y1 = box
+    x0, y0 = x0 - x0 % 2, y0 - y0 % 2
+    x1, y1 = min(x1 + x1 % 2, width), min(y1 + y1 % 2, height)
+    return x0, y0, x1, y1
+
+
+@dataclass(frozen=True, eq=False)
+class Sprite:
+    """An in-memory sprite: an RGBA image and its top-left corner in the frame."""
+    image: Image.Image
+    x: int
+    y: int
+
+    def digest(self):
+        """Content hash, standing in for a PNG's file digest."""
+        h = hashlib.sha256(f"{self.x},{self.y},{self.image.size}".encode())
+        h.update(self.image.tobytes())
+        return h.hexdigest()
+
+
+def make_sprite(img, frame_size, offset=(0, 0)):
+    """The visible part of `img`, placed at `offset` in a frame_size frame, as a Sprite.
+
+    A fully transparent image becomes a 2x2 sprite.
+    """
+    ox, oy = offset
+    box = img.getchannel("A").getbbox() or (0, 0, 2, 2)
+    x0, y0, x1, y1 = even_box((box[0] + ox, box[1] + oy, box[2] + ox, box[3] + oy), *frame_size)
+    return Sprite(img.crop((x0 - ox, y0 - oy, x1 - ox, y1 - oy)), x0, y0)
+
+
+def save_sprite(img, path, frame_size, offset=(0, 0)):
+    """Save make_sprite(img, frame_size, offset) as a PNG; returns its (x, y) in the frame."""
+    sprite = make_sprite(img, frame_size, offset)
+    info = PngImagePlugin.PngInfo()
+    info.add_text(OFFSET_KEY, f"{sprite.x},{sprite.y}")
+    sprite.image.save(path, pnginfo=info, compress_level=COMPRESS_LEVEL)
+    return sprite.x, sprite.y
+
+
+def open_sprite(src):
+    """(RGBA image, (x, y) or None) of a Sprite or PNG path; None for a plain PNG."""
+    if isinstance(src, Sprite):
+        return src.image, (src.x, src.y)
+    with Image.open(src) as im:
+        return im.convert("RGBA"), sprite_offset(src)
+
+
+def sprite_offset(path):
+    """(x, y) of a sprite in the frame; None for a plain full-frame PNG."""
+    if isinstance(path, Sprite):
+        return path.x, path.y
+    with Image.open(path) as im:
+        value = getattr(im, "text", {}).get(OFFSET_KEY)
+    if not value:
+        return None
+    x, y = value.split(",")
+    return int(x), int(y)
+
+
+def sprite_box(path):
+    """(x, y, w, h) a PNG (or Sprite) covers in the frame."""
+    if isinstance(path, Sprite):
+        return path.x, path.y, path.image.width, path.image.height
+    with Image.open(path) as im:
+        x, y = (getattr(im, "text", {}).get(OFFSET_KEY) or "0,0").split(",")
+        return int(x), int(y), im.width, im.height
@@ -24,6 +24,40 @@ def get_audio_duration(file_path):
     result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
     return float(result.stdout.strip())
 
+# Stream fields that must match for the concat demuxer to join files with
+# `-c copy` (codec, geometry and timing; bitrate and duration may differ).
+COPY_CONCAT_FIELDS = {
+    "v": ("codec_name", "profile", "width", "height", "pix_fmt",
+          "sample_aspect_ratio", "r_frame_rate", "time_base"),
+    "a": ("codec_name", "sample_rate", "channels", "channel_layout", "sample_fmt"),
+}
+
+def probe_stream(file_path, kind="v"):
+    """Returns the COPY_CONCAT_FIELDS of the first `kind` stream, or None."""
+    fields = COPY_CONCAT_FIELDS[kind]
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", f"{kind}:0",
+        "-show_entries", "stream=" + ",".join(fields),
+        "-of", "json",
+        file_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    streams = json.loads(result.stdout or "{}").get("streams") or []
+    if not streams:
+        return None
+    return {field: streams[0].get(field) for field in fields}
+
+def streams_match(paths, kind="v"):
+    """True when every file's first `kind` stream can be stream-copy concatenated."""
+    params = [probe_stream(p, kind) for p in paths]
+    if any(p is None for p in params):
+        return False
+    return all(p == params[0] for p in params[1:])
+
 def ensure_dir(path):
     if not os.path.exists(path):
         os.makedirs(path)
@@ -1,27 +1,74 @@
 import subprocess
+import hashlib
+import json
 import logging
+import math
 import os
 import platform
+import shutil
 import textwrap
-from PIL import Image, ImageDraw, ImageFont
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw
+from .ass_captions import has_libass
+from .brand_assets import VIDEO_EXTS, conform_card, conform_overlay
+from .clip_cache import ClipCache, file_digest, kenburns_filter
+from .ffmpeg_progress import run_ffmpeg
+from .fonts import get_font, text_bbox
+from .frame_pipe import RawFrames
+from .render_budget import BUDGET
+from .filter_graph import FilterGraph
+from .overlay_layers import enable_expr, flatten_layers
+from .render_profile import crop_to_aspect, get_output_spec, get_profile
+from .sprites import (
+    COMPRESS_LEVEL, Sprite, make_sprite, open_sprite, save_sprite, sprite_offset,
+)
 from .utils import ensure_dir
 
 logger = logging.getLogger(__name__)
 
-# Internal FPS for zoompan computation — this is the #1 performance lever.
-# 15fps halves the frame calculations vs 30fps; output is still 30fps smooth.
-ZOOMPAN_FPS = 30
-
 # xfade transition used between all images
 TRANSITION_STYLES = [
     "fadeblack",    # cinematic fade through black
 ]
+TRANSITION_DURATION = 1.0
+INTRO_DURATION = 3.0
+
+# Digest segments are intermediates: lossless and fast, the stitch encodes once
+SEGMENT_CODEC = ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-pix_fmt", "yuv420p"]
+
+# Silent copy of each reel's video, so a new voiceover can be remuxed without
+# re-encoding (see VideoBuilder.swap_audio); empty disables
+MEZZANINE_DIR = os.getenv("MEZZANINE_DIR", os.path.join("outputs", "cache", "mezzanine"))
+# Size budget in MB; least-recently-used files are evicted beyond it
+MEZZANINE_MAX_MB = int(os.getenv("MEZZANINE_MAX_MB", "2048"))
+
+# Smart render (config smart_render): fixed closed GOPs of this length are
+# kept per reel, and a re-render encodes only the GOPs an edit touched
+SMART_GOP_SECONDS = 2.0
+# Config keys tracked per time window rather than in the whole-reel key
+SMART_WINDOWED_KEYS = (
+    "intro_image", "outro_image", "middle_images", "caption_images", "title", "script",
+    "smart_render",
+)
 
 
 class VideoBuilder:
-    def __init__(self, fps=30):
+    def __init__(self, fps=None, clip_cache=None, on_progress=None, mezzanine_dir=MEZZANINE_DIR):
+        # Overrides the render profile's frame rate when set
         self.fps = fps
+        self.mezzanine_dir = mezzanine_dir
         self._hw_encoder = self._detect_hw_encoder()
+        self.clip_cache = clip_cache if clip_cache is not None else ClipCache()
+        # Called with each progress update of the final render (see ffmpeg_progress)
+        self.on_progress = on_progress
+        # RenderStats of the last successful build_video, for its achieved fps
+        self.last_stats = None
+
+    def _profile(self, config):
+        """The config's render profile, at this builder's fps if one was given."""
+        profile = get_profile(config.get("render_profile"))
+        return replace(profile, fps=self.fps) if self.fps else profile
 
     # ------------------------------------------------------------------
     # Hardware‑encoder detection (macOS VideoToolbox)
@@ -46,34 +93,24 @@ class VideoBuilder:
     # ------------------------------------------------------------------
     # Title PNG renderer
     # ------------------------------------------------------------------
-    def _render_title_png(self, title_text, temp_dir, use_overlay=True):
-        """Render the title as a transparent PNG for FFmpeg overlay."""
-        img = Image.new('RGBA', (1080, 1920), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
+    def _render_title_png(self, title_text, temp_dir, use_overlay=True, profile=None, in_memory=False):
+        """Render the title as a transparent sprite PNG for FFmpeg overlay.
 
-        # Find a bold font
-        font = None
-        for path in [
-            "/System/Library/Fonts/Supplemental/Arial Bold.ttf",
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        ]:
-            if os.path.exists(path):
-                try:
-                    font = ImageFont.truetype(path, 56)
-                    break
-                except:
-                    continue
-        if not font:
-            font = ImageFont.load_default()
+        in_memory returns a Sprite instead and writes nothing.
+        """
+        profile = get_profile(profile)
+        img = Image.new('RGBA', (profile.width, profile.height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        size = profile.px(56)
+        font = get_font(size)
 
         # Wrap text
         lines = textwrap.wrap(title_text.upper(), width=24)
         line_sizes = []
         total_h = 0
-        spacing = 8
+        spacing = profile.px(8)
         for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
+            bbox = text_bbox(line, size)
             w, h = bbox[2] - bbox[0], bbox[3] - bbox[1]
             line_sizes.append((w, h))
             total_h += h
@@ -81,45 +118,341 @@ class VideoBuilder:
 
         # Draw at top-center offset
         # y=280 for overlay, y=80 for default
-        y = 280 if use_overlay else 80
+        y = profile.px(280 if use_overlay else 80)
+        o = profile.px(2)
         for idx, line in enumerate(lines):
             w, h = line_sizes[idx]
-            x = (1080 - w) // 2
+            x = (profile.width - w) // 2
 
-            # Black outline
-            for dx, dy in [(-2, -2), (-2, 2), (2, -2), (2, 2), (-2, 0), (2, 0), (0, -2), (0, 2)]:
-                draw.text((x + dx, y + dy), line, font=font, fill="black")
-            # Yellow text
-            draw.text((x, y), line, font=font, fill="yellow")
+            # Yellow text with a black outline, in one stroked pass
+            draw.text((x, y), line, font=font, fill="yellow", stroke_width=o, stroke_fill="black")
             y += h + spacing
 
+        if in_memory:
+            return make_sprite(img, (profile.width, profile.height))
         png_path = os.path.join(temp_dir, "title_overlay.png")
-        img.save(png_path)
+        save_sprite(img, png_path, (profile.width, profile.height))
         logger.info(f"Title overlay rendered: {png_path}")
         return png_path
 
     # ------------------------------------------------------------------
     # Red side border renderer
     # ------------------------------------------------------------------
-    def _render_border_png(self, temp_dir):
+    def _render_border_png(self, temp_dir, profile=None):
         """Render a transparent PNG with black borders on all sides."""
-        BORDER_WIDTH = 12
-        img = Image.new('RGBA', (1080, 1920), (0, 0, 0, 0))
+        profile = get_profile(profile)
+        W, H = profile.width, profile.height
+        BORDER_WIDTH = profile.px(12)
+        img = Image.new('RGBA', (W, H), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
         # Top border
-        draw.rectangle([0, 0, 1079, BORDER_WIDTH - 1], fill=(0, 0, 0, 255))
+        draw.rectangle([0, 0, W - 1, BORDER_WIDTH - 1], fill=(0, 0, 0, 255))
         # Bottom border
-        draw.rectangle([0, 1920 - BORDER_WIDTH, 1079, 1919], fill=(0, 0, 0, 255))
+        draw.rectangle([0, H - BORDER_WIDTH, W - 1, H - 1], fill=(0, 0, 0, 255))
         # Left border
-        draw.rectangle([0, 0, BORDER_WIDTH - 1, 1919], fill=(0, 0, 0, 255))
+        draw.rectangle([0, 0, BORDER_WIDTH - 1, H - 1], fill=(0, 0, 0, 255))
         # Right border
-        draw.rectangle([1080 - BORDER_WIDTH, 0, 1079, 1919], fill=(0, 0, 0, 255))
+        draw.rectangle([W - BORDER_WIDTH, 0, W - 1, H - 1], fill=(0, 0, 0, 255))
         
         png_path = os.path.join(temp_dir, "border_overlay.png")
         img.save(png_path)
         logger.info(f"Border overlay rendered: {png_path}")
         return png_path
 
+    # ------------------------------------------------------------------
+    # Caption timing + caption track
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _caption_windows(script_text, num_captions, caption_start, caption_end):
+        """Return the (t0, t1) display window of every caption image.
+
+        Sentences share the caption window by word count. In typewriter mode
+        (more captions than sentences) each sentence window is split per word,
+        weighted by word length.
+        """
+        from .caption_generator import split_into_chunks
+        chunks = split_into_chunks(script_text)
+        if not chunks:
+            return []
+
+        caption_window = caption_end - caption_start
+
+        # Compute per-sentence time window (weighted by word count)
+        chunk_word_counts = [max(len(c.split()), 1) for c in chunks]
+        total_words = sum(chunk_word_counts)
+
+        chunk_windows = []
+        t = caption_start
+        for cw in chunk_word_counts:
+            fraction = cw / total_words
+            chunk_windows.append((t, t + fraction * caption_window))
+            t += fraction * caption_window
+
+        if num_captions <= len(chunks):
+            # Static mode: one caption per sentence
+            return [chunk_windows[min(i, len(chunk_windows) - 1)] for i in range(num_captions)]
+
+        # Typewriter mode: one sub-window per word
+        word_windows = []
+        for chunk, (chunk_start_t, chunk_end_t) in zip(chunks, chunk_windows):
+            chunk_dur = chunk_end_t - chunk_start_t
+            char_weights = [max(len(w), 2) for w in chunk.split()]
+            total_chars = sum(char_weights)
+            done = 0
+            for weight in char_weights:
+                t0 = chunk_start_t + done / total_chars * chunk_dur
+                done += weight
+                t1 = chunk_start_t + done / total_chars * chunk_dur
+                word_windows.append((t0, t1))
+
+        # Frames beyond the script's word count fall back to the first word
+        return [
+            word_windows[i] if i < len(word_windows) else word_windows[0]
+            for i in range(num_captions)
+        ]
+
+    def _write_caption_track(self, caption_images, windows, temp_dir, profile=None):
+        """Write an ffconcat script that plays the captions as one RGBA stream.
+
+        Each caption PNG is shown for exactly its window; gaps (and the time
+        before the first / after the last caption) are filled with a blank
+        transparent frame.
+
+        Returns (track_path, band) where band is the (x, y, w, h) rectangle
+        covering every caption's visible pixels, so the overlay only blends
+        that strip instead of the full frame. The concat demuxer needs one
+        frame size, so each caption (a sprite or a full-frame PNG) is
+        re-based onto a band-sized frame.
+        """
+        profile = get_profile(profile)
+        band, offsets = self._caption_band(caption_images, profile)
+        x0, y0 = band[:2]
+
+        blank_png = os.path.join(temp_dir, "caption_blank.png")
+        Image.new('RGBA', band[2:], (0, 0, 0, 0)).save(blank_png)
+        frames = []
+        for i, (path, (x, y)) in enumerate(zip(caption_images, offsets)):
+            frame = Image.new('RGBA', band[2:], (0, 0, 0, 0))
+            # Pixels outside the band are fully transparent
+            frame.paste(open_sprite(path)[0], (x - x0, y - y0))
+            frames.append(os.path.join(temp_dir, f"caption_track_{i}.png"))
+            frame.save(frames[-1], compress_level=COMPRESS_LEVEL)
+
+        def entry(path, duration=None):
+            quoted = os.path.abspath(path).replace("'", "'\\''")
+            if duration is None:
+                return f"file '{quoted}'\n"
+            return f"file '{quoted}'\nduration {duration:.6f}\n"
+
+        lines = ["ffconcat version 1.0\n"]
+        t = 0.0
+        for path, (t0, t1) in zip(frames, windows):
+            if t0 > t:
+                lines.append(entry(blank_png, t0 - t))
+                t = t0
+            if t1 <= t:
+                continue
+            lines.append(entry(path, t1 - t))
+            t = t1
+        # The concat demuxer ignores the duration of the final entry, so the
+        # trailing blank is listed twice.
+        lines.append(entry(blank_png, 1.0))
+        lines.append(entry(blank_png))
+
+        track_path = os.path.join(temp_dir, "caption_track.ffconcat")
+        with open(track_path, "w") as f:
+            f.writelines(lines)
+        logger.info(f"Caption track written: {track_path} ({len(windows)} frames, band={band})")
+        return track_path, band
+
+    def _caption_track_frames(self, caption_images, windows, profile=None):
+        """The caption track of _write_caption_track as in-memory rawvideo.
+
+        Window edges are rounded to the profile's frames. Returns
+        (RawFrames, band); nothing is written to disk.
+        """
+        profile = get_profile(profile)
+        band, offsets = self._caption_band(caption_images, profile)
+        x0, y0 = band[:2]
+        fps = profile.fps
+
+        runs, n = [], 0
+        for src, (x, y), (t0, t1) in zip(caption_images, offsets, windows):
+            f0, f1 = round(t0 * fps), round(t1 * fps)
+            if f0 > n:
+                runs.append((None, f0 - n))
+                n = f0
+            if f1 <= n:
+                continue
+            runs.append(((open_sprite(src)[0], (x - x0, y - y0)), f1 - n))
+            n = f1
+        # Overlay repeats the last frame once the track ends
+        runs.append((None, 1))
+        track = RawFrames(band[2:], runs, fps)
+        logger.info(f"Caption track in memory: {track} ({len(windows)} captions, band={band})")
+        return track, band
+
+    @staticmethod
+    def _caption_band(caption_images, profile):
+        """(band, offsets) for the caption track.
+
+        band is the (x, y, w, h) rectangle covering every caption's visible
+        pixels, widened to even coordinates; offsets holds each caption's
+        (x, y) in the frame.
+        """
+        offsets = []
+        band = None
+        for src in caption_images:
+            image, offset = open_sprite(src)
+            x, y = offset or (0, 0)
+            offsets.append((x, y))
+            box = image.getchannel("A").getbbox()
+            if box:
+                box = (box[0] + x, box[1] + y, box[2] + x, box[3] + y)
+                band = box if band is None else (
+                    min(band[0], box[0]), min(band[1], box[1]),
+                    max(band[2], box[2]), max(band[3], box[3]),
+                )
+        if band is None:
+            band = (0, 0, 2, 2)
+        # Even offsets/sizes keep the overlay aligned to yuv420 chroma
+        x0, y0 = band[0] - band[0] % 2, band[1] - band[1] % 2
+        x1 = min(band[2] + band[2] % 2, profile.width)
+        y1 = min(band[3] + band[3] % 2, profile.height)
+        return (x0, y0, x1 - x0, y1 - y0), offsets
+
+    def _build_ass_captions(self, script_text, caption_start, caption_end, temp_dir,
+                            typewriter=True, use_overlay=True):
+        """Write the script as ASS captions; returns the subtitles filter (or None)."""
+        from .ass_captions import write_ass, subtitles_filter
+        from .caption_generator import split_into_chunks
+
+        chunks = split_into_chunks(script_text)
+        if not chunks or caption_end <= caption_start:
+            return None
+        windows = self._caption_windows(script_text, len(chunks), caption_start, caption_end)
+        ass_path, fonts_dir = write_ass(
+            [(chunk, t0, t1) for chunk, (t0, t1) in zip(chunks, windows)],
+            os.path.join(temp_dir, "captions.ass"),
+            typewriter=typewriter,
+            y_ratio=0.75 if use_overlay else 0.8,
+        )
+        return subtitles_filter(ass_path, fonts_dir)
+
+    # ------------------------------------------------------------------
+    # Graph building blocks (shared by build_video and segment renders)
+    # ------------------------------------------------------------------
+    def _motion_clips(self, jobs, profile, motion_engine):
+        """Pre-render Ken Burns clips for [(image, frames, zoom_in)] in parallel.
+
+        Returns {job index: clip path}; empty when the motion runs in-graph
+        (no cache) or a render failed.
+        """
+        if not jobs or not self.clip_cache.enabled:
+            return {}
+        W, H, fps = profile.width, profile.height, profile.fps
+        workers, threads = BUDGET.plan(len(jobs))
+
+        def motion_clip(i):
+            image, frames, zoom_in = jobs[i]
+            return self.clip_cache.kenburns(
+                image, frames, zoom_in, W, H, fps, threads=threads, engine=motion_engine,
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return dict(enumerate(pool.map(motion_clip, range(len(jobs)))))
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Ken Burns clip render failed, using inline motion: {e}")
+            return {}
+
+    @staticmethod
+    def _conform_brand_card(path, profile):
+        """Brand-cache copy of an intro/outro card, or None to use it as-is."""
+        if not os.path.isfile(path):
+            return None
+        try:
+            return conform_card(path, 3.0, profile.width, profile.height, profile.fps)
+        except RuntimeError as e:
+            logger.warning(f"Could not conform {path}, using it as-is: {e}")
+            return None
+
+    @staticmethod
+    def _add_card(graph, path, conformed, label, profile):
+        """3s intro/outro card as [label]; `conformed` from _conform_brand_card.
+
+        Cards and clips come out in 4:4:4, the format xfade blends in.
+        """
+        W, H, fps = profile.width, profile.height, profile.fps
+        if conformed:
+            idx = graph.input(conformed)
+            # Already at profile size/fps; fps only resets the time base
+            graph.add([f"{idx}:v"], [f"fps={fps}", "setsar=1", "format=yuv444p"], label)
+            return
+        is_video = os.path.splitext(path)[1].lower() in VIDEO_EXTS
+        opts = ("-t", "3") if is_video else ("-loop", "1", "-t", "3")
+        idx = graph.input(path, *opts)
+        graph.add(
+            [f"{idx}:v"],
+            [f"scale={W}:{H}:force_original_aspect_ratio=increase",
+             f"crop={W}:{H}", f"fps={fps}", "setsar=1", "format=yuv444p"],
+            label,
+        )
+
+    def _add_captions(self, graph, src, out, caption_backend, caption_mode,
+                      caption_images, caption_windows, script, caption_start,
+                      caption_end, temp_dir, profile, typewriter=True, use_overlay=True):
+        """Burn captions into [src] as [out] with the configured backend/mode."""
+        if caption_backend == "ass":
+            ass_filter = self._build_ass_captions(
+                script, caption_start, caption_end, temp_dir,
+                typewriter=typewriter, use_overlay=use_overlay,
+            )
+            graph.add([src], ass_filter or "null", out)
+        elif caption_windows and any(isinstance(c, Sprite) for c in caption_images):
+            # In-memory captions: the track is piped to ffmpeg as rawvideo
+            # (one pipe for all captions, so overlay mode is not used)
+            track, caption_band = self._caption_track_frames(caption_images, caption_windows, profile)
+            bx, by, _, _ = caption_band
+            track_start = min(t0 for t0, _ in caption_windows)
+            track_end = max(t1 for _, t1 in caption_windows)
+            graph.add(
+                [src, f"{graph.input(track)}:v"],
+                f"overlay={bx}:{by}"
+                f":enable='between(t,{track_start:.2f},{track_end:.2f})'",
+                out,
+            )
+        elif caption_windows and caption_mode == "track":
+            # Track mode: every caption frame is composited into one
+            # transparent band-sized stream, so ffmpeg decodes each PNG once
+            # and runs a single overlay regardless of word count.
+            track_path, caption_band = self._write_caption_track(
+                caption_images, caption_windows, temp_dir, profile
+            )
+            track_idx = graph.input(track_path, "-f", "concat", "-safe", "0")
+            bx, by, _, _ = caption_band
+            track_start = min(t0 for t0, _ in caption_windows)
+            track_end = max(t1 for _, t1 in caption_windows)
+            graph.add(
+                [src, f"{track_idx}:v"],
+                f"overlay={bx}:{by}"
+                f":enable='between(t,{track_start:.2f},{track_end:.2f})'",
+                out,
+            )
+        elif caption_windows:
+            curr_v = src
+            for i, ((t0, t1), cap) in enumerate(zip(caption_windows, caption_images)):
+                cap_idx = graph.input(cap)
+                x, y = sprite_offset(cap) or (0, 0)
+                curr_v = graph.add(
+                    [curr_v, f"{cap_idx}:v"],
+                    f"overlay={x}:{y}:enable='between(t,{t0:.2f},{t1:.2f})'",
+                    f"v_cap{i}",
+                )
+            graph.add([curr_v], "null", out)
+        else:
+            graph.add([src], "null", out)
+
     # ------------------------------------------------------------------
     # Main build
     # ------------------------------------------------------------------
@@ -127,9 +460,58 @@ class VideoBuilder:
         """
         config keys:
             intro_image, outro_image, middle_images, voiceover_audio,
-            caption_images (list of overlay PNGs), use_overlay (bool)
+            caption_images (list of overlay PNGs), use_overlay (bool),
+            caption_mode ("track" composites all captions into one overlaid
+            stream, "overlay" adds one input + overlay node per caption),
+            caption_backend ("png" overlays caption_images, "ass" burns the
+            script in with libass and ignores caption_images; raises
+            RuntimeError if ffmpeg has no libass),
+            typewriter (bool, ass backend only),
+            motion_engine ("zoompan" or "scale", see reel_generator.motion),
+            render_profile ("final" or "preview", or a RenderProfile; caption
+            images must have been rendered with the same profile),
+            segments (combined digest: per-article images, title, script,
+            voice_duration and, for png captions, caption_images),
+            segment_render ("parallel" renders each segment as its own
+            sub-reel concurrently and stitches them; default: one graph),
+            audio_swap (bool: if only the voiceover changed since the last
+            build of output_file, remux it instead of rendering; only builds
+            with it set keep the silent video this needs),
+            smart_render (bool, single-graph renders: re-render only the
+            GOPs whose images, captions or titles changed since the last
+            build of output_file, from graphs limited to those spans;
+            encodes use fixed closed GOPs and an extra mux pass),
+            outputs (extra renditions, OutputSpec or dicts of its fields,
+            encoded from the same filter pass as output_file),
+            poster (JPEG path written in the same pass), poster_time
+            (seconds; default 1s into the first image),
+            in_memory_frames (bool: titles and flattened layers stay in
+            memory and are piped to ffmpeg; caption_images may then be
+            Sprites from render_captions_to_images(in_memory=True))
         """
+        if config.get("caption_backend") == "ass" and not has_libass():
+            raise RuntimeError(
+                "caption_backend 'ass' needs an FFmpeg build with libass (no 'subtitles' "
+                "filter found); use caption_backend 'png'"
+            )
         ensure_dir(temp_dir)
+        renditions = config.get("outputs") or config.get("poster")
+        # Only output_file has a kept silent video to remux onto
+        if (config.get("audio_swap") and not renditions
+                and self.swap_audio(config, voice_duration, output_file)):
+            return True
+        if config.get("segment_render") == "parallel" and config.get("segments"):
+            built = self._build_segmented(config, voice_duration, output_file, temp_dir)
+        else:
+            built = self._build_single(config, voice_duration, output_file, temp_dir)
+        if built and config.get("audio_swap"):
+            self._keep_mezzanine(config, voice_duration, output_file)
+        return built
+
+    def _build_single(self, config, voice_duration, output_file, temp_dir):
+        """The whole reel as one filter graph (see build_video)."""
+        profile = self._profile(config)
+        W, H, fps = profile.width, profile.height, profile.fps
         use_overlay = config.get("use_overlay", True)
 
         intro_img   = config["intro_image"]
@@ -137,14 +519,17 @@ class VideoBuilder:
         middle_imgs = config["middle_images"]
         voice_audio = config["voiceover_audio"]
         caption_images = config.get("caption_images", [])
+        caption_mode = config.get("caption_mode", "track")
+        caption_backend = config.get("caption_backend", "png")
+        if caption_backend == "ass":
+            caption_images = []
         title_text  = config.get("title", "")
+        in_memory = config.get("in_memory_frames", False)
 
         num_middle = len(middle_imgs)
         
         # ---- Timing Math ----------------------------------------------------
         # The outro MUST start exactly when the voiceover ends.
-        TRANSITION_DURATION = 1.0
-        INTRO_DURATION = 3.0
         outro_offset = INTRO_DURATION + voice_duration  # Hard anchor
         
         # Each xfade transition "eats" TRANSITION_DURATION from the visual timeline.
@@ -161,264 +546,755 @@ class VideoBuilder:
         else:
             per_image_duration = 5.0
 
-        # ---- input arguments ------------------------------------------------
-        inputs = [intro_img] + middle_imgs + [outro_img]
-        video_exts = ('.mp4', '.mov', '.webm', '.mkv')
-        intro_is_video = os.path.splitext(intro_img)[1].lower() in video_exts
-        outro_is_video = os.path.splitext(outro_img)[1].lower() in video_exts
-        input_args = []
-        for img in inputs:
-            is_video = (img == intro_img and intro_is_video) or (img == outro_img and outro_is_video)
-            if is_video:
-                input_args.extend(["-t", "3", "-i", img])
-            elif img in (intro_img, outro_img):
-                input_args.extend(["-loop", "1", "-t", "3", "-i", img])
-            else:
-                input_args.extend(["-i", img])
-
-        input_args.extend(["-i", voice_audio])
-
-        caption_start_idx = len(inputs) + 1
-        for cap in caption_images:
-            input_args.extend(["-i", cap])
-
-        # ---- filter_complex -------------------------------------------------
-        filter_parts = []
-
-        for i in range(len(inputs)):
-            if inputs[i] == intro_img:
-                filter_parts.append(
-                    f"[{i}:v]scale=1080:1920:force_original_aspect_ratio=increase,"
-                    f"crop=1080:1920,fps={ZOOMPAN_FPS},setsar=1[v{i}]"
-                )
-            elif inputs[i] == outro_img:
-                filter_parts.append(
-                    f"[{i}:v]scale=1080:1920:force_original_aspect_ratio=increase,"
-                    f"crop=1080:1920,fps={ZOOMPAN_FPS},setsar=1[v{i}]"
-                )
-            else:
-                zoompan_frames = int(per_image_duration * ZOOMPAN_FPS)
-                img_index = i - 1
-
-                if img_index % 2 == 0:
-                    zp = (
-                        f"zoompan=z='min(zoom+0.0008,1.15)':"
-                        f"d={zoompan_frames}:"
-                        f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-                        f"s=1080x1920:fps={ZOOMPAN_FPS}"
-                    )
-                else:
-                    zp = (
-                        f"zoompan=z='if(eq(on,1),1.15,max(zoom-0.0008,1.0))':"
-                        f"d={zoompan_frames}:"
-                        f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-                        f"s=1080x1920:fps={ZOOMPAN_FPS}"
-                    )
-
-                filter_parts.append(
-                    f"[{i}:v]scale=1280:2275:force_original_aspect_ratio=increase,"
-                    f"crop=1280:2120,{zp},setsar=1[v{i}]"
-                )
+        # ---- Caption timing -------------------------------------------------
+        caption_start = INTRO_DURATION
+        caption_end = outro_offset
+        caption_windows = []
+        if caption_images and caption_end > caption_start:
+            caption_windows = self._caption_windows(
+                config.get("script", ""), len(caption_images), caption_start, caption_end
+            )
 
-        # ---- Transitions: Intro + Middle images -----------------------------
-        last_label = "v0"
+        # ---- Transition offsets ---------------------------------------------
+        # Each xfade transition "eats" TRANSITION_DURATION from the timeline;
+        # offsets are written in 1/100 s and xfade rounds them to a frame
+        offsets = []
         cumulative_duration = INTRO_DURATION
-        
-        for i in range(1, len(inputs) - 1):  # Middle images only
-            next_label = f"v_join_{i}"
-            offset = cumulative_duration - TRANSITION_DURATION
-            transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
-            filter_parts.append(
-                f"[{last_label}][v{i}]xfade=transition={transition}"
-                f":duration={TRANSITION_DURATION}:offset={offset:.2f}[{next_label}]"
-            )
-            last_label = next_label
+        for _ in middle_imgs:
+            offsets.append(cumulative_duration - TRANSITION_DURATION)
             cumulative_duration += (per_image_duration - TRANSITION_DURATION)
+        offsets.append(outro_offset)
+        starts = [0] + [math.floor(round(o, 2) * fps + 0.5) for o in offsets]
+        fade_frames = round(TRANSITION_DURATION * fps)
 
-        filter_parts.append(f"[{last_label}]null[v_base_middle]")
-
-        # ---- Caption overlays ------------------------------------------------
-        num_captions = len(caption_images)
-        caption_start = INTRO_DURATION
-        caption_end = outro_offset
+        # ---- Ken Burns clips (cached across renders) -------------------------
+        # Long enough to last through the transition to the next clip
+        zoompan_frames = max(
+            (nxt + fade_frames - st for st, nxt in zip(starts[1:-1], starts[2:])),
+            default=int(per_image_duration * fps),
+        )
+        motion_engine = config.get("motion_engine", "zoompan")
+        motion_clips = self._motion_clips(
+            [(img, zoompan_frames, i % 2 == 0) for i, img in enumerate(middle_imgs)],
+            profile, motion_engine,
+        )
 
-        if num_captions and caption_end > caption_start:
-            caption_window = caption_end - caption_start
-            
-            from .caption_generator import split_into_chunks
-            script_text = config.get("script", "")
-            chunks = split_into_chunks(script_text)
-            
-            # Compute per-sentence time window (weighted by word count)
-            chunk_word_counts = [max(len(c.split()), 1) for c in chunks]
-            total_words = sum(chunk_word_counts)
-            
-            chunk_windows = []
-            t = caption_start
-            for cw in chunk_word_counts:
-                fraction = cw / total_words
-                chunk_windows.append((t, t + fraction * caption_window))
-                t += fraction * caption_window
-            
-            is_typewriter = num_captions > len(chunks)
-            
-            curr_v = "v_base_middle"
-            if is_typewriter:
-                # Typewriter mode: multiple sub-frames per sentence
-                for i in range(num_captions):
-                    cap_idx = caption_start_idx + i
-                    
-                    # Find which chunk/word this frame belongs to
-                    chunk_idx = 0
-                    word_idx = 0
-                    frame_counter = 0
-                    found = False
-                    for ci, chunk in enumerate(chunks):
-                        words_in_chunk = len(chunk.split())
-                        for wi in range(words_in_chunk):
-                            if frame_counter == i:
-                                chunk_idx = ci
-                                word_idx = wi
-                                found = True
-                                break
-                            frame_counter += 1
-                        if found:
-                            break
-                    
-                    chunk_start_t, chunk_end_t = chunk_windows[chunk_idx]
-                    chunk_dur = chunk_end_t - chunk_start_t
-                    chunk_words = chunks[chunk_idx].split()
-                    char_weights = [max(len(w), 2) for w in chunk_words]
-                    total_chars = sum(char_weights)
-                    
-                    t0 = chunk_start_t + sum(char_weights[:word_idx]) / total_chars * chunk_dur
-                    t1 = chunk_start_t + sum(char_weights[:word_idx + 1]) / total_chars * chunk_dur
-                    
-                    nxt = f"v_cap{i}"
-                    filter_parts.append(
-                        f"[{curr_v}][{cap_idx}:v]overlay=0:0"
-                        f":enable='between(t,{t0:.2f},{t1:.2f})'[{nxt}]"
-                    )
-                    curr_v = nxt
-            else:
-                # Static mode: one caption per sentence
-                for i in range(num_captions):
-                    cap_idx = caption_start_idx + i
-                    chunk_i = min(i, len(chunk_windows) - 1)
-                    t0, t1 = chunk_windows[chunk_i]
-                    
-                    nxt = f"v_cap{i}"
-                    filter_parts.append(
-                        f"[{curr_v}][{cap_idx}:v]overlay=0:0"
-                        f":enable='between(t,{t0:.2f},{t1:.2f})'[{nxt}]"
-                    )
-                    curr_v = nxt
-            filter_parts.append(f"[{curr_v}]null[v_captioned]")
-        else:
-            filter_parts.append("[v_base_middle]null[v_captioned]")
+        # ---- Brand cards (conformed once per asset version) ------------------
+        intro_card = self._conform_brand_card(intro_img, profile)
+        outro_card = self._conform_brand_card(outro_img, profile)
 
-        # ---- Title overlay ---------------------------------------------------
+        # ---- Static layers: titles + news frame -------------------------------
+        # Collected as (png, t0, t1) in z-order and pre-flattened per time
+        # window, so each frame pays for at most one full-frame blend.
+        layers = []
         segments = config.get("segments")
-        next_input_idx = len(inputs) + 1 + len(caption_images)
-
-        title_png = None
-        if title_text:
-            title_png = self._render_title_png(title_text, temp_dir, use_overlay=use_overlay)
 
         if segments:
             # Combined reel: per-article title overlays
-            # Calculate time windows per segment
             seg_start = INTRO_DURATION
-            curr_v = "v_captioned"
-            for seg_i, seg in enumerate(segments):
+            seg_title_paths = {}
+            for seg in segments:
                 seg_end = seg_start + seg["voice_duration"]
-                # Render title for segment, passing use_overlay
-                seg_title_png = self._render_title_png(seg["title"], temp_dir, use_overlay=use_overlay)
-                # Rename to avoid overwriting
-                import shutil
-                seg_title_path = os.path.join(temp_dir, f"title_seg_{seg_i}.png")
-                shutil.copy(seg_title_png, seg_title_path)
-                input_args.extend(["-i", seg_title_path])
-                nxt = f"v_title_{seg_i}"
-                filter_parts.append(
-                    f"[{curr_v}][{next_input_idx}:v]overlay=0:0"
-                    f":enable='between(t,{seg_start:.2f},{seg_end:.2f})'[{nxt}]"
-                )
-                curr_v = nxt
-                next_input_idx += 1
+                # One PNG per distinct title
+                if seg["title"] not in seg_title_paths:
+                    seg_title_path = self._render_title_png(
+                        seg["title"], temp_dir, use_overlay=use_overlay, profile=profile,
+                        in_memory=in_memory,
+                    )
+                    if not in_memory:
+                        # Rename to avoid overwriting
+                        seg_title_png = seg_title_path
+                        seg_title_path = os.path.join(temp_dir, f"title_seg_{len(seg_title_paths)}.png")
+                        os.replace(seg_title_png, seg_title_path)
+                    seg_title_paths[seg["title"]] = seg_title_path
+                layers.append((seg_title_paths[seg["title"]], seg_start, seg_end))
                 seg_start = seg_end
-            pre_outro_label = curr_v
-        elif title_png:
+        elif title_text:
             # Single reel: one title for entire content section
-            input_args.extend(["-i", title_png])
-            filter_parts.append(
-                f"[v_captioned][{next_input_idx}:v]overlay=0:0"
-                f":enable='between(t,{caption_start},{outro_offset:.2f})'[v_titled]"
-            )
-            pre_outro_label = "v_titled"
-            next_input_idx += 1
-        else:
-            pre_outro_label = "v_captioned"
+            title_png = self._render_title_png(title_text, temp_dir, use_overlay=use_overlay,
+                                               profile=profile, in_memory=in_memory)
+            layers.append((title_png, caption_start, outro_offset))
 
-        # ---- News Frame Overlay (Stylistic) ---------------------------------
         # Replace the simple black border with the thematic news overlay
-        overlay_path = "assets/main_overlay.png"
-        if use_overlay and os.path.exists(overlay_path):
-            input_args.extend(["-i", overlay_path])
-            # Scale overlay to 1080x1920
-            filter_parts.append(
-                f"[{next_input_idx}:v]scale=1080:1920[ov_scaled]"
+        frame = self._frame_layer(use_overlay, profile)
+        if frame:
+            layers.append((frame, 0.0, None))
+
+        # ---- inputs + filter graph ------------------------------------------
+        # Identical inputs (same file, same options) are opened once; the
+        # graph references the shared stream from every node that needs it.
+        inputs = [intro_img] + middle_imgs + [outro_img]
+        outro_idx = len(inputs) - 1
+
+        def timeline_graph(start=0, end=None):
+            """The reel's graph ([v_final]); with `end`, only frames start..end.
+
+            A span graph opens only the clips on screen in the span, trimmed
+            to it, and counts xfade offsets from its first frame; captions
+            and layers see reel time. A span starting inside a transition is
+            rendered from the transition's first frame and trimmed after.
+            """
+            end = total_frames if end is None else end
+            begin = max([st for st in starts if st <= start < st + fade_frames and st], default=start)
+            first = max([i for i, st in enumerate(starts) if st < begin], default=0)
+            last = max(i for i, st in enumerate(starts) if st < end or i == 0)
+            graph = FilterGraph()
+            final = "v_reel" if begin else "v_final"
+
+            def finish(label):
+                if begin:
+                    # Back to span time: the encoder would pad from 0 otherwise
+                    trim = [f"trim=start_frame={start - begin}"] if start > begin else []
+                    graph.add([label], [*trim, "setpts=PTS-STARTPTS"], "v_final")
+                return graph
+
+            def add_clip(i):
+                if i == 0:
+                    self._add_card(graph, intro_img, intro_card, "v0", profile)
+                elif i == outro_idx:
+                    self._add_card(graph, outro_img, outro_card, f"v{i}", profile)
+                elif (i - 1) in motion_clips:
+                    idx = graph.input(motion_clips[i - 1])
+                    # xfade needs matching time bases; MP4 clips come in at 1/15360
+                    graph.add([f"{idx}:v"], [f"fps={fps}", "setsar=1", "format=yuv444p"], f"v{i}")
+                else:
+                    idx = graph.input(inputs[i])
+                    # fps gives zoompan's frames a duration and drops the last
+                    # one, which has none, hence the spare frame
+                    zp = kenburns_filter(zoompan_frames + 1, (i - 1) % 2 == 0, W, H, fps,
+                                         motion_engine)
+                    graph.add([f"{idx}:v"], [zp, f"fps={fps}", "setsar=1", "format=yuv444p"], f"v{i}")
+                if i != first or begin == starts[i]:
+                    return f"v{i}"
+                # setpts drops the frame rate xfade needs; fps puts it back
+                return graph.add([f"v{i}"], [f"trim=start_frame={begin - starts[i]}",
+                                             "setpts=PTS-STARTPTS", f"fps={fps}"], f"v{i}_trimmed")
+
+            def offset_arg(i):
+                # The full graph keeps reel seconds; a span counts from `begin`
+                if not begin:
+                    return f"{offsets[i - 1]:.2f}"
+                return f"{(starts[i] - begin) / fps:.4f}"
+
+            if first == outro_idx:
+                return finish(add_clip(outro_idx))
+
+            # ---- Transitions: Intro + Middle images -------------------------
+            last_label = add_clip(first)
+            for i in range(first + 1, min(last, outro_idx - 1) + 1):  # Middle images only
+                transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
+                last_label = graph.add(
+                    [last_label, add_clip(i)],
+                    f"xfade=transition={transition}"
+                    f":duration={TRANSITION_DURATION}:offset={offset_arg(i)}",
+                    f"v_join_{i}",
+                )
+            # Captions and layers are timed in reel seconds
+            graph.add([last_label], [f"setpts=PTS+{begin}/({fps}*TB)", f"fps={fps}"] if begin else "null",
+                      "v_base_middle")
+
+            # ---- Caption overlays --------------------------------------------
+            self._add_captions(
+                graph, "v_base_middle", "v_captioned", caption_backend, caption_mode,
+                caption_images, caption_windows, config.get("script", ""),
+                caption_start, caption_end, temp_dir, profile,
+                typewriter=config.get("typewriter", True), use_overlay=use_overlay,
             )
-            filter_parts.append(
-                f"[{pre_outro_label}][ov_scaled]overlay=0:0[v_framed]"
+            pre_outro_label = self._add_layers(graph, "v_captioned", layers,
+                                               None if in_memory else temp_dir, profile)
+            # Fixed formats around the overlays: a span graph converts its
+            # frames exactly as the full graph does
+            pre_outro_label = graph.add([pre_outro_label], "format=yuv444p", "v_pre_outro")
+
+            # ---- Attach Outro with xfade at exactly outro_offset -------------
+            if last < outro_idx:
+                return finish(graph.add([pre_outro_label], "null", final))
+            outro_transition = TRANSITION_STYLES[(outro_idx - 1) % len(TRANSITION_STYLES)]
+            graph.add(
+                [pre_outro_label, add_clip(outro_idx)],
+                f"xfade=transition={outro_transition}"
+                f":duration={TRANSITION_DURATION}:offset={offset_arg(outro_idx)}",
+                final,
             )
-            pre_outro_label = "v_framed"
-            next_input_idx += 1
-        elif use_overlay:
-            logger.warning(f"Overlay requested but not found: {overlay_path}")
+            return finish(final)
 
-        # ---- Attach Outro with xfade at exactly outro_offset -----------------
-        outro_idx = len(inputs) - 1
-        outro_transition = TRANSITION_STYLES[(outro_idx - 1) % len(TRANSITION_STYLES)]
-        filter_parts.append(
-            f"[{pre_outro_label}][v{outro_idx}]xfade=transition={outro_transition}"
-            f":duration={TRANSITION_DURATION}:offset={outro_offset:.2f}[v_final]"
-        )
+        # ---- assemble command -----------------------------------------------
+        # The outro card runs 3s past outro_offset
+        duration = outro_offset + 3.0
+        total_frames = round(duration * fps)
+        if config.get("smart_render") and (config.get("outputs") or config.get("poster")):
+            logger.info("Smart render keeps one output only; rendering all outputs in full")
+        elif config.get("smart_render") and self.mezzanine_dir:
+            # What is on screen when, fingerprinted, so the next render can
+            # tell which time windows an edit touched
+            step = per_image_duration - TRANSITION_DURATION
+            windows = [(0.0, INTRO_DURATION, intro_img), (outro_offset, duration, outro_img)]
+            windows += [
+                (INTRO_DURATION - TRANSITION_DURATION + k * step,
+                 INTRO_DURATION - TRANSITION_DURATION + k * step + per_image_duration, img)
+                for k, img in enumerate(middle_imgs)
+            ]
+            windows += [(t0, t1, png) for png, (t0, t1) in zip(caption_images, caption_windows)]
+            if caption_backend == "ass":
+                # The subtitle events follow the script's wording and wrapping
+                windows.append((caption_start, caption_end, config.get("script", "")))
+            windows += [(t0, duration if t1 is None else t1, png) for png, t0, t1 in layers]
+            key = self._timeline_key(
+                config, fps, exclude=SMART_WINDOWED_KEYS,
+                extra=[num_middle, len(caption_images), round(voice_duration * fps)],
+            )
+            # The GOPs are silent; the voiceover is added when they are muxed
+            return self._smart_encode(timeline_graph, "v_final", key, windows, config,
+                                      voice_duration, output_file, temp_dir, profile, duration)
 
         # ---- Audio: starts at 3s, plays full voiceover, hard trimmed ---------
-        audio_idx = len(inputs)
-        filter_parts.append(
-            f"[{audio_idx}:a]atrim=0:{voice_duration:.2f},asetpts=PTS-STARTPTS,"
-            f"adelay=3000|3000[a_delayed]"
-        )
+        graph = timeline_graph()
+        audio_idx = graph.input(voice_audio)
+        graph.add([f"{audio_idx}:a"], self._voice_filters(voice_duration), "a_delayed")
+        return self._encode(graph, "v_final", "a_delayed", output_file, temp_dir, profile,
+                            duration, config)
 
-        # ---- assemble command -----------------------------------------------
+    def _encode(self, graph, video_label, audio_label, output_file, temp_dir, profile, duration,
+                config=None):
+        """Run `graph` through the delivery encoder; sets last_stats, returns success.
+
+        config's outputs and poster are encoded from the same pass: the
+        graph's output is split once per rendition, so images, motion and
+        captions are decoded and composited only once.
+        """
+        config = config or {}
+        specs = [get_output_spec(o) for o in config.get("outputs") or ()]
+        poster = config.get("poster")
+        outputs = [(video_label, audio_label, self._encoder_args(profile), output_file)]
+        if specs or poster:
+            videos = graph.add([video_label], f"split={1 + len(specs) + bool(poster)}",
+                               [f"v_out{k}" for k in range(1 + len(specs) + bool(poster))])
+            audios = [audio_label]
+            if specs:
+                audios = graph.add([audio_label], f"asplit={1 + len(specs)}",
+                                   [f"a_out{k}" for k in range(1 + len(specs))])
+            outputs = [(videos[0], audios[0], self._encoder_args(profile), output_file)]
+            for k, spec in enumerate(specs, 1):
+                w, h = spec.width or profile.width, spec.height or profile.height
+                label = videos[k]
+                if (w, h) != (profile.width, profile.height):
+                    crop_w, crop_h = crop_to_aspect(profile.width, profile.height, w, h)
+                    label = graph.add([label], [f"crop={crop_w}:{crop_h}", f"scale={w}:{h}", "setsar=1"],
+                                      f"v_out{k}_sized")
+                outputs.append((label, audios[k], self._encoder_args(profile, spec), spec.path))
+            if poster:
+                frame = round(config.get("poster_time", INTRO_DURATION + 1.0) * profile.fps)
+                graph.add([videos[-1]], f"trim=start_frame={frame}:end_frame={frame + 1}", "v_poster")
+
+        script_path = graph.write_script(os.path.join(temp_dir, "filter_graph.txt"))
         cmd = ["ffmpeg", "-y"]
-        cmd.extend(input_args)
-        cmd.extend([
-            "-filter_complex", ";".join(filter_parts),
-            "-map", "[v_final]",
-            "-map", "[a_delayed]",
-            "-c:v", self._hw_encoder,
-            "-pix_fmt", "yuv420p",
-            "-r", str(self.fps),
-        ])
+        cmd.extend(graph.input_args)
+        cmd.extend(["-filter_complex_script", script_path])
+        for video, audio, encoder_args, path in outputs:
+            cmd.extend(["-map", f"[{video}]", "-map", f"[{audio}]", *encoder_args, path])
+        if poster:
+            cmd.extend(["-map", "[v_poster]", "-frames:v", "1", "-q:v", "2", "-update", "1", poster])
+
+        logger.info(f"Running FFmpeg (filter graph {script_path}): {graph.stats()}")
+        logger.debug(f"FFmpeg command: {' '.join(map(str, cmd))}")
+        self.last_stats = None
+        try:
+            self.last_stats = run_ffmpeg(
+                cmd, "build_video", duration=duration, on_progress=self.on_progress
+            )
+            logger.info(
+                f"FFmpeg execution successful: {self.last_stats.fps:.1f} fps, "
+                f"{self.last_stats.speed:.2f}x realtime"
+            )
+            return True
+        except RuntimeError as e:
+            logger.error(f"FFmpeg Failure: {e}")
+            return False
 
+    def _encoder_args(self, profile, spec=None):
+        """Delivery video encoder options; an OutputSpec's bitrate/preset override the profile's."""
+        bitrate = spec.bitrate if spec else None
+        args = ["-c:v", self._hw_encoder, "-pix_fmt", "yuv420p", "-r", str(profile.fps)]
         # Encoder‑specific options
         if self._hw_encoder == "h264_videotoolbox":
-            cmd.extend(["-b:v", "5M"])         # target bitrate for HW enc
+            args.extend(["-b:v", bitrate or "5M"])         # target bitrate for HW enc
         else:
-            cmd.extend(["-preset", "medium"])  # balanced quality/speed
+            # medium for final: balanced quality/speed
+            args.extend(["-preset", (spec.preset if spec else None) or profile.preset])
+            if bitrate:
+                args.extend(["-b:v", bitrate, "-maxrate", bitrate, "-bufsize", bitrate])
+            elif profile.crf is not None:
+                args.extend(["-crf", str(profile.crf)])
+        return args
 
-        cmd.append(output_file)
+    @staticmethod
+    def _voice_filters(voice_duration):
+        """Audio chain: the voiceover starts after the intro, hard trimmed."""
+        delay = int(INTRO_DURATION * 1000)
+        return [f"atrim=0:{voice_duration:.2f}", "asetpts=PTS-STARTPTS", f"adelay={delay}|{delay}"]
 
-        logger.info(f"Running FFmpeg: {' '.join(cmd)}")
+    # ------------------------------------------------------------------
+    # Audio swap: remux a new voiceover onto the kept silent video
+    # ------------------------------------------------------------------
+    def _timeline_key(self, config, fps, exclude=(), extra=()):
+        """Hash of everything that shapes the picture; the voiceover is left out.
+
+        Files are hashed by content (captions are re-rendered into temp dirs
+        on every run) and segment durations are counted in frames. `exclude`
+        drops further top-level config keys; `extra` is hashed along.
+        """
+        def normalize(value, key=None):
+            if isinstance(value, dict):
+                return {k: normalize(v, k) for k, v in sorted(value.items())
+                        if k not in ("voiceover_audio", "audio_swap")}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            if key == "voice_duration":
+                return round(value * fps)
+            if isinstance(value, str) and os.path.isfile(value):
+                return file_digest(value)
+            if isinstance(value, Sprite):
+                return value.digest()
+            return value if isinstance(value, (str, int, float, bool, type(None))) else repr(value)
+
+        config = {k: v for k, v in config.items() if k not in exclude}
+        blob = json.dumps([normalize(config), self._hw_encoder, fps, list(extra)], sort_keys=True)
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _mezzanine_base(self, output_file):
+        path = os.path.abspath(output_file)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"{stem}_{hashlib.sha256(path.encode()).hexdigest()[:8]}"
+        return os.path.join(self.mezzanine_dir, name)
+
+    def _mezzanine_paths(self, output_file):
+        base = self._mezzanine_base(output_file)
+        return base + ".mp4", base + ".json"
+
+    def _evict_mezzanine(self, keep):
+        """Keep mezzanine_dir within MEZZANINE_MAX_MB (LRU, as the clip cache)."""
+        ClipCache(self.mezzanine_dir, max_mb=MEZZANINE_MAX_MB).evict(keep=keep)
+
+    def _keep_mezzanine(self, config, voice_duration, output_file):
+        """Copy the video stream of a fresh build aside, with its timeline key."""
+        if not self.mezzanine_dir:
+            return
+        fps = self._profile(config).fps
+        video, meta = self._mezzanine_paths(output_file)
+        ensure_dir(self.mezzanine_dir)
+        tmp = f"{video[:-4]}.tmp{os.getpid()}.mp4"
+        try:
+            run_ffmpeg(["ffmpeg", "-y", "-i", output_file, "-map", "0:v", "-c", "copy", tmp],
+                       "mezzanine", duration=INTRO_DURATION + voice_duration + 3.0)
+            os.replace(tmp, video)
+            with open(meta, "w") as f:
+                json.dump({
+                    "timeline": self._timeline_key(config, fps),
+                    "anchor_frame": round(voice_duration * fps),
+                }, f)
+            self._evict_mezzanine(keep=video)
+        except (RuntimeError, OSError) as e:
+            logger.warning(f"Could not keep silent video for {output_file}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def swap_audio(self, config, voice_duration, output_file):
+        """Remux config["voiceover_audio"] onto the video kept from the last build.
+
+        Only valid while the picture would be identical: same timeline key
+        and the outro anchor on the same frame. Returns False (nothing
+        written) when a full render is needed.
+        """
+        if not self.mezzanine_dir:
+            return False
+        fps = self._profile(config).fps
+        video, meta = self._mezzanine_paths(output_file)
         try:
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True
+            with open(meta) as f:
+                kept = json.load(f)
+        except (OSError, ValueError):
+            logger.info(f"No silent video kept for {output_file}; full render")
+            return False
+        if not os.path.isfile(video) or kept.get("timeline") != self._timeline_key(config, fps):
+            logger.info(f"Visual timeline of {output_file} changed; full render")
+            return False
+        if kept.get("anchor_frame") != round(voice_duration * fps):
+            logger.info(
+                f"New voiceover moves the outro anchor of {output_file} "
+                f"({kept.get('anchor_frame')} -> {round(voice_duration * fps)} frames); full render"
             )
-            logger.info("FFmpeg execution successful.")
+            return False
+
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", video,
+            "-i", config["voiceover_audio"],
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy",
+            "-af", ",".join(self._voice_filters(voice_duration)),
+            "-c:a", "aac",
+            output_file,
+        ]
+        self.last_stats = None
+        try:
+            self.last_stats = run_ffmpeg(
+                cmd, "audio_swap", duration=INTRO_DURATION + voice_duration + 3.0,
+                on_progress=self.on_progress,
+            )
+        except RuntimeError as e:
+            logger.warning(f"Audio swap failed, rendering in full: {e}")
+            return False
+        os.utime(video)  # mark as recently used
+        logger.info(f"Remuxed new voiceover onto kept video: {output_file}")
+        return True
+
+    # ------------------------------------------------------------------
+    # Smart render: re-encode only the GOPs an edit touched
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _fingerprint(value):
+        if isinstance(value, Sprite):
+            return value.digest()
+        return file_digest(value) if isinstance(value, str) and os.path.isfile(value) else value
+
+    def _smart_encode(self, timeline_graph, video_label, key, windows, config, voice_duration,
+                      output_file, temp_dir, profile, duration):
+        """Encode the reel into its GOP store, then mux the GOPs with the voiceover.
+
+        The store holds one file per fixed, closed GOP plus an index of the
+        reel key and the fingerprinted (t0, t1, content) windows it was
+        rendered from. When the key matches, only GOPs overlapping a window
+        that appeared or disappeared are encoded, each run of them from a
+        graph of just that span (timeline_graph(start, end), see
+        _build_single); the rest are stream-copied. The graphs must not
+        carry audio. Returns success.
+
+        The store lives in mezzanine_dir, under its MEZZANINE_MAX_MB budget.
+        """
+        fps = profile.fps
+        gop = max(1, round(SMART_GOP_SECONDS * fps))
+        total = round(duration * fps)
+        store = self._mezzanine_base(output_file) + "_gops"
+        index_path = store + ".json"
+        windows = {(round(t0 * fps), round(t1 * fps), str(self._fingerprint(v))) for t0, t1, v in windows}
+
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        n_gops = index.get("gops", -(-total // gop))
+
+        def gop_path(g):
+            return os.path.join(store, f"gop_{g:05d}.mp4")
+
+        if (index.get("key") == key and index.get("gop") == gop
+                and all(os.path.isfile(gop_path(g)) for g in range(n_gops))):
+            changed = windows ^ {tuple(w) for w in index["windows"]}
+            dirty = sorted({
+                g for f0, f1, _ in changed
+                for g in range(f0 // gop, min(n_gops, (max(f1, f0 + 1) - 1) // gop + 1))
+            })
+            logger.info(f"Smart render: {len(dirty)}/{n_gops} GOPs changed")
+            for g in range(n_gops):
+                os.utime(gop_path(g))  # mark as recently used
+        else:
+            n_gops = -(-total // gop)
+            dirty = list(range(n_gops))
+            logger.info(f"Smart render: full render into {n_gops} GOPs")
+
+        self.last_stats = None
+        try:
+            if dirty:
+                written = self._encode_gops(timeline_graph, video_label, dirty, gop, n_gops,
+                                            total, store, temp_dir, profile)
+                if len(dirty) == n_gops:
+                    n_gops = written  # the graph may end a few frames short
+                with open(index_path, "w") as f:
+                    json.dump({"key": key, "gop": gop, "gops": n_gops, "windows": sorted(windows)}, f)
+
+            concat = os.path.join(temp_dir, "smart_gops.txt")
+            with open(concat, "w") as f:
+                f.write("ffconcat version 1.0\n")
+                f.writelines(f"file '{os.path.abspath(gop_path(g))}'\n" for g in range(n_gops))
+            cmd = [
+                "ffmpeg", "-y",
+                "-f", "concat", "-safe", "0", "-i", concat,
+                "-i", config["voiceover_audio"],
+                "-map", "0:v", "-map", "1:a",
+                "-c:v", "copy",
+                "-af", ",".join(self._voice_filters(voice_duration)),
+                "-c:a", "aac",
+                output_file,
+            ]
+            stats = run_ffmpeg(cmd, "smart_mux", duration=duration)
+            self.last_stats = self.last_stats or stats
+            self._evict_mezzanine(keep=index_path)
             return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg Failure: {e.stderr}")
+        except (RuntimeError, OSError) as e:
+            logger.error(f"Smart render failed: {e}")
             return False
+
+    def _encode_gops(self, timeline_graph, video_label, dirty, gop, n_gops, total, store,
+                     temp_dir, profile):
+        """Encode GOPs `dirty` of the reel into `store`, one file per GOP.
+
+        Each run of consecutive dirty GOPs is rendered from a graph of just
+        that span, so unchanged frames are not decoded or composited.
+        Returns the number of GOPs written.
+        """
+        runs = []
+        for g in dirty:
+            if runs and runs[-1][1] == g:
+                runs[-1][1] = g + 1
+            else:
+                runs.append([g, g + 1])
+        written = 0
+        for a, b in runs:
+            full = b - a == n_gops
+            graph = timeline_graph(a * gop, None if full else min(b * gop, total))
+            parts = self._encode_span(graph, video_label, b - a, gop, total - a * gop,
+                                      temp_dir, profile)
+            if len(parts) != b - a and not full:
+                raise RuntimeError(f"expected {b - a} GOPs, FFmpeg wrote {len(parts)}")
+            ensure_dir(store)
+            for g, part in enumerate(parts, a):
+                os.replace(part, os.path.join(store, f"gop_{g:05d}.mp4"))
+            written += len(parts)
+        return written
+
+    def _encode_span(self, graph, label, n, gop, remaining, temp_dir, profile):
+        """Encode the first `n` GOPs of the graph's [label] into staging; returns the parts."""
+        fps = profile.fps
+        frames = min(n * gop, remaining)
+
+        staging = os.path.join(temp_dir, "smart_gops")
+        shutil.rmtree(staging, ignore_errors=True)
+        ensure_dir(staging)
+        script_path = graph.write_script(os.path.join(temp_dir, "filter_graph.txt"))
+        cmd = ["ffmpeg", "-y", *graph.input_args, "-filter_complex_script", script_path,
+               "-map", f"[{label}]", *self._encoder_args(profile),
+               "-g", str(gop), "-keyint_min", str(gop), "-flags", "+cgop"]
+        if self._hw_encoder != "h264_videotoolbox":
+            cmd.extend(["-sc_threshold", "0"])
+        cmd.extend(["-frames:v", str(frames), "-f", "segment", "-segment_format", "mp4",
+                    "-reset_timestamps", "1"])
+        if n > 1:
+            cmd.extend(["-segment_frames", ",".join(str(k * gop) for k in range(1, n))])
+        cmd.append(os.path.join(staging, "part_%05d.mp4"))
+
+        logger.info(f"Running FFmpeg (filter graph {script_path}): {graph.stats()}")
+        logger.debug(f"FFmpeg command: {' '.join(map(str, cmd))}")
+        self.last_stats = run_ffmpeg(
+            cmd, "smart_render", duration=frames / fps, on_progress=self.on_progress
+        )
+        return [os.path.join(staging, part) for part in sorted(os.listdir(staging))]
+
+    # ------------------------------------------------------------------
+    # Combined digest: segments rendered in parallel, then stitched
+    # ------------------------------------------------------------------
+    def _build_segmented(self, config, voice_duration, output_file, temp_dir):
+        """Render each config["segments"] entry as a sub-reel in parallel and stitch them.
+
+        A segment gets its own images, captions and title, timed to its own
+        voiceover. Its clip is fully faded in when that voiceover starts and
+        runs until the next one starts (the last also spans the outro
+        transition), so the stitch only places the clips on the timeline,
+        crossfades them and adds the intro, outro, news frame and audio.
+        Segments are encoded losslessly; the stitch is the only lossy encode.
+        """
+        profile = self._profile(config)
+        fps = profile.fps
+        use_overlay = config.get("use_overlay", True)
+        segments = config["segments"]
+        motion_engine = config.get("motion_engine", "zoompan")
+
+        # ---- Timeline ----------------------------------------------------------
+        starts, t = [], INTRO_DURATION
+        for seg in segments:
+            starts.append(t)
+            t += seg["voice_duration"]
+        # The outro and audio are anchored on the whole voiceover; segments
+        # that don't add up to it can't be placed, so render one graph
+        if abs(t - (INTRO_DURATION + voice_duration)) > 1 / fps:
+            logger.warning(
+                f"Segment voiceovers total {t - INTRO_DURATION:.2f}s, voiceover is "
+                f"{voice_duration:.2f}s; rendering as one graph"
+            )
+            return self._build_single(config, voice_duration, output_file, temp_dir)
+        outro_offset = t
+        lengths = [seg["voice_duration"] + TRANSITION_DURATION for seg in segments]
+        lengths[-1] += TRANSITION_DURATION
+
+        # ---- Ken Burns clips for every segment in one pool --------------------
+        plans, jobs = [], []
+        for seg, length in zip(segments, lengths):
+            n = len(seg["images"])
+            per_image = (length + (n - 1) * TRANSITION_DURATION) / n if n else length
+            frames = int(per_image * fps)
+            plans.append((per_image, frames, len(jobs)))
+            jobs.extend((img, frames, i % 2 == 0) for i, img in enumerate(seg["images"]))
+        motion_clips = self._motion_clips(jobs, profile, motion_engine)
+
+        # ---- Segments in parallel -----------------------------------------------
+        workers, threads = BUDGET.plan(len(segments))
+
+        def render(k):
+            per_image, frames, first_job = plans[k]
+            clips = [motion_clips.get(first_job + i) for i in range(len(segments[k]["images"]))]
+            seg_dir = os.path.join(temp_dir, f"segment_{k}")
+            ensure_dir(seg_dir)
+            return self._render_segment(
+                k, segments[k], lengths[k], per_image, frames, clips,
+                seg_dir, profile, config, threads,
+            )
+
+        logger.info(f"Rendering {len(segments)} segments ({workers} workers × {threads} threads)")
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                bodies = list(pool.map(render, range(len(segments))))
+        except (RuntimeError, OSError) as e:
+            logger.error(f"Segment render failed: {e}")
+            return False
+
+        # ---- Stitch ----------------------------------------------------------------
+        graph = FilterGraph()
+        self._add_card(graph, config["intro_image"],
+                       self._conform_brand_card(config["intro_image"], profile), "v_intro", profile)
+        last = "v_intro"
+        for k, body in enumerate(bodies):
+            idx = graph.input(body)
+            graph.add([f"{idx}:v"], [f"fps={fps}", "setsar=1"], f"v_seg{k}")
+            transition = TRANSITION_STYLES[k % len(TRANSITION_STYLES)]
+            last = graph.add(
+                [last, f"v_seg{k}"],
+                f"xfade=transition={transition}"
+                f":duration={TRANSITION_DURATION}:offset={starts[k] - TRANSITION_DURATION:.2f}",
+                f"v_join_{k}",
+            )
+        frame = self._frame_layer(use_overlay, profile)
+        if frame:
+            last = self._add_layers(graph, last, [(frame, 0.0, None)],
+                                    None if config.get("in_memory_frames") else temp_dir, profile)
+
+        self._add_card(graph, config["outro_image"],
+                       self._conform_brand_card(config["outro_image"], profile), "v_outro", profile)
+        transition = TRANSITION_STYLES[len(bodies) % len(TRANSITION_STYLES)]
+        graph.add(
+            [last, "v_outro"],
+            f"xfade=transition={transition}"
+            f":duration={TRANSITION_DURATION}:offset={outro_offset:.2f}",
+            "v_final",
+        )
+        audio_idx = graph.input(config["voiceover_audio"])
+        graph.add([f"{audio_idx}:a"], self._voice_filters(voice_duration), "a_delayed")
+        return self._encode(graph, "v_final", "a_delayed", output_file, temp_dir, profile,
+                            outro_offset + 3.0, config)
+
+    def _render_segment(self, k, seg, length, per_image, frames, clips, seg_dir,
+                        profile, config, threads):
+        """One digest segment (images, captions, title) as a lossless clip of `length` s.
+
+        Segment time 0 is TRANSITION_DURATION before its voiceover starts.
+        """
+        W, H, fps = profile.width, profile.height, profile.fps
+        use_overlay = config.get("use_overlay", True)
+        in_memory = config.get("in_memory_frames", False)
+        graph = FilterGraph()
+
+        images = seg["images"]
+        if not images:
+            graph.add([], f"color=c=black:s={W}x{H}:d={length:.3f}:r={fps}", "seg_base")
+        else:
+            for i, img in enumerate(images):
+                if clips[i]:
+                    idx = graph.input(clips[i])
+                    graph.add([f"{idx}:v"], [f"fps={fps}", "setsar=1"], f"s{i}")
+                else:
+                    idx = graph.input(img)
+                    zp = kenburns_filter(frames, i % 2 == 0, W, H, fps,
+                                         config.get("motion_engine", "zoompan"))
+                    graph.add([f"{idx}:v"], [zp, "setsar=1"], f"s{i}")
+            last = "s0"
+            for i in range(1, len(images)):
+                transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
+                offset = i * (per_image - TRANSITION_DURATION)
+                last = graph.add(
+                    [last, f"s{i}"],
+                    f"xfade=transition={transition}"
+                    f":duration={TRANSITION_DURATION}:offset={offset:.2f}",
+                    f"s_join_{i}",
+                )
+            graph.add([last], "null", "seg_base")
+
+        # Captions and title cover the segment's voiceover
+        t0 = TRANSITION_DURATION
+        t1 = t0 + seg["voice_duration"]
+        caption_images = seg.get("caption_images", [])
+        caption_backend = config.get("caption_backend", "png")
+        windows = []
+        if caption_images and caption_backend != "ass":
+            windows = self._caption_windows(seg.get("script", ""), len(caption_images), t0, t1)
+        self._add_captions(
+            graph, "seg_base", "seg_captioned", caption_backend,
+            config.get("caption_mode", "track"), caption_images, windows,
+            seg.get("script", ""), t0, t1, seg_dir, profile,
+            typewriter=config.get("typewriter", True), use_overlay=use_overlay,
+        )
+        layers = []
+        if seg.get("title"):
+            title_png = self._render_title_png(seg["title"], seg_dir, use_overlay=use_overlay,
+                                               profile=profile, in_memory=in_memory)
+            layers.append((title_png, t0, t1))
+        out_label = self._add_layers(graph, "seg_captioned", layers, None if in_memory else seg_dir, profile)
+
+        script_path = graph.write_script(os.path.join(seg_dir, "filter_graph.txt"))
+        out = os.path.join(seg_dir, "segment.mkv")
+        cmd = [
+            "ffmpeg", "-y", *graph.input_args,
+            "-filter_complex_script", script_path,
+            "-map", f"[{out_label}]",
+            *SEGMENT_CODEC,
+            "-r", str(fps),
+            "-frames:v", str(int(round(length * fps))),
+            "-an",
+            "-threads", str(threads),
+            out,
+        ]
+        run_ffmpeg(cmd, f"segment_{k}", duration=length, on_progress=self.on_progress)
+        return out
+
+    @staticmethod
+    def _frame_layer(use_overlay, profile):
+        """The news frame overlay conformed to the profile, or None."""
+        overlay_path = "assets/main_overlay.png"
+        if use_overlay and os.path.exists(overlay_path):
+            try:
+                return conform_overlay(overlay_path, profile.width, profile.height)
+            except RuntimeError as e:
+                # flatten_layers resizes it instead
+                logger.warning(f"Could not conform {overlay_path}, resizing with PIL: {e}")
+                return overlay_path
+        if use_overlay:
+            logger.warning(f"Overlay requested but not found: {overlay_path}")
+        return None
+
+    @staticmethod
+    def _add_layers(graph, src, layers, temp_dir, profile):
+        """Overlay static (png, t0, t1) layers, pre-flattened per window; returns the label.
+
+        temp_dir=None keeps flattened layers in memory; Sprites are piped
+        to ffmpeg as a single rawvideo frame.
+        """
+        label = src
+        flat = flatten_layers(layers, (profile.width, profile.height), temp_dir)
+        for k, (png, windows) in enumerate(flat):
+            layer_idx = graph.input(RawFrames.still(png.image) if isinstance(png, Sprite) else png)
+            expr = enable_expr(windows)
+            x, y = sprite_offset(png) or (0, 0)
+            label = graph.add(
+                [label, f"{layer_idx}:v"],
+                f"overlay={x}:{y}" + (f":enable='{expr}'" if expr else ""),
+                f"{src}_layer{k}",
+            )
+        return label
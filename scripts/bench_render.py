@@ -0,0 +1,286 @@
+"""Render benchmarks for the reel builders.
+
+Builds synthetic inputs (gradient images, a silent WAV voiceover and a
+generated script) so renders can be timed without Drive/TTS access.
+
+Usage:
+    python scripts/bench_render.py captions --durations 30 60
+    python scripts/bench_render.py caption-frames --durations 30 60
+    python scripts/bench_render.py intermediates --duration 30
+    python scripts/bench_render.py motion --seconds 8
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image
+
+from reel_generator.caption_generator import render_captions_to_images
+from reel_generator.clip_cache import kenburns_filter, render_kenburns
+from reel_generator.fonts import get_font, text_bbox
+from reel_generator.motion import MOTION_ENGINES
+from reel_generator.video_builder import VideoBuilder
+from src.services.faceless_video_service import INTERMEDIATE_PROFILES, FacelessVideoService
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("BenchRender")
+
+WORDS_PER_SEC = 2.5
+SENTENCE = "Officials confirmed the new coastal road will open to traffic next month after delays"
+
+
+def make_images(out_dir, count, size=(1600, 2400)):
+    """Write `count` gradient JPGs with distinct hues."""
+    paths = []
+    for i in range(count):
+        img = Image.linear_gradient("L").resize(size).convert("RGB")
+        r, g, b = img.split()
+        img = Image.merge("RGB", (r, g.point(lambda v, i=i: (v + 60 * i) % 256), b.point(lambda v: 255 - v)))
+        path = os.path.join(out_dir, f"bench_img_{i}.jpg")
+        img.save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def make_silent_wav(path, duration, rate=44100):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(duration * rate))
+    return path
+
+
+def make_script(duration):
+    """A script of roughly `duration` seconds of speech, split into sentences."""
+    target = int(duration * WORDS_PER_SEC)
+    words = SENTENCE.split()
+    sentences, count = [], 0
+    while count < target:
+        sentences.append(" ".join(words) + ".")
+        count += len(words)
+    return " ".join(sentences)
+
+
+def _render_child(config, duration, output, out_dir, queue):
+    builder = VideoBuilder()
+    start = time.perf_counter()
+    ok = builder.build_video(config, duration, output, out_dir)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    queue.put((ok, elapsed, peak_kb / 1024))
+
+
+def render(config, duration, out_dir, label):
+    """Render in a fresh process; returns (seconds, peak ffmpeg RSS in MB)."""
+    output = os.path.join(out_dir, f"{label}.mp4")
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(
+        target=_render_child, args=(config, duration, output, out_dir, queue)
+    )
+    proc.start()
+    ok, elapsed, peak_mb = queue.get()
+    proc.join()
+    if not ok:
+        raise RuntimeError(f"{label} render failed")
+    return elapsed, peak_mb
+
+
+def bench_captions(args):
+    """Per-caption overlay inputs vs. the single caption track."""
+    print(f"{'duration':>8} {'captions':>8} {'mode':>8} {'wall':>8} {'peak RSS':>10}")
+    for duration in args.durations:
+        work = tempfile.mkdtemp(prefix="bench_captions_")
+        try:
+            script = make_script(duration)
+            caption_data = render_captions_to_images(script, work, typewriter=True, use_overlay=False)
+            config = {
+                "intro_image": "assets/mbn_reels_intro.mp4",
+                "outro_image": "assets/mbn_reels_outro1.mp4",
+                "middle_images": make_images(work, args.images),
+                "voiceover_audio": make_silent_wav(os.path.join(work, "vo.wav"), duration),
+                "caption_images": [c["image_path"] for c in caption_data],
+                "title": "Coastal road opens next month",
+                "script": script,
+                "use_overlay": False,
+            }
+            for mode in args.modes:
+                elapsed, peak_mb = render({**config, "caption_mode": mode}, duration, work, mode)
+                print(
+                    f"{duration:>7.0f}s {len(caption_data):>8} {mode:>8} "
+                    f"{elapsed:>7.1f}s {peak_mb:>8.0f}MB", flush=True
+                )
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+def bench_caption_frames(args):
+    """Typewriter caption PNGs rendered per second (no FFmpeg).
+
+    The first run per profile starts with an empty font registry and
+    measurement cache; later runs reuse them, as later reels in one
+    pipeline process do.
+    """
+    print(f"{'duration':>8} {'profile':>8} {'run':>5} {'frames':>7} {'wall':>8} {'frames/s':>9}")
+    for profile in args.profiles:
+        get_font.cache_clear()
+        text_bbox.cache_clear()
+        for duration in args.durations:
+            script = make_script(duration)
+            for run in range(args.runs):
+                work = tempfile.mkdtemp(prefix="bench_caption_frames_")
+                try:
+                    start = time.perf_counter()
+                    frames = len(render_captions_to_images(script, work, profile=profile))
+                    elapsed = time.perf_counter() - start
+                finally:
+                    shutil.rmtree(work, ignore_errors=True)
+                print(
+                    f"{duration:>7.0f}s {profile:>8} {run + 1:>5} {frames:>7} "
+                    f"{elapsed:>7.2f}s {frames / elapsed:>9.1f}", flush=True
+                )
+
+
+def _dir_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(path) for f in files
+    )
+
+
+def bench_intermediates(args):
+    """FacelessVideoService multipass render per intermediate codec profile.
+
+    Runs the stages directly so the temp dir can be measured before cleanup.
+    """
+    print(f"{'profile':>14} {'wall':>8} {'temp':>10}")
+    work = tempfile.mkdtemp(prefix="bench_intermediates_")
+    try:
+        images = make_images(work, args.images)
+        audio = make_silent_wav(os.path.join(work, "vo.wav"), args.duration)
+        for profile in args.profiles:
+            service = FacelessVideoService()
+            service.intermediate_profile = profile
+            slideshow = args.duration - service.intro_duration - service.outro_duration
+            tmp_dir = service._make_tmp_dir()
+            try:
+                start = time.perf_counter()
+                intro = service._build_intro("assets/logo.png", tmp_dir)
+                slides = service._build_slideshow(images, slideshow, tmp_dir)
+                outro = service._build_outro("assets/mbn_reels_outro1.mp4", tmp_dir)
+                service._concat_and_mix(
+                    intro, slides, outro, audio, None,
+                    os.path.join(work, f"{profile}.mp4"),
+                )
+                elapsed = time.perf_counter() - start
+                temp_mb = _dir_bytes(tmp_dir) / 1024 ** 2
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"{profile:>14} {elapsed:>7.1f}s {temp_mb:>8.0f}MB", flush=True)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def ssim(a, b):
+    """Mean SSIM (All) between two clips of the same size and length."""
+    result = subprocess.run(
+        ["ffmpeg", "-i", a, "-i", b, "-lavfi", "ssim", "-f", "null", "-"],
+        capture_output=True, text=True, check=True,
+    )
+    return float(re.findall(r"All:([\d.]+)", result.stderr)[-1])
+
+
+def _filter_cpu(image, frames, zoom_in, engine):
+    """CPU seconds FFmpeg spends on the Ken Burns chain alone (no encode)."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", image,
+         "-vf", kenburns_filter(frames, zoom_in, engine=engine),
+         "-frames:v", str(frames), "-f", "null", "-"],
+        check=True,
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return after.ru_utime + after.ru_stime - before.ru_utime - before.ru_stime
+
+
+def bench_motion(args):
+    """Ken Burns clip render time per motion engine, and SSIM vs. zoompan.
+
+    wall/fps time whole clip renders, encode included; filter is the CPU
+    time of the motion chain on its own, where the engines differ.
+    """
+    print(f"{'engine':>8} {'wall':>8} {'fps':>7} {'filter':>8} {'ssim':>7}")
+    work = tempfile.mkdtemp(prefix="bench_motion_")
+    try:
+        images = make_images(work, args.images)
+        frames = int(args.seconds * 30)
+        outputs = {}
+        for engine in args.engines:
+            start = time.perf_counter()
+            outputs[engine] = []
+            for i, img in enumerate(images):
+                out = os.path.join(work, f"{engine}_{i}.mp4")
+                render_kenburns(img, out, frames, i % 2 == 0, engine=engine)
+                outputs[engine].append(out)
+            elapsed = time.perf_counter() - start
+            filter_cpu = sum(_filter_cpu(img, frames, i % 2 == 0, engine) for i, img in enumerate(images))
+            if engine == "zoompan" or "zoompan" not in outputs:
+                score = "-"
+            else:
+                scores = [ssim(a, b) for a, b in zip(outputs["zoompan"], outputs[engine])]
+                score = f"{sum(scores) / len(scores):.4f}"
+            print(
+                f"{engine:>8} {elapsed:>7.1f}s {frames * len(images) / elapsed:>7.1f} "
+                f"{filter_cpu:>7.1f}s {score:>7}",
+                flush=True,
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reel render benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("captions", help="caption overlay mode vs caption track")
+    p.add_argument("--durations", type=float, nargs="+", default=[30, 60])
+    p.add_argument("--images", type=int, default=4)
+    p.add_argument("--modes", nargs="+", default=["overlay", "track"])
+    p.set_defaults(func=bench_captions)
+
+    p = sub.add_parser("caption-frames", help="caption PNG frames rendered per second")
+    p.add_argument("--durations", type=float, nargs="+", default=[30, 60])
+    p.add_argument("--profiles", nargs="+", default=["final", "preview"])
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_caption_frames)
+
+    p = sub.add_parser("intermediates", help="multipass intermediate codec profiles")
+    p.add_argument("--duration", type=float, default=30)
+    p.add_argument("--images", type=int, default=4)
+    p.add_argument("--profiles", nargs="+", default=list(INTERMEDIATE_PROFILES))
+    p.set_defaults(func=bench_intermediates)
+
+    p = sub.add_parser("motion", help="Ken Burns motion engines")
+    p.add_argument("--seconds", type=float, default=8)
+    p.add_argument("--images", type=int, default=4)
+    p.add_argument("--engines", nargs="+", default=list(MOTION_ENGINES))
+    p.set_defaults(func=bench_motion)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
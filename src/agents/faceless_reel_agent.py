@@ -36,6 +36,8 @@ class FacelessReelAgent:
         outro_image: Optional[str] = None,
         voice_id: Optional[str] = None,
         enable_captions: bool = True,
+        caption_backend: Optional[str] = None,
+        render_profile: Optional[str] = None,
     ) -> str:
         """Generate a complete faceless reel.
 
@@ -48,6 +50,8 @@ class FacelessReelAgent:
             outro_image: Override outro image path
             voice_id: Override ElevenLabs voice ID
             enable_captions: Whether to burn-in captions from the script
+            caption_backend: "drawtext" or "ass" (defaults to settings.CAPTION_BACKEND)
+            render_profile: "final" or "preview" (defaults to settings.RENDER_PROFILE)
 
         Returns:
             Absolute path to the final MP4
@@ -84,6 +88,8 @@ class FacelessReelAgent:
             intro_logo=intro_logo,
             outro_image=outro_image,
             captions=captions,
+            caption_backend=caption_backend,
+            render_profile=render_profile,
         )
 
         return final_path
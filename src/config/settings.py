@@ -53,6 +53,24 @@ class Settings:
     OUTRO_DURATION: float = float(os.getenv("OUTRO_DURATION", "3.0"))
     IMAGE_DURATION: float = float(os.getenv("IMAGE_DURATION", "5.0"))
     TRANSITION_DURATION: float = float(os.getenv("TRANSITION_DURATION", "1.2"))
+    # Caption burn-in: "drawtext" (one filter per caption) or "ass" (libass)
+    CAPTION_BACKEND: str = os.getenv("CAPTION_BACKEND", "drawtext")
+    # Faceless reel engine: "single_pass" (one encode), "chunked" (single-pass
+    # timeline encoded as parallel chunks) or "multipass" (legacy)
+    FACELESS_ENGINE: str = os.getenv("FACELESS_ENGINE", "single_pass")
+    # Chunks per reel for the chunked engine (0 = one per 4 cores, at least 3)
+    RENDER_CHUNKS: int = int(os.getenv("RENDER_CHUNKS", "0"))
+    # Parallel FFmpeg encodes in the multipass engine (0 = one per CPU core)
+    RENDER_WORKERS: int = int(os.getenv("RENDER_WORKERS", "0"))
+    # Multipass intermediate codec: "h264", "x264_lossless", "ffv1" or "raw" (tmpfs)
+    INTERMEDIATE_PROFILE: str = os.getenv("INTERMEDIATE_PROFILE", "x264_lossless")
+    # Ken Burns clip cache shared with VideoBuilder (0 MB = render inline)
+    CLIP_CACHE_DIR: str = os.getenv("CLIP_CACHE_DIR", os.path.join("outputs", "cache", "clips"))
+    CLIP_CACHE_MAX_MB: int = int(os.getenv("CLIP_CACHE_MAX_MB", "2048"))
+    # Ken Burns motion: "zoompan" or "scale" (per-frame scale + crop, cheaper per frame)
+    MOTION_ENGINE: str = os.getenv("MOTION_ENGINE", "zoompan")
+    # Render tier: "final" (1080x1920@30) or "preview" (540x960@15, ultrafast)
+    RENDER_PROFILE: str = os.getenv("RENDER_PROFILE", "final")
     
     # File Storage
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")
@@ -61,6 +79,8 @@ class Settings:
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Per-render FFmpeg stderr logs (rotated, newest kept; see ffmpeg_progress)
+    FFMPEG_LOG_DIR: str = os.getenv("FFMPEG_LOG_DIR", os.path.join(OUTPUT_DIR, "logs", "ffmpeg"))
     
     @property
     def audio_dir(self) -> str:
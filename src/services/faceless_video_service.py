@@ -10,19 +10,24 @@ Produces a 9:16 (1080×1920) vertical video composed of:
 
 import os
 import re
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple
 
+from reel_generator.clip_cache import ClipCache, kenburns_filter
+from reel_generator.ffmpeg_progress import RenderStats, run_ffmpeg
+from reel_generator.motion import MOTION_ENGINES
+from reel_generator.render_budget import BUDGET
+from reel_generator.render_profile import BASE_HEIGHT, BASE_WIDTH, RenderProfile, get_profile
 from src.config.settings import settings
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
 # ── Constants ─────────────────────────────────────────────────────────────────
-WIDTH = 1080
-HEIGHT = 1920
-FPS = 30
+# Frame size and rate come from the render profile (see RenderProfile)
 PIX_FMT = "yuv420p"
 
 # Curated list of premium xfade transitions (cycled between images)
@@ -35,19 +40,65 @@ TRANSITION_STYLES = [
     "smoothleft",   # smooth slide with easing
 ]
 
+# Codec profiles for the multipass intermediates (intro, segments, slideshow,
+# outro, concat). Only the final mix is encoded for delivery, so the
+# intermediates can trade disk space for encode speed and skip generation
+# loss. "h264" is the original CRF 18 behaviour (args=None → stage preset).
+INTERMEDIATE_PROFILES = {
+    "h264": {"ext": ".mp4", "args": None, "tmpfs": False},
+    "x264_lossless": {
+        "ext": ".mkv",
+        "args": ["-c:v", "libx264", "-preset", "ultrafast", "-qp", "0"],
+        "tmpfs": False,
+    },
+    "ffv1": {"ext": ".mkv", "args": ["-c:v", "ffv1", "-level", "3"], "tmpfs": False},
+    # ~3 MB per 1080x1920 frame: only sensible on a RAM-backed temp dir
+    "raw": {"ext": ".nut", "args": ["-c:v", "rawvideo"], "tmpfs": True},
+}
+TMPFS_DIR = "/dev/shm"
+
+# Cores per chunk when RENDER_CHUNKS is 0: libx264 stops scaling well on a
+# 1080x1920 graph past a handful of threads, so more chunks beat more threads
+CHUNK_THREADS = 4
+
 
 class FacelessVideoService:
     """Build faceless reels from images + audio via FFmpeg."""
 
     _filter_cache = {}
 
-    def __init__(self):
+    def __init__(self, render_profile: Optional[str] = None, on_progress=None):
+        self.profile = get_profile(render_profile or settings.RENDER_PROFILE)
         self.font_path = settings.FONT_PATH
         self.output_dir = settings.FINAL_OUTPUT_DIR
         self.intro_duration = settings.INTRO_DURATION
         self.outro_duration = settings.OUTRO_DURATION
         self.image_duration = settings.IMAGE_DURATION
         self.transition_dur = settings.TRANSITION_DURATION
+        self.intermediate_profile = settings.INTERMEDIATE_PROFILE
+        if self.intermediate_profile not in INTERMEDIATE_PROFILES:
+            raise ValueError(
+                f"Unknown INTERMEDIATE_PROFILE '{self.intermediate_profile}' "
+                f"(expected one of {', '.join(INTERMEDIATE_PROFILES)})"
+            )
+        self.clip_cache = ClipCache(settings.CLIP_CACHE_DIR, settings.CLIP_CACHE_MAX_MB)
+        # Progress callback for every FFmpeg stage (see reel_generator.ffmpeg_progress)
+        self.on_progress = on_progress
+        # Per-stage RenderStats of the last build_reel (achieved fps per stage)
+        self.render_stats: List[RenderStats] = []
+        self._reel_duration: Optional[float] = None
+
+    @property
+    def width(self) -> int:
+        return self.profile.width
+
+    @property
+    def height(self) -> int:
+        return self.profile.height
+
+    @property
+    def fps(self) -> int:
+        return self.profile.fps
 
     # ── Public API ────────────────────────────────────────────────────────
 
@@ -59,6 +110,11 @@ class FacelessVideoService:
         intro_logo: Optional[str] = None,
         outro_image: Optional[str] = None,
         captions: Optional[List[Tuple[str, float, float]]] = None,
+        caption_backend: Optional[str] = None,
+        typewriter_captions: bool = False,
+        engine: Optional[str] = None,
+        motion_engine: Optional[str] = None,
+        render_profile: Optional[str] = None,
     ) -> str:
         """Assemble a complete faceless reel.
 
@@ -69,11 +125,24 @@ class FacelessVideoService:
             intro_logo: Path to logo PNG/JPG for intro (falls back to settings)
             outro_image: Path to outro PNG/JPG (falls back to settings)
             captions: List of (text, start_sec, end_sec) tuples for burn-in
+            caption_backend: "drawtext" or "ass" (falls back to settings)
+            typewriter_captions: Reveal captions word by word (ass backend only)
+            engine: "single_pass" (one filter graph, one encode), "chunked"
+                (the single-pass timeline split into chunks encoded in
+                parallel) or "multipass" (per-stage intermediates); falls back
+                to settings. A failed single-pass or chunked render is retried
+                with the multi-pass path.
+            motion_engine: Ken Burns implementation, "zoompan" or "scale"
+                (falls back to settings)
+            render_profile: "final" or "preview" (or a RenderProfile) for this
+                reel only (default: the service's profile)
 
         Returns:
             Absolute path to the final MP4
         """
         settings.ensure_dirs()
+        # Per call: the service's own profile is left as it is
+        profile = self.profile if render_profile is None else get_profile(render_profile)
 
         if output_path is None:
             from datetime import datetime
@@ -82,6 +151,14 @@ class FacelessVideoService:
 
         intro_logo = intro_logo or settings.INTRO_LOGO_PATH
         outro_image = outro_image or settings.OUTRO_IMAGE_PATH
+        caption_backend = caption_backend or settings.CAPTION_BACKEND
+        engine = engine or settings.FACELESS_ENGINE
+        motion_engine = motion_engine or settings.MOTION_ENGINE
+        if motion_engine not in MOTION_ENGINES:
+            raise ValueError(
+                f"Unknown motion engine '{motion_engine}' "
+                f"(expected one of {', '.join(MOTION_ENGINES)})"
+            )
 
         # Get audio duration to auto-size the slideshow
         audio_duration = self._get_audio_duration(audio_path)
@@ -90,55 +167,85 @@ class FacelessVideoService:
             audio_duration - self.intro_duration - self.outro_duration
         )
 
+        self.render_stats = []
+        self._reel_duration = self.intro_duration + slideshow_duration + self.outro_duration
+
         logger.info(
             f"Building faceless reel: {len(images)} images, "
             f"audio={audio_duration:.1f}s, slideshow={slideshow_duration:.1f}s"
         )
 
         # Build individual segments as temp files
-        tmp_dir = tempfile.mkdtemp(prefix="faceless_")
+        tmp_dir = self._make_tmp_dir()
         try:
-            intro_clip = self._build_intro(intro_logo, tmp_dir)
-            slideshow_clip = self._build_slideshow(images, slideshow_duration, tmp_dir)
-            outro_clip = self._build_outro(outro_image, tmp_dir)
+            if engine in ("single_pass", "chunked"):
+                build = self._build_chunked if engine == "chunked" else self._build_single_pass
+                try:
+                    final = build(
+                        images, audio_path, output_path, intro_logo, outro_image,
+                        captions, slideshow_duration, tmp_dir,
+                        caption_backend=caption_backend,
+                        typewriter_captions=typewriter_captions,
+                        motion_engine=motion_engine,
+                        profile=profile,
+                    )
+                    logger.info(f"✓ Faceless reel saved: {final}")
+                    self._log_throughput()
+                    return final
+                except RuntimeError as e:
+                    logger.warning(f"{engine} render failed, falling back to multi-pass: {e}")
+
+            intro_clip = self._build_intro(intro_logo, tmp_dir, profile=profile)
+            slideshow_clip = self._build_slideshow(
+                images, slideshow_duration, tmp_dir, motion_engine=motion_engine, profile=profile
+            )
+            outro_clip = self._build_outro(outro_image, tmp_dir, profile=profile)
 
             final = self._concat_and_mix(
                 intro_clip, slideshow_clip, outro_clip,
-                audio_path, captions, output_path
+                audio_path, captions, output_path,
+                caption_backend=caption_backend,
+                typewriter_captions=typewriter_captions,
+                profile=profile,
             )
 
             logger.info(f"✓ Faceless reel saved: {final}")
+            self._log_throughput()
             return final
 
         except Exception as e:
             logger.error(f"Reel build failed: {e}", exc_info=True)
             raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
 
     # ── Intro ─────────────────────────────────────────────────────────────
 
-    def _build_intro(self, logo_path: str, tmp_dir: str) -> str:
+    def _build_intro(
+        self, logo_path: str, tmp_dir: str, profile: Optional[RenderProfile] = None
+    ) -> str:
         """Create intro clip: logo on black background with fade-in/out."""
-        output = os.path.join(tmp_dir, "intro.mp4")
-        total_frames = int(self.intro_duration * FPS)
-        fade_frames = int(self.transition_dur * FPS)
+        profile = profile or self.profile
+        output = self._tmp_path(tmp_dir, "intro")
+        total_frames = int(self.intro_duration * profile.fps)
+        fade_frames = int(self.transition_dur * profile.fps)
 
         if os.path.isfile(logo_path):
             # Logo exists — scale it and center on black background
             cmd = [
                 "ffmpeg", "-y",
-                "-f", "lavfi", "-i", f"color=c=black:s={WIDTH}x{HEIGHT}:d={self.intro_duration}:r={FPS}",
+                "-f", "lavfi", "-i", f"color=c=black:s={profile.width}x{profile.height}:d={self.intro_duration}:r={profile.fps}",
                 "-i", logo_path,
                 "-filter_complex",
                 (
-                    f"[1:v]scale={WIDTH-200}:-1,format={PIX_FMT}[logo];"
+                    f"[1:v]scale={profile.width - profile.px(200)}:-1,format={PIX_FMT}[logo];"
                     f"[0:v][logo]overlay=(W-w)/2:(H-h)/2:format=auto,"
                     f"fade=t=in:st=0:d={self.transition_dur},"
                     f"fade=t=out:st={self.intro_duration - self.transition_dur}:d={self.transition_dur}"
                     f"[out]"
                 ),
                 "-map", "[out]",
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-pix_fmt", PIX_FMT,
+                *self._codec_args(),
                 "-t", str(self.intro_duration),
                 output,
             ]
@@ -149,7 +256,7 @@ class FacelessVideoService:
             if self._has_filter("drawtext"):
                 vf = (
                     f"drawtext=text='NEWS REEL':fontfile='{self.font_path}':"
-                    f"fontsize=80:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2,"
+                    f"fontsize={profile.px(80)}:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2,"
                     f"fade=t=in:st=0:d={self.transition_dur},"
                     f"fade=t=out:st={self.intro_duration - self.transition_dur}:d={self.transition_dur}"
                 )
@@ -162,108 +269,122 @@ class FacelessVideoService:
 
             cmd = [
                 "ffmpeg", "-y",
-                "-f", "lavfi", "-i", f"color=c=#1a1a2e:s={WIDTH}x{HEIGHT}:d={self.intro_duration}:r={FPS}",
+                "-f", "lavfi", "-i", f"color=c=#1a1a2e:s={profile.width}x{profile.height}:d={self.intro_duration}:r={profile.fps}",
                 "-vf", vf,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-pix_fmt", PIX_FMT,
+                *self._codec_args(),
                 "-t", str(self.intro_duration),
                 output,
             ]
 
-        self._run_ffmpeg(cmd, "intro")
+        self._run_ffmpeg(cmd, "intro", self.intro_duration)
         return output
 
     # ── Image Slideshow with Ken Burns + Varied Transitions ────────────
 
-    def _build_slideshow(self, images: List[str], total_duration: float, tmp_dir: str) -> str:
-        """Build a slideshow from images with Ken Burns zoom and varied xfade transitions."""
-        output = os.path.join(tmp_dir, "slideshow.mp4")
+    def _build_slideshow(
+        self,
+        images: List[str],
+        total_duration: float,
+        tmp_dir: str,
+        motion_engine: str = "zoompan",
+        profile: Optional[RenderProfile] = None,
+    ) -> str:
+        """Build a slideshow from images with Ken Burns zoom and varied xfade transitions.
+
+        The per-image segments are independent, so they are rendered
+        concurrently; all xfades are then applied in one N-input graph.
+        """
+        profile = profile or self.profile
+        output = self._tmp_path(tmp_dir, "slideshow")
 
         valid = [img for img in images if os.path.isfile(img)]
         if not valid:
             logger.warning("No valid images — generating black placeholder")
-            return self._black_clip(total_duration, output)
+            return self._black_clip(total_duration, output, profile=profile)
 
         n = len(valid)
-        per_image = total_duration / n
+        per_image, offsets = self._slideshow_timing(n, total_duration)
+        frames = int(round(per_image * profile.fps))
+        workers, threads = self._pool_plan(n)
 
         # Step 1: create image clips with Ken Burns zoom motion
-        segment_paths = []
-        for i, img in enumerate(valid):
-            seg = os.path.join(tmp_dir, f"seg_{i}.mp4")
-            zoompan_frames = int(per_image * FPS)
-
-            # Alternate between zoom-in and zoom-out for variety
-            if i % 2 == 0:
-                # Slow zoom IN (1.0 → 1.15), centered
-                zp = (
-                    f"zoompan=z='min(zoom+0.0008,1.15)':"
-                    f"d={zoompan_frames}:"
-                    f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-                    f"s={WIDTH}x{HEIGHT}:fps={FPS}"
+        def render_segment(i: int, img: str) -> str:
+            if self.clip_cache.enabled:
+                return self.clip_cache.kenburns(
+                    img, frames, i % 2 == 0, profile.width, profile.height, profile.fps,
+                    threads=threads, engine=motion_engine,
                 )
-            else:
-                # Slow zoom OUT (1.15 → 1.0), centered
-                zp = (
-                    f"zoompan=z='if(eq(on,1),1.15,max(zoom-0.0008,1.0))':"
-                    f"d={zoompan_frames}:"
-                    f"x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':"
-                    f"s={WIDTH}x{HEIGHT}:fps={FPS}"
-                )
-
+            seg = self._tmp_path(tmp_dir, f"seg_{i}")
+            motion = kenburns_filter(
+                frames, i % 2 == 0, profile.width, profile.height, profile.fps, motion_engine
+            )
             cmd = [
                 "ffmpeg", "-y",
                 "-loop", "1", "-i", img,
-                "-vf",
-                (
-                    f"scale=1280:2275:force_original_aspect_ratio=increase,"
-                    f"crop={WIDTH+200}:{HEIGHT+200},"
-                    f"{zp},"
-                    f"format={PIX_FMT}"
-                ),
-                "-t", str(per_image),
-                "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-                "-pix_fmt", PIX_FMT,
+                "-vf", f"{motion},format={PIX_FMT}",
+                "-t", f"{per_image:.3f}",
+                *self._codec_args("medium"),
+                "-threads", str(threads),
                 seg,
             ]
-            self._run_ffmpeg(cmd, f"segment_{i}")
-            segment_paths.append(seg)
+            self._run_ffmpeg(cmd, f"segment_{i}", per_image)
+            return seg
 
-        # Step 2: Concatenate segments with varied xfade transitions
-        if len(segment_paths) == 1:
-            os.rename(segment_paths[0], output)
-            return output
+        logger.info(f"Rendering {n} segments ({workers} workers × {threads} threads)")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            segment_paths = list(pool.map(render_segment, range(n), valid))
 
-        current = segment_paths[0]
-        for i in range(1, len(segment_paths)):
-            merged = os.path.join(tmp_dir, f"merged_{i}.mp4")
-            offset = per_image - self.transition_dur
+        if n == 1:
+            # No transitions; the segment (possibly a cache entry) is the slideshow
+            return segment_paths[0]
 
-            # Cycle through the curated transition styles
-            transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
+        # Step 2: one N-input xfade graph instead of N-1 pairwise re-encodes
+        cmd = ["ffmpeg", "-y"]
+        for seg in segment_paths:
+            cmd += ["-i", seg]
 
-            cmd = [
-                "ffmpeg", "-y",
-                "-i", current,
-                "-i", segment_paths[i],
-                "-filter_complex",
-                f"[0:v][1:v]xfade=transition={transition}:duration={self.transition_dur}:offset={offset},format={PIX_FMT}[out]",
-                "-map", "[out]",
-                "-c:v", "libx264", "-preset", "medium", "-crf", "18",
-                "-pix_fmt", PIX_FMT,
-                merged,
-            ]
-            self._run_ffmpeg(cmd, f"xfade_{i} ({transition})")
-            current = merged
+        parts, last = [], "0:v"
+        for i in range(1, n):
+            transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
+            nxt = f"x{i}"
+            parts.append(
+                f"[{last}][{i}:v]xfade=transition={transition}:"
+                f"duration={self.transition_dur}:offset={offsets[i - 1]:.3f}[{nxt}]"
+            )
+            last = nxt
+        parts.append(f"[{last}]format={PIX_FMT}[out]")
 
-        os.rename(current, output)
+        cmd += [
+            "-filter_complex", ";".join(parts),
+            "-map", "[out]",
+            *self._codec_args("medium"),
+            output,
+        ]
+        self._run_ffmpeg(cmd, f"xfade ({n} inputs)", total_duration)
         return output
 
+    @staticmethod
+    def _pool_plan(jobs: int) -> Tuple[int, int]:
+        """Worker count and per-FFmpeg thread count for `jobs` parallel encodes.
+
+        Workers are capped at the render budget's job limit (or RENDER_WORKERS
+        when set) and its CPUs are split between them so the encoders don't
+        oversubscribe.
+        """
+        workers, threads = BUDGET.plan(jobs)
+        if settings.RENDER_WORKERS and workers > settings.RENDER_WORKERS:
+            workers = settings.RENDER_WORKERS
+            threads = max(1, BUDGET.cpus // workers)
+        return workers, threads
+
     # ── Outro ─────────────────────────────────────────────────────────────
 
-    def _build_outro(self, outro_path: str, tmp_dir: str) -> str:
+    def _build_outro(
+        self, outro_path: str, tmp_dir: str, profile: Optional[RenderProfile] = None
+    ) -> str:
         """Create outro clip from a video file, image, or text placeholder."""
-        output = os.path.join(tmp_dir, "outro.mp4")
+        profile = profile or self.profile
+        output = self._tmp_path(tmp_dir, "outro")
 
         if os.path.isfile(outro_path):
             ext = os.path.splitext(outro_path)[1].lower()
@@ -276,35 +397,33 @@ class FacelessVideoService:
                     "-i", outro_path,
                     "-vf",
                     (
-                        f"scale={WIDTH}:{HEIGHT}:force_original_aspect_ratio=increase,"
-                        f"crop={WIDTH}:{HEIGHT},"
+                        f"scale={profile.width}:{profile.height}:force_original_aspect_ratio=increase,"
+                        f"crop={profile.width}:{profile.height},"
                         f"fade=t=in:st=0:d={self.transition_dur},"
                         f"format={PIX_FMT}"
                     ),
                     "-t", str(self.outro_duration),
                     "-an",  # drop original audio from outro video
-                    "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                    "-pix_fmt", PIX_FMT,
-                    "-r", str(FPS),
+                    *self._codec_args(),
+                    "-r", str(profile.fps),
                     output,
                 ]
             else:
                 # ── IMAGE OUTRO: overlay on black background ─────────
                 cmd = [
                     "ffmpeg", "-y",
-                    "-f", "lavfi", "-i", f"color=c=black:s={WIDTH}x{HEIGHT}:d={self.outro_duration}:r={FPS}",
+                    "-f", "lavfi", "-i", f"color=c=black:s={profile.width}x{profile.height}:d={self.outro_duration}:r={profile.fps}",
                     "-i", outro_path,
                     "-filter_complex",
                     (
-                        f"[1:v]scale={WIDTH-200}:-1,format={PIX_FMT}[img];"
+                        f"[1:v]scale={profile.width - profile.px(200)}:-1,format={PIX_FMT}[img];"
                         f"[0:v][img]overlay=(W-w)/2:(H-h)/2:format=auto,"
                         f"fade=t=in:st=0:d={self.transition_dur},"
                         f"fade=t=out:st={self.outro_duration - self.transition_dur}:d={self.transition_dur}"
                         f"[out]"
                     ),
                     "-map", "[out]",
-                    "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                    "-pix_fmt", PIX_FMT,
+                    *self._codec_args(),
                     "-t", str(self.outro_duration),
                     output,
                 ]
@@ -314,7 +433,7 @@ class FacelessVideoService:
             if self._has_filter("drawtext"):
                 vf = (
                     f"drawtext=text='Follow for more':fontfile='{self.font_path}':"
-                    f"fontsize=60:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2,"
+                    f"fontsize={profile.px(60)}:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2,"
                     f"fade=t=in:st=0:d={self.transition_dur},"
                     f"fade=t=out:st={self.outro_duration - self.transition_dur}:d={self.transition_dur}"
                 )
@@ -327,15 +446,14 @@ class FacelessVideoService:
 
             cmd = [
                 "ffmpeg", "-y",
-                "-f", "lavfi", "-i", f"color=c=#1a1a2e:s={WIDTH}x{HEIGHT}:d={self.outro_duration}:r={FPS}",
+                "-f", "lavfi", "-i", f"color=c=#1a1a2e:s={profile.width}x{profile.height}:d={self.outro_duration}:r={profile.fps}",
                 "-vf", vf,
-                "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-                "-pix_fmt", PIX_FMT,
+                *self._codec_args(),
                 "-t", str(self.outro_duration),
                 output,
             ]
 
-        self._run_ffmpeg(cmd, "outro")
+        self._run_ffmpeg(cmd, "outro", self.outro_duration)
         return output
 
     # ── Concatenation + Audio + Captions ──────────────────────────────────
@@ -348,8 +466,12 @@ class FacelessVideoService:
         audio_path: str,
         captions: Optional[List[Tuple[str, float, float]]],
         output_path: str,
+        caption_backend: str = "drawtext",
+        typewriter_captions: bool = False,
+        profile: Optional[RenderProfile] = None,
     ) -> str:
         """Concatenate intro+slideshow+outro, overlay audio, and burn-in captions."""
+        profile = profile or self.profile
         tmp_dir = os.path.dirname(intro)
 
         # 1. Create concat list file
@@ -358,23 +480,29 @@ class FacelessVideoService:
             for seg in [intro, slideshow, outro]:
                 f.write(f"file '{seg}'\n")
 
-        # 2. Concat video segments
-        concat_out = os.path.join(tmp_dir, "concat.mp4")
+        # 2. Concat video segments (stream copy when the parts are compatible)
+        concat_out = self._tmp_path(tmp_dir, "concat")
+        if self._can_stream_copy([intro, slideshow, outro]):
+            codec = ["-c", "copy"]
+        else:
+            codec = self._codec_args()
         cmd_concat = [
             "ffmpeg", "-y",
             "-f", "concat", "-safe", "0", "-i", concat_file,
-            "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-            "-pix_fmt", PIX_FMT,
+            *codec,
             concat_out,
         ]
-        self._run_ffmpeg(cmd_concat, "concat")
+        self._run_ffmpeg(cmd_concat, "concat", self._reel_duration)
 
         # 3. Overlay audio + captions in one pass
-        caption_filters = self._build_caption_filters(captions)
-        
-        if not self._has_filter("drawtext") and caption_filters:
-            logger.warning("FFmpeg 'drawtext' filter missing. Skipping captions.")
-            caption_filters = []
+        if caption_backend == "ass":
+            caption_filters = self._build_ass_filter(captions, tmp_dir, typewriter_captions)
+        else:
+            caption_filters = self._build_caption_filters(captions, profile=profile)
+
+            if not self._has_filter("drawtext") and caption_filters:
+                logger.warning("FFmpeg 'drawtext' filter missing. Skipping captions.")
+                caption_filters = []
 
         if caption_filters:
             vf = ",".join(caption_filters)
@@ -384,7 +512,7 @@ class FacelessVideoService:
                 "-i", audio_path,
                 "-vf", vf,
                 "-map", "0:v:0", "-map", "1:a:0",
-                "-c:v", "libx264", "-preset", "medium", "-crf", "18",
+                *self._final_codec_args(profile),
                 "-c:a", "aac", "-b:a", "256k",
                 "-pix_fmt", PIX_FMT,
                 "-shortest",
@@ -396,22 +524,24 @@ class FacelessVideoService:
                 "-i", concat_out,
                 "-i", audio_path,
                 "-map", "0:v:0", "-map", "1:a:0",
-                "-c:v", "libx264", "-preset", "medium", "-crf", "18",
+                *self._final_codec_args(profile),
                 "-c:a", "aac", "-b:a", "256k",
                 "-pix_fmt", PIX_FMT,
                 "-shortest",
                 output_path,
             ]
 
-        self._run_ffmpeg(cmd_final, "final_mix")
+        self._run_ffmpeg(cmd_final, "final_mix", self._reel_duration)
         return output_path
 
     # ── Caption Filters ───────────────────────────────────────────────────
 
     def _build_caption_filters(
-        self, captions: Optional[List[Tuple[str, float, float]]]
+        self, captions: Optional[List[Tuple[str, float, float]]],
+        profile: Optional[RenderProfile] = None,
     ) -> List[str]:
         """Build FFmpeg drawtext filters for each caption tuple."""
+        profile = profile or self.profile
         if not captions:
             return []
 
@@ -422,28 +552,476 @@ class FacelessVideoService:
             clean = text.replace("'", "'\\''").replace(":", "\\:")
             f = (
                 f"drawtext=text='{clean}':fontfile='{self.font_path}':"
-                f"fontsize=46:fontcolor=white:box=1:boxcolor=black@0.5:"
-                f"boxborderw=20:x=(w-text_w)/2:y=h*0.82-th/2:"
+                f"fontsize={profile.px(46)}:fontcolor=white:box=1:boxcolor=black@0.5:"
+                f"boxborderw={profile.px(20)}:x=(w-text_w)/2:y=h*0.82-th/2:"
                 f"enable='between(t,{start:.2f},{end:.2f})'"
             )
             filters.append(f)
         return filters
 
+    def _build_ass_filter(
+        self,
+        captions: Optional[List[Tuple[str, float, float]]],
+        tmp_dir: str,
+        typewriter: bool = False,
+    ) -> List[str]:
+        """Write captions to an ASS file and return the libass burn-in filter.
+
+        One `subtitles` filter replaces the chain of per-caption drawtext
+        filters; the "boxed" style reproduces the drawtext look.
+        """
+        if not captions:
+            return []
+
+        if not self._has_filter("subtitles"):
+            logger.warning("FFmpeg 'subtitles' filter (libass) missing. Skipping captions.")
+            return []
+
+        from reel_generator.ass_captions import write_ass, subtitles_filter
+
+        ass_path, fonts_dir = write_ass(
+            captions,
+            os.path.join(tmp_dir, "captions.ass"),
+            typewriter=typewriter,
+            y_ratio=0.82,
+            style="boxed",
+            font_path=self.font_path,
+            # Layout is in design pixels; libass scales it to the frame
+            width=BASE_WIDTH,
+            height=BASE_HEIGHT,
+        )
+        return [subtitles_filter(ass_path, fonts_dir)]
+
+    # ── Single-pass engine ────────────────────────────────────────────────
+
+    def _build_single_pass(
+        self,
+        images: List[str],
+        audio_path: str,
+        output_path: str,
+        intro_logo: str,
+        outro_image: str,
+        captions: Optional[List[Tuple[str, float, float]]],
+        slideshow_duration: float,
+        tmp_dir: str,
+        caption_backend: str = "drawtext",
+        typewriter_captions: bool = False,
+        motion_engine: str = "zoompan",
+        profile: Optional[RenderProfile] = None,
+    ) -> str:
+        """Render intro, slideshow, outro, captions and audio in one FFmpeg run.
+
+        Same timeline as the multi-pass path, but expressed as a single
+        filter_complex so every frame is decoded once and encoded once.
+        """
+        profile = profile or self.profile
+        input_args: List[str] = []
+        parts: List[str] = []
+        add_input = self._input_adder(input_args)
+
+        self._sp_intro(intro_logo, add_input, parts, profile=profile)
+        self._sp_slideshow(images, slideshow_duration, add_input, parts, motion_engine,
+                           profile=profile)
+        self._sp_outro(outro_image, add_input, parts, profile=profile)
+        parts.append("[sp_intro][sp_slides][sp_outro]concat=n=3:v=1:a=0[sp_base]")
+
+        caption_filters = self._sp_caption_filters(
+            captions, caption_backend, tmp_dir, typewriter_captions, profile=profile
+        )
+        if caption_filters:
+            parts.append(f"[sp_base]{','.join(caption_filters)}[sp_out]")
+        else:
+            parts.append("[sp_base]null[sp_out]")
+
+        audio_idx = add_input("-i", audio_path)
+
+        cmd = ["ffmpeg", "-y", *input_args,
+               "-filter_complex", ";".join(parts),
+               "-map", "[sp_out]", "-map", f"{audio_idx}:a:0",
+               *self._final_codec_args(profile),
+               "-c:a", "aac", "-b:a", "256k",
+               "-pix_fmt", PIX_FMT,
+               "-r", str(profile.fps),
+               "-shortest",
+               output_path]
+        self._run_ffmpeg(cmd, "single_pass", self._reel_duration)
+        return output_path
+
+    @staticmethod
+    def _input_adder(input_args: List[str]):
+        """add_input(*args) for one graph: appends input options, returns the input's index."""
+        count = [0]
+
+        def add_input(*args: str) -> int:
+            input_args.extend(args)
+            count[0] += 1
+            return count[0] - 1
+
+        return add_input
+
+    def _sp_caption_filters(
+        self,
+        captions: Optional[List[Tuple[str, float, float]]],
+        caption_backend: str,
+        tmp_dir: str,
+        typewriter: bool = False,
+        profile: Optional[RenderProfile] = None,
+    ) -> List[str]:
+        """Caption burn-in filters (timed on the full reel) for the chosen backend."""
+        profile = profile or self.profile
+        if caption_backend == "ass":
+            return self._build_ass_filter(captions, tmp_dir, typewriter)
+        caption_filters = self._build_caption_filters(captions, profile=profile)
+        if caption_filters and not self._has_filter("drawtext"):
+            logger.warning("FFmpeg 'drawtext' filter missing. Skipping captions.")
+            return []
+        return caption_filters
+
+    def _sp_card(self, duration: float, color: str, image: Optional[str],
+                 text: str, fontsize: int, fade_out: bool, add_input, parts: List[str],
+                 label: str, profile: Optional[RenderProfile] = None) -> None:
+        """Brand card: image centred on a solid background, or a text placeholder."""
+        profile = profile or self.profile
+        fades = f"fade=t=in:st=0:d={self.transition_dur}"
+        if fade_out:
+            fades += f",fade=t=out:st={duration - self.transition_dur}:d={self.transition_dur}"
+        parts.append(f"color=c={color}:s={profile.width}x{profile.height}:d={duration}:r={profile.fps}[{label}_bg]")
+
+        if image:
+            idx = add_input("-i", image)
+            parts.append(f"[{idx}:v]scale={profile.width - profile.px(200)}:-1,format={PIX_FMT}[{label}_img]")
+            parts.append(
+                f"[{label}_bg][{label}_img]overlay=(W-w)/2:(H-h)/2:format=auto:eof_action=repeat,"
+                f"{fades},format={PIX_FMT},setsar=1[{label}]"
+            )
+        elif self._has_filter("drawtext"):
+            parts.append(
+                f"[{label}_bg]drawtext=text='{text}':fontfile='{self.font_path}':"
+                f"fontsize={profile.px(fontsize)}:fontcolor=white:x=(w-text_w)/2:y=(h-text_h)/2,"
+                f"{fades},format={PIX_FMT},setsar=1[{label}]"
+            )
+        else:
+            logger.warning(f"FFmpeg 'drawtext' filter missing. Skipping text on {label[3:]}.")
+            parts.append(f"[{label}_bg]{fades},format={PIX_FMT},setsar=1[{label}]")
+
+    def _sp_intro(self, logo_path: str, add_input, parts: List[str],
+                  profile: Optional[RenderProfile] = None) -> None:
+        profile = profile or self.profile
+        if os.path.isfile(logo_path):
+            self._sp_card(self.intro_duration, "black", logo_path, "", 0, True,
+                          add_input, parts, "sp_intro", profile=profile)
+        else:
+            logger.warning(f"Logo not found at {logo_path}, generating text placeholder")
+            self._sp_card(self.intro_duration, "#1a1a2e", None, "NEWS REEL", 80, True,
+                          add_input, parts, "sp_intro", profile=profile)
+
+    def _sp_outro(self, outro_path: str, add_input, parts: List[str],
+                  profile: Optional[RenderProfile] = None) -> None:
+        profile = profile or self.profile
+        if not os.path.isfile(outro_path):
+            logger.warning(f"Outro not found at {outro_path}, generating text placeholder")
+            self._sp_card(self.outro_duration, "#1a1a2e", None, "Follow for more", 60, True,
+                          add_input, parts, "sp_outro", profile=profile)
+            return
+
+        ext = os.path.splitext(outro_path)[1].lower()
+        if ext in ('.mp4', '.mov', '.webm', '.mkv'):
+            logger.info(f"Using video outro: {outro_path}")
+            idx = add_input("-t", str(self.outro_duration), "-i", outro_path)
+            parts.append(
+                f"[{idx}:v]scale={profile.width}:{profile.height}:force_original_aspect_ratio=increase,"
+                f"crop={profile.width}:{profile.height},fps={profile.fps},"
+                f"fade=t=in:st=0:d={self.transition_dur},"
+                f"format={PIX_FMT},setsar=1[sp_outro]"
+            )
+        else:
+            self._sp_card(self.outro_duration, "black", outro_path, "", 0, True,
+                          add_input, parts, "sp_outro", profile=profile)
+
+    def _sp_slideshow(self, images: List[str], total_duration: float,
+                      add_input, parts: List[str],
+                      motion_engine: str = "zoompan", profile: Optional[RenderProfile] = None) -> None:
+        """Ken Burns clips chained with cumulative-offset xfades into [sp_slides]."""
+        profile = profile or self.profile
+        valid = [img for img in images if os.path.isfile(img)]
+        if not valid:
+            logger.warning("No valid images — generating black placeholder")
+            parts.append(
+                f"color=c=black:s={profile.width}x{profile.height}:d={total_duration}:r={profile.fps},"
+                f"format={PIX_FMT},setsar=1[sp_slides]"
+            )
+            return
+
+        per_image, offsets = self._slideshow_timing(len(valid), total_duration)
+        frames = int(round(per_image * profile.fps))
+        clips = self._motion_clips(valid, frames, motion_engine, profile=profile)
+        self._sp_images(valid, clips, frames, offsets, 0, len(valid) - 1, add_input, parts, "sp_slides",
+                        motion_engine, profile=profile)
+
+    def _motion_clips(self, valid: List[str], frames: int, motion_engine: str = "zoompan",
+                      profile: Optional[RenderProfile] = None) -> List[Optional[str]]:
+        """Cached Ken Burns clips per image, or None where the motion runs in-graph."""
+        profile = profile or self.profile
+        if not self.clip_cache.enabled:
+            return [None] * len(valid)
+
+        # Cached motion clips skip the motion filter in the graph; misses
+        # are rendered (and cached) in parallel before it runs
+        workers, threads = self._pool_plan(len(valid))
+
+        def motion_clip(i: int) -> str:
+            return self.clip_cache.kenburns(
+                valid[i], frames, i % 2 == 0, profile.width, profile.height, profile.fps,
+                threads=threads, engine=motion_engine,
+            )
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(motion_clip, range(len(valid))))
+
+    def _sp_images(self, valid: List[str], clips: List[Optional[str]], frames: int,
+                   offsets: List[float], first: int, last: int,
+                   add_input, parts: List[str], label: str, motion_engine: str = "zoompan",
+                   profile: Optional[RenderProfile] = None) -> None:
+        """Images first..last chained with xfades into [label].
+
+        Offsets are shifted so the chain starts when image `first` does.
+        """
+        profile = profile or self.profile
+        start = offsets[first - 1] if first else 0.0
+        for i in range(first, last + 1):
+            if clips[i]:
+                idx = add_input("-i", clips[i])
+                parts.append(f"[{idx}:v]format={PIX_FMT},setsar=1[sp_img{i}]")
+                continue
+            idx = add_input("-i", valid[i])
+            motion = kenburns_filter(
+                frames, i % 2 == 0, profile.width, profile.height, profile.fps, motion_engine
+            )
+            parts.append(f"[{idx}:v]{motion},format={PIX_FMT},setsar=1[sp_img{i}]")
+
+        prev = f"sp_img{first}"
+        for i in range(first + 1, last + 1):
+            transition = TRANSITION_STYLES[(i - 1) % len(TRANSITION_STYLES)]
+            nxt = f"sp_x{i}"
+            parts.append(
+                f"[{prev}][sp_img{i}]xfade=transition={transition}:"
+                f"duration={self.transition_dur}:offset={offsets[i - 1] - start:.3f}[{nxt}]"
+            )
+            prev = nxt
+        parts.append(f"[{prev}]null[{label}]")
+
+    # ── Chunked engine ────────────────────────────────────────────────────
+
+    def _build_chunked(
+        self,
+        images: List[str],
+        audio_path: str,
+        output_path: str,
+        intro_logo: str,
+        outro_image: str,
+        captions: Optional[List[Tuple[str, float, float]]],
+        slideshow_duration: float,
+        tmp_dir: str,
+        caption_backend: str = "drawtext",
+        typewriter_captions: bool = False,
+        motion_engine: str = "zoompan",
+        profile: Optional[RenderProfile] = None,
+    ) -> str:
+        """Render the single-pass timeline as chunks encoded in parallel.
+
+        The timeline is cut only where one image is on screen, never inside
+        an xfade. The intro, each group of slideshow images and the outro
+        render in their own FFmpeg process with closed GOPs and the final
+        encoder settings. The chunks are joined with the concat demuxer
+        without re-encoding, and the voiceover is muxed once.
+        """
+        profile = profile or self.profile
+        valid = [img for img in images if os.path.isfile(img)]
+        per_image, offsets = self._slideshow_timing(len(valid), slideshow_duration)
+        frames = int(round(per_image * profile.fps))
+        clips = self._motion_clips(valid, frames, motion_engine, profile=profile) if valid else []
+        caption_filters = self._sp_caption_filters(
+            captions, caption_backend, tmp_dir, typewriter_captions, profile=profile
+        )
+
+        # (stage, start on the reel, duration, graph builder, output label)
+        jobs = [("intro", 0.0, self.intro_duration,
+                 lambda add_input, parts: self._sp_intro(intro_logo, add_input, parts, profile=profile),
+                 "sp_intro")]
+        if not valid:
+            jobs.append(("slides", self.intro_duration, slideshow_duration,
+                         lambda add_input, parts: self._sp_slideshow(
+                             images, slideshow_duration, add_input, parts, motion_engine,
+                             profile=profile),
+                         "sp_slides"))
+        for first, last, t0, t1 in self._chunk_spans(
+            len(valid), per_image, offsets, slideshow_duration, max(1, self._chunk_count() - 2)
+        ):
+            def slides(add_input, parts, first=first, last=last, t0=t0, t1=t1):
+                self._sp_images(valid, clips, frames, offsets, first, last, add_input, parts, "ck_chain",
+                                motion_engine, profile=profile)
+                # Frame-exact cut: chunk sizes add up to the single-pass frame count
+                start = int(round((t0 - (offsets[first - 1] if first else 0.0)) * profile.fps))
+                count = int(round(t1 * profile.fps)) - int(round(t0 * profile.fps))
+                parts.append(
+                    f"[ck_chain]trim=start_frame={start}:end_frame={start + count},"
+                    f"setpts=PTS-STARTPTS[sp_slides]"
+                )
+            jobs.append((f"slides {first}-{last}", self.intro_duration + t0, t1 - t0, slides, "sp_slides"))
+        jobs.append(("outro", self.intro_duration + slideshow_duration, self.outro_duration,
+                     lambda add_input, parts: self._sp_outro(outro_image, add_input, parts, profile=profile),
+                     "sp_outro"))
+
+        workers, threads = self._pool_plan(len(jobs))
+
+        def render_chunk(k: int) -> str:
+            stage, start, duration, build, label = jobs[k]
+            input_args: List[str] = []
+            parts: List[str] = []
+            build(self._input_adder(input_args), parts)
+            # Captions are timed on the whole reel: shift the chunk to its
+            # place on the timeline while they are drawn, then back to 0
+            chain = [f"setpts=PTS-STARTPTS+{start:.6f}/TB", *caption_filters] if caption_filters else []
+            parts.append(f"[{label}]{','.join(chain + ['setpts=PTS-STARTPTS'])}[ck_out]")
+            out = os.path.join(tmp_dir, f"chunk_{k}.mp4")
+            cmd = ["ffmpeg", "-y", *input_args,
+                   "-filter_complex", ";".join(parts),
+                   "-map", "[ck_out]",
+                   *self._final_codec_args(profile),
+                   "-flags", "+cgop",
+                   "-pix_fmt", PIX_FMT,
+                   "-r", str(profile.fps),
+                   "-an",
+                   "-threads", str(threads),
+                   out]
+            self._run_ffmpeg(cmd, f"chunk_{k} ({stage})", duration)
+            return out
+
+        logger.info(f"Rendering {len(jobs)} chunks ({workers} workers × {threads} threads)")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            chunk_paths = list(pool.map(render_chunk, range(len(jobs))))
+
+        list_path = os.path.join(tmp_dir, "chunks.txt")
+        with open(list_path, "w") as f:
+            for path in chunk_paths:
+                f.write(f"file '{path}'\n")
+        cmd = ["ffmpeg", "-y",
+               "-f", "concat", "-safe", "0", "-i", list_path,
+               "-i", audio_path,
+               "-map", "0:v:0", "-map", "1:a:0",
+               "-c:v", "copy",
+               "-c:a", "aac", "-b:a", "256k",
+               "-shortest",
+               output_path]
+        self._run_ffmpeg(cmd, "chunk_join", self._reel_duration)
+        return output_path
+
+    @staticmethod
+    def _chunk_count() -> int:
+        """Chunks per reel: RENDER_CHUNKS, or one per CHUNK_THREADS budgeted CPUs (at least 3)."""
+        if settings.RENDER_CHUNKS:
+            return settings.RENDER_CHUNKS
+        return max(3, BUDGET.cpus // CHUNK_THREADS)
+
+    def _chunk_spans(self, n: int, per_image: float, offsets: List[float],
+                     total_duration: float, groups: int) -> List[Tuple[int, int, float, float]]:
+        """Split an n-image slideshow into `groups` runs of images.
+
+        Returns (first, last, t0, t1) per run: images first..last feed the
+        chunk, which covers slideshow time [t0, t1). Cuts fall where an
+        image has finished fading in, so no xfade straddles two chunks;
+        without such a gap (per_image <= 2 × transition) it stays whole.
+        """
+        if n == 0:
+            return []
+        td = self.transition_dur
+        if per_image <= 2 * td:
+            groups = 1
+        groups = max(1, min(groups, n))
+        bounds = [round(g * n / groups) for g in range(groups + 1)]
+
+        def solo_start(j: int) -> float:
+            return offsets[j - 1] + td if j else 0.0
+
+        spans = []
+        for g in range(groups):
+            first, nxt = bounds[g], bounds[g + 1]
+            t1 = solo_start(nxt) if nxt < n else total_duration
+            spans.append((first, min(nxt, n - 1), solo_start(first), t1))
+        return spans
+
+    def _slideshow_timing(self, n: int, total_duration: float) -> Tuple[float, List[float]]:
+        """Per-image clip length and the xfade offsets for an n-image slideshow.
+
+        Each xfade overlaps two clips by transition_dur, so clips are
+        lengthened to keep the slideshow at total_duration. Offset k is where
+        the transition into image k+1 starts, measured on the merged stream.
+        """
+        if n <= 1:
+            return total_duration, []
+        td = self.transition_dur
+        per_image = (total_duration + (n - 1) * td) / n
+        offsets = [(k + 1) * (per_image - td) for k in range(n - 1)]
+        return per_image, offsets
+
     # ── Helpers ────────────────────────────────────────────────────────────
 
-    def _black_clip(self, duration: float, output: str) -> str:
+    def _black_clip(
+        self, duration: float, output: str, profile: Optional[RenderProfile] = None
+    ) -> str:
         """Generate a plain black clip as a fallback."""
+        profile = profile or self.profile
         cmd = [
             "ffmpeg", "-y",
-            "-f", "lavfi", "-i", f"color=c=black:s={WIDTH}x{HEIGHT}:d={duration}:r={FPS}",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "18",
-            "-pix_fmt", PIX_FMT,
+            "-f", "lavfi", "-i", f"color=c=black:s={profile.width}x{profile.height}:d={duration}:r={profile.fps}",
+            *self._codec_args(),
             "-t", str(duration),
             output,
         ]
-        self._run_ffmpeg(cmd, "black_clip")
+        self._run_ffmpeg(cmd, "black_clip", duration)
         return output
 
+    def _make_tmp_dir(self) -> str:
+        """Temp dir for intermediates, on tmpfs when the profile asks for it."""
+        profile = INTERMEDIATE_PROFILES[self.intermediate_profile]
+        if profile["tmpfs"] and os.path.isdir(TMPFS_DIR):
+            return tempfile.mkdtemp(prefix="faceless_", dir=TMPFS_DIR)
+        return tempfile.mkdtemp(prefix="faceless_")
+
+    def _tmp_path(self, tmp_dir: str, name: str) -> str:
+        """Path for intermediate `name` with the profile's container extension."""
+        return os.path.join(tmp_dir, name + INTERMEDIATE_PROFILES[self.intermediate_profile]["ext"])
+
+    def _final_codec_args(self, profile: Optional[RenderProfile] = None) -> List[str]:
+        """Video codec args for the deliverable, per the render profile."""
+        profile = profile or self.profile
+        crf = profile.crf if profile.crf is not None else 18
+        return ["-c:v", "libx264", "-preset", profile.preset, "-crf", str(crf)]
+
+    def _codec_args(self, preset: str = "fast") -> List[str]:
+        """Video codec args for an intermediate encode."""
+        args = INTERMEDIATE_PROFILES[self.intermediate_profile]["args"]
+        if args is None:
+            args = ["-c:v", "libx264", "-preset", preset, "-crf", "18"]
+        return args + ["-pix_fmt", PIX_FMT]
+
+    def _can_stream_copy(self, clips: List[str]) -> bool:
+        """Whether `clips` can be joined with `-c copy` instead of re-encoded.
+
+        The profile must encode every stage with the same arguments (the h264
+        profile mixes presets, so its SPS/PPS differ between stages), and the
+        probed streams must agree on codec, geometry and timing. x264 emits
+        closed GOPs by default and FFV1/rawvideo are intra-only, so every
+        clip starts on a keyframe.
+        """
+        if INTERMEDIATE_PROFILES[self.intermediate_profile]["args"] is None:
+            return False
+        from reel_generator.utils import streams_match
+        if not streams_match(clips, "v"):
+            logger.info("Intermediate stream parameters differ — re-encoding concat")
+            return False
+        return True
+
     def _get_audio_duration(self, audio_path: str) -> float:
         """Get duration of an audio file using ffprobe."""
         try:
@@ -463,16 +1041,25 @@ class FacelessVideoService:
             size = os.path.getsize(audio_path)
             return size / (16 * 1024)
 
-    @staticmethod
-    def _run_ffmpeg(cmd: list, stage: str):
-        """Run an FFmpeg command and handle errors."""
+    def _run_ffmpeg(self, cmd: list, stage: str, duration: Optional[float] = None):
+        """Run an FFmpeg command with live progress and record its throughput.
+
+        `duration` is the expected output length, used for percent and ETA.
+        """
         logger.debug(f"FFmpeg [{stage}]: {' '.join(cmd)}")
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
-        except subprocess.CalledProcessError as e:
-            stderr = e.stderr.decode() if e.stderr else "Unknown"
-            logger.error(f"FFmpeg [{stage}] failed:\n{stderr}")
-            raise RuntimeError(f"FFmpeg [{stage}] failed: {stderr}") from e
+            stats = run_ffmpeg(cmd, stage, duration, self.on_progress, settings.FFMPEG_LOG_DIR)
+        except RuntimeError as e:
+            logger.error(str(e))
+            raise
+        self.render_stats.append(stats)
+
+    def _log_throughput(self):
+        """One summary line with the achieved fps of every stage of the last build."""
+        if self.render_stats:
+            logger.info("Render throughput: " + ", ".join(
+                f"{s.stage} {s.fps:.1f}fps/{s.speed:.2f}x" for s in self.render_stats
+            ))
 
     def _has_filter(self, name: str) -> bool:
         """Check if a specific FFmpeg filter is available."""
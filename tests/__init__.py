@@ -1 +1,8 @@
 """Tests package."""
+import os
+import tempfile
+
+# FFmpeg render logs default to outputs/logs/ffmpeg under the working
+# directory; keep test runs from writing them into the checkout. Set before
+# any test module imports reel_generator, which reads it at import time.
+os.environ.setdefault("FFMPEG_LOG_DIR", os.path.join(tempfile.gettempdir(), "reel_tests_ffmpeg_logs"))
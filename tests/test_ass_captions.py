@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest.mock import patch
+
+from reel_generator.ass_captions import has_libass, write_ass, subtitles_filter
+
+
+class TestAssCaptions(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.ass_path = os.path.join(self.test_dir, "captions.ass")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _dialogues(self):
+        with open(self.ass_path) as f:
+            return [l.rstrip("\n") for l in f if l.startswith("Dialogue:")]
+
+    def test_typewriter_emits_one_event_per_word(self):
+        write_ass([("Breaking news today.", 3.0, 6.0)], self.ass_path, typewriter=True)
+        events = self._dialogues()
+        self.assertEqual(len(events), 3)
+        self.assertTrue(events[0].startswith("Dialogue: 0,0:00:03.00,"))
+        self.assertTrue(events[0].endswith("Breaking"))
+        self.assertTrue(events[-1].endswith("Breaking news today."))
+        self.assertIn(",0:00:06.00,", events[-1])
+
+    def test_static_caption_wraps_like_png_renderer(self):
+        text = "Officials confirmed the new coastal road will open to traffic next month."
+        write_ass([(text, 0.0, 4.0)], self.ass_path, typewriter=False, y_ratio=0.75)
+        events = self._dialogues()
+        self.assertEqual(len(events), 1)
+        self.assertIn("{\\pos(540,1440)}", events[0])
+        self.assertIn("Officials confirmed the new coastal\\Nroad will open", events[0])
+
+    def test_filter_escapes_colons(self):
+        expr = subtitles_filter("/tmp/a:b.ass", "/fonts")
+        self.assertIn("filename='/tmp/a\\:b.ass'", expr)
+        self.assertIn(":fontsdir='/fonts'", expr)
+
+
+
+class TestHasLibass(unittest.TestCase):
+    def setUp(self):
+        has_libass.cache_clear()
+        self.addCleanup(has_libass.cache_clear)
+
+    def _probe(self, stdout):
+        done = subprocess.CompletedProcess([], 0, stdout=stdout, stderr="")
+        with patch("reel_generator.ass_captions.subprocess.run", return_value=done) as run:
+            found = has_libass()
+            self.assertEqual(has_libass(), found)
+        self.assertEqual(run.call_count, 1)
+        return found
+
+    def test_subtitles_filter_listed(self):
+        self.assertTrue(self._probe(
+            " ... subtitles         V->V       Render text subtitles onto input video using the libass library.\n"
+        ))
+
+    def test_build_without_libass(self):
+        self.assertFalse(self._probe(" ... subtract          VV->V      Subtract two video streams.\n"))
+
+    def test_missing_ffmpeg(self):
+        with patch("reel_generator.ass_captions.subprocess.run", side_effect=FileNotFoundError):
+            self.assertFalse(has_libass())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from reel_generator import caption_generator
+from reel_generator.caption_generator import (
+    MAX_CHARS_FROM_WIDTH, caption_sources, render_captions_to_images,
+)
+from reel_generator.render_profile import get_profile
+from reel_generator.sprites import sprite_offset
+
+FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
+
+def draw_caption(text, profile, font):
+    """Reference: the visible text wrapped and drawn from scratch."""
+    img = Image.new('RGBA', (profile.width, profile.height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    y = int(profile.height * 0.8)
+    for line in textwrap.wrap(text, width=MAX_CHARS_FROM_WIDTH):
+        bbox = draw.textbbox((0, 0), line, font=font)
+        x = (profile.width - (bbox[2] - bbox[0])) // 2
+        shadow = profile.px(2)
+        draw.text((x + shadow, y + shadow), line, font=font, fill="black")
+        draw.text((x, y), line, font=font, fill="white")
+        y += bbox[3] - bbox[1] + profile.px(10)
+    return img
+
+
+@unittest.skipUnless(os.path.exists(FONT), "caption font not installed")
+class TestTypewriterCaptions(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def assert_frames_match_redraw(self, script, profile):
+        profile = get_profile(profile)
+        font = ImageFont.truetype(FONT, profile.px(40))
+        captions = render_captions_to_images(script, self.test_dir, use_overlay=False, profile=profile)
+        for caption in captions:
+            self.assertEqual(sprite_offset(caption["image_path"]), (caption["x"], caption["y"]))
+            frame = Image.new('RGBA', (profile.width, profile.height), (0, 0, 0, 0))
+            with Image.open(caption["image_path"]) as im:
+                self.assertLess(im.height, profile.height // 4)
+                frame.paste(im, (caption["x"], caption["y"]))
+            diff = ImageChops.difference(frame, draw_caption(caption["text"], profile, font))
+            self.assertIsNone(diff.getbbox(), caption["text"])
+        return captions
+
+    def test_revealed_words_match_a_full_redraw(self):
+        captions = self.assert_frames_match_redraw(
+            "The long-awaited bridge renovation is finally complete, and commuters celebrate. Yes.",
+            "final",
+        )
+        self.assertEqual([c["word_idx"] for c in captions[:3]], [0, 1, 2])
+        self.assertEqual(captions[-1]["text"], "Yes.")
+
+    def test_words_broken_by_the_wrap_fall_back_per_step(self):
+        self.assert_frames_match_redraw(
+            "An extraordinarilylongcompoundwordthatcannotfit appears here.", "preview"
+        )
+
+    def test_in_memory_frames_match_the_pngs(self):
+        script = "Officials confirmed the road. It opens next month."
+        files = render_captions_to_images(script, self.test_dir)
+        names = sorted(os.listdir(self.test_dir))
+        sprites = render_captions_to_images(script, self.test_dir, in_memory=True)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), names)
+        self.assertEqual(len(files), len(sprites))
+        for on_disk, in_memory in zip(files, sprites):
+            self.assertIsNone(in_memory["image_path"])
+            sprite = in_memory["image"]
+            self.assertEqual(sprite_offset(on_disk["image_path"]), (sprite.x, sprite.y))
+            with Image.open(on_disk["image_path"]) as im:
+                self.assertIsNone(ImageChops.difference(im, sprite.image).getbbox())
+        self.assertEqual(caption_sources(sprites), [c["image"] for c in sprites])
+
+    def test_pool_render_matches_inline_render(self):
+        script = "Officials confirmed the road. It opens next month. Commuters celebrate."
+        inline_dir = os.path.join(self.test_dir, "inline")
+        os.mkdir(inline_dir)
+        with mock.patch.object(caption_generator, "CAPTION_WORKERS", 1):
+            inline = render_captions_to_images(script, inline_dir)
+        with mock.patch.object(caption_generator, "CAPTION_WORKERS", 2), \
+                mock.patch.object(caption_generator, "MIN_PARALLEL_FRAMES", 0):
+            pooled = render_captions_to_images(script, self.test_dir)
+
+        self.assertEqual(
+            [os.path.basename(c["image_path"]) for c in pooled],
+            [f"caption_{i}.png" for i in range(10)],
+        )
+        for a, b in zip(inline, pooled):
+            self.assertEqual({**a, "image_path": None}, {**b, "image_path": None})
+            with open(a["image_path"], "rb") as fa, open(b["image_path"], "rb") as fb:
+                self.assertEqual(fa.read(), fb.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from reel_generator.brand_assets import conform_card, conform_overlay
+from reel_generator.clip_cache import ClipCache, kenburns_filter, render_kenburns
+
+
+def _fake_ffmpeg(cmd, what):
+    """Stand-in for the cache-fill FFmpeg runner: just creates the output."""
+    open(cmd[-1], "wb").close()
+
+
+class TestClipCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = ClipCache(os.path.join(self.test_dir, "cache"), max_mb=1)
+        self.renders = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _render(self, size):
+        def render(out):
+            self.renders.append(out)
+            with open(out, "wb") as f:
+                f.write(b"\0" * size)
+        return render
+
+    def _image(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_hit_skips_render(self):
+        first = self.cache.get("ab" * 32, self._render(10))
+        second = self.cache.get("ab" * 32, self._render(10))
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.renders), 1)
+        self.assertTrue(os.path.isfile(first))
+
+    def test_evicts_least_recently_used(self):
+        size = 300 * 1024
+        a, b, c = (self.cache.get(k * 32, self._render(size)) for k in ("aa", "bb", "cc"))
+        now = time.time()
+        for path, age in ((a, 120), (b, 60), (c, 30)):
+            os.utime(path, (now - age, now - age))
+        # The hit refreshes a, leaving b as the least recently used
+        self.cache.get("aa" * 32, self._render(size))
+        d = self.cache.get("dd" * 32, self._render(size))
+        self.assertEqual([os.path.isfile(p) for p in (a, b, c, d)], [True, False, True, True])
+
+    def test_new_entry_survives_even_when_over_budget(self):
+        path = self.cache.get("ee" * 32, self._render(2 * 1024 * 1024))
+        self.assertTrue(os.path.isfile(path))
+
+    @patch("reel_generator.clip_cache._run_clip_ffmpeg")
+    def test_kenburns_key_follows_content_and_motion(self, run):
+        run.side_effect = _fake_ffmpeg
+        img = self._image("a.jpg", b"one")
+        copy = self._image("b.jpg", b"one")
+        other = self._image("c.jpg", b"two")
+
+        base = self.cache.kenburns(img, 150, True)
+        self.assertEqual(self.cache.kenburns(copy, 150, True), base)
+        self.assertNotEqual(self.cache.kenburns(img, 150, False), base)
+        self.assertNotEqual(self.cache.kenburns(img, 151, True), base)
+        self.assertNotEqual(self.cache.kenburns(other, 150, True), base)
+        self.assertEqual(run.call_count, 4)
+
+    @patch("reel_generator.clip_cache._run_clip_ffmpeg")
+    def test_motion_engine_is_part_of_key(self, run):
+        run.side_effect = _fake_ffmpeg
+        img = self._image("a.jpg", b"one")
+        self.assertNotEqual(
+            self.cache.kenburns(img, 150, True, engine="scale"),
+            self.cache.kenburns(img, 150, True),
+        )
+        scale, zoompan = (call[0][0] for call in run.call_args_list)
+        self.assertIn("eval=frame", scale[scale.index("-vf") + 1])
+        self.assertIn("zoompan", zoompan[zoompan.index("-vf") + 1])
+
+    @patch("reel_generator.clip_cache._run_clip_ffmpeg")
+    def test_default_threads_left_to_render_budget(self, run):
+        # An explicit -threads would stop RenderBudget.apply from setting the slot's
+        render_kenburns("a.jpg", "out.mp4", 30, True)
+        self.assertNotIn("-threads", run.call_args[0][0])
+        render_kenburns("a.jpg", "out.mp4", 30, True, threads=3)
+        cmd = run.call_args[0][0]
+        self.assertEqual(cmd[cmd.index("-threads") + 1], "3")
+
+    def test_zero_budget_disables(self):
+        self.assertFalse(ClipCache(self.test_dir, max_mb=0).enabled)
+
+
+class TestScaleMotion(unittest.TestCase):
+    def test_zoom_expressions_match_zoompan(self):
+        zoom_in = kenburns_filter(300, True, engine="scale")
+        self.assertIn("2*round(1080*min(1+0.0008*(n+1),1.15)/2)", zoom_in)
+        zoom_out = kenburns_filter(300, False, engine="scale", fps=15)
+        self.assertIn("if(eq(n,0),1,max(1.15-0.0016*(n-1),1))", zoom_out)
+
+    def test_still_is_cloned_to_frame_count(self):
+        chain = kenburns_filter(300, True, engine="scale")
+        self.assertIn("tpad=stop=299:stop_mode=clone,trim=end_frame=300,", chain)
+        # Converted once, before the still is cloned
+        self.assertLess(chain.index("format=yuv420p"), chain.index("tpad"))
+
+    def test_unknown_engine_rejected(self):
+        with self.assertRaises(ValueError):
+            kenburns_filter(300, True, engine="pil")
+
+
+class TestBrandAssets(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache = ClipCache(os.path.join(self.test_dir, "brand"), max_mb=64)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _asset(self, name, data=b"asset"):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    @patch("reel_generator.brand_assets._run_clip_ffmpeg")
+    def test_card_conformed_once_per_version(self, run):
+        run.side_effect = _fake_ffmpeg
+        intro = self._asset("intro.mp4")
+        first = conform_card(intro, 3.0, cache=self.cache)
+        self.assertEqual(conform_card(intro, 3.0, cache=self.cache), first)
+        self.assertEqual(run.call_count, 1)
+
+        cmd = run.call_args[0][0]
+        self.assertIn("-an", cmd)
+        self.assertEqual(cmd[cmd.index("-frames:v") + 1], "90")
+        self.assertNotIn("-loop", cmd)
+
+        # A new asset version (different bytes) invalidates the entry
+        with open(intro, "ab") as f:
+            f.write(b"v2")
+        self.assertNotEqual(conform_card(intro, 3.0, cache=self.cache), first)
+
+    @patch("reel_generator.brand_assets._run_clip_ffmpeg")
+    def test_still_card_is_looped_and_overlay_stays_png(self, run):
+        run.side_effect = _fake_ffmpeg
+        conform_card(self._asset("outro.png"), 3.0, cache=self.cache)
+        self.assertIn("-loop", run.call_args[0][0])
+        overlay = conform_overlay(self._asset("overlay.png"), cache=self.cache)
+        self.assertTrue(overlay.endswith(".png"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,11 @@
 import os
+import re
 import unittest
 from unittest.mock import MagicMock, patch
 import tempfile
 import shutil
 
+from reel_generator.render_budget import RenderBudget
 from src.agents.faceless_reel_agent import FacelessReelAgent
 from src.services.faceless_video_service import FacelessVideoService
 from src.config.settings import settings
@@ -75,5 +77,184 @@ class TestFacelessReel(unittest.TestCase):
         self.assertTrue(os.path.exists(final_path))
         self.assertGreater(os.path.getsize(final_path), 0)
 
+class TestSlideshowTiming(unittest.TestCase):
+    def test_xfade_offsets_fill_slideshow(self):
+        service = FacelessVideoService()
+        td = service.transition_dur
+        per_image, offsets = service._slideshow_timing(4, 20.0)
+
+        self.assertEqual(len(offsets), 3)
+        # Each xfade starts one (per_image - td) step after the previous one
+        for k, offset in enumerate(offsets):
+            self.assertAlmostEqual(offset, (k + 1) * (per_image - td))
+        # Last clip ends exactly at the slideshow duration
+        self.assertAlmostEqual(offsets[-1] + per_image, 20.0)
+
+    def test_single_image_has_no_transitions(self):
+        per_image, offsets = FacelessVideoService()._slideshow_timing(1, 12.0)
+        self.assertEqual((per_image, offsets), (12.0, []))
+
+    @patch("src.services.faceless_video_service.BUDGET", RenderBudget(cpus=8, max_jobs=8))
+    def test_pool_splits_cores_between_workers(self):
+        with patch.object(settings, "RENDER_WORKERS", 0):
+            self.assertEqual(FacelessVideoService._pool_plan(3), (3, 2))
+            self.assertEqual(FacelessVideoService._pool_plan(20), (8, 1))
+        with patch.object(settings, "RENDER_WORKERS", 2):
+            self.assertEqual(FacelessVideoService._pool_plan(5), (2, 4))
+
+    def test_per_call_profile_leaves_service_profile(self):
+        service = FacelessVideoService(render_profile="final")
+        build = MagicMock(return_value="out.mp4")
+        with patch.object(service, "_get_audio_duration", return_value=20.0), \
+             patch.object(service, "_build_single_pass", build):
+            service.build_reel(["a.jpg"], "voice.mp3", "out.mp4", engine="single_pass",
+                               render_profile="preview")
+        self.assertEqual(build.call_args.kwargs["profile"].name, "preview")
+        self.assertEqual(service.profile.name, "final")
+        self.assertEqual(service.fps, 30)
+
+
+class TestSinglePassEngine(unittest.TestCase):
+    def setUp(self):
+        self.service = FacelessVideoService()
+        self.service.transition_dur = 1.0
+        self.service.clip_cache = MagicMock(enabled=False)
+        self.service._reel_duration = 26.0
+        self.test_dir = tempfile.mkdtemp()
+        self.images = []
+        for i in range(3):
+            self.images.append(os.path.join(self.test_dir, f"img_{i}.jpg"))
+            open(self.images[-1], "wb").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _build(self, caption_backend):
+        cmds = []
+        with patch.object(self.service, "_has_filter", return_value=True), \
+             patch.object(self.service, "_run_ffmpeg", side_effect=lambda cmd, *a: cmds.append(cmd)):
+            self.service._build_single_pass(
+                self.images, "voice.mp3", "out.mp4", "missing_logo.png", "missing_outro.png",
+                [("Hello", 4.0, 9.0)], 20.0, self.test_dir, caption_backend=caption_backend,
+            )
+        self.assertEqual(len(cmds), 1)
+        return cmds[0], cmds[0][cmds[0].index("-filter_complex") + 1]
+
+    def test_graph_chains_slides_captions_and_voiceover(self):
+        cmd, graph = self._build("drawtext")
+        # Three 22/3s clips: each xfade starts one (per_image - 1s) step later
+        self.assertEqual(re.findall(r"xfade=transition=\w+:duration=1.0:offset=([\d.]+)", graph),
+                         ["6.333", "12.667"])
+        self.assertIn("[sp_intro][sp_slides][sp_outro]concat=n=3:v=1:a=0[sp_base]", graph)
+        # Captions are timed on the full reel, after the concat
+        self.assertRegex(graph, r"\[sp_base\]drawtext=text='Hello'.*between\(t,4\.00,9\.00\)'\[sp_out\]")
+        voice = cmd.index("voice.mp3")
+        self.assertEqual(cmd[voice - 1], "-i")
+        audio_idx = cmd[:voice].count("-i") - 1
+        maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+        self.assertEqual(maps, ["[sp_out]", f"{audio_idx}:a:0"])
+        self.assertIn("-shortest", cmd)
+
+    def test_ass_backend_burns_one_subtitles_filter(self):
+        _, graph = self._build("ass")
+        self.assertNotIn("drawtext=text='Hello'", graph)
+        self.assertRegex(graph, r"\[sp_base\]subtitles=[^;]*captions\.ass[^;]*\[sp_out\]$")
+        self.assertTrue(os.path.isfile(os.path.join(self.test_dir, "captions.ass")))
+
+
+class TestChunkedEngine(unittest.TestCase):
+    def setUp(self):
+        self.service = FacelessVideoService()
+        self.service.transition_dur = 1.0
+
+    def test_spans_cut_outside_transitions(self):
+        per_image, offsets = self.service._slideshow_timing(6, 30.0)
+        spans = self.service._chunk_spans(6, per_image, offsets, 30.0, 3)
+        self.assertEqual([(a, b) for a, b, _, _ in spans], [(0, 2), (2, 4), (4, 5)])
+        self.assertEqual(spans[0][2], 0.0)
+        self.assertEqual(spans[-1][3], 30.0)
+        for prev, nxt in zip(spans, spans[1:]):
+            self.assertEqual(prev[3], nxt[2])
+            # Image `first` has fully faded in at the cut
+            self.assertAlmostEqual(nxt[2], offsets[nxt[0] - 1] + 1.0)
+
+    def test_no_gap_between_transitions_keeps_one_span(self):
+        per_image, offsets = self.service._slideshow_timing(4, 4.0)
+        self.assertEqual(self.service._chunk_spans(4, per_image, offsets, 4.0, 3), [(0, 3, 0.0, 4.0)])
+
+    def test_chunks_are_frame_exact_and_joined_without_reencode(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            images = []
+            for i in range(4):
+                images.append(os.path.join(test_dir, f"img_{i}.jpg"))
+                open(images[-1], "wb").close()
+            self.service.clip_cache = MagicMock(enabled=False)
+            self.service._reel_duration = 26.0
+            cmds = []
+            with patch.object(settings, "RENDER_CHUNKS", 4), \
+                 patch.object(self.service, "_has_filter", return_value=True), \
+                 patch.object(self.service, "_run_ffmpeg", side_effect=lambda cmd, *a: cmds.append(cmd)):
+                self.service._build_chunked(
+                    images, "voice.mp3", "out.mp4", "missing_logo.png", "missing_outro.png",
+                    [("Hello", 1.0, 9.0)], 20.0, test_dir,
+                )
+            *chunks, join = cmds
+            self.assertEqual(len(chunks), 4)  # intro, 2 slideshow chunks, outro
+            for cmd in chunks:
+                self.assertIn("+cgop", cmd)
+                self.assertIn("-an", cmd)
+            graphs = [cmd[cmd.index("-filter_complex") + 1] for cmd in chunks[1:3]]
+            frames = 0
+            for graph in graphs:
+                start, end = (int(x) for x in re.search(r"start_frame=(\d+):end_frame=(\d+)", graph).groups())
+                frames += end - start
+            self.assertEqual(frames, 20 * self.service.fps)
+            # Captions keep reel time: the second slideshow chunk is shifted
+            self.assertIn("setpts=PTS-STARTPTS+", graphs[1])
+            self.assertIn("copy", join)
+            self.assertEqual(join[join.index("-map", join.index("-map") + 1) + 1], "1:a:0")
+        finally:
+            shutil.rmtree(test_dir)
+
+
+class TestIntermediateProfiles(unittest.TestCase):
+    def test_h264_profile_keeps_stage_preset(self):
+        service = FacelessVideoService()
+        service.intermediate_profile = "h264"
+        self.assertEqual(
+            service._codec_args("medium"),
+            ["-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p"],
+        )
+        self.assertTrue(service._tmp_path("/tmp/x", "seg_0").endswith("seg_0.mp4"))
+
+    def test_lossless_profiles_ignore_preset(self):
+        service = FacelessVideoService()
+        service.intermediate_profile = "ffv1"
+        self.assertEqual(service._codec_args("medium")[:2], ["-c:v", "ffv1"])
+        self.assertEqual(service._tmp_path("/tmp/x", "concat"), "/tmp/x/concat.mkv")
+
+    def test_stream_copy_needs_uniform_profile_and_matching_streams(self):
+        service = FacelessVideoService()
+        clips = ["intro.mkv", "slideshow.mkv", "outro.mkv"]
+        service.intermediate_profile = "h264"
+        self.assertFalse(service._can_stream_copy(clips))
+
+        service.intermediate_profile = "x264_lossless"
+        params = {"codec_name": "h264", "width": 1080, "height": 1920}
+        with patch("reel_generator.utils.probe_stream", return_value=params):
+            self.assertTrue(service._can_stream_copy(clips))
+        probes = [params, params, dict(params, width=720)]
+        with patch("reel_generator.utils.probe_stream", side_effect=probes):
+            self.assertFalse(service._can_stream_copy(clips))
+        with patch("reel_generator.utils.probe_stream", return_value=None):
+            self.assertFalse(service._can_stream_copy(clips))
+
+    def test_unknown_profile_rejected(self):
+        with patch.object(settings, "INTERMEDIATE_PROFILE", "prores"):
+            with self.assertRaises(ValueError):
+                FacelessVideoService()
+
+
 if __name__ == '__main__':
     unittest.main()
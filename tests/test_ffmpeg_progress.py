@@ -0,0 +1,134 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from reel_generator.ffmpeg_progress import StderrLog, parse_progress, run_ffmpeg
+from reel_generator.frame_pipe import RawFrames
+
+PROGRESS = """frame=30
+fps=0.00
+out_time_us=1000000
+speed=N/A
+progress=continue
+frame=90
+fps=45.10
+out_time_us=3000000
+speed=1.5x
+progress=end
+"""
+
+
+def fake_popen(stdout, stderr="", returncode=0):
+    proc = MagicMock()
+    proc.stdout = io.StringIO(stdout)
+    proc.stderr = io.StringIO(stderr)
+    proc.returncode = returncode
+    return MagicMock(return_value=proc)
+
+
+class TestFFmpegProgress(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_blocks_end_at_progress_key(self):
+        blocks = list(parse_progress(io.StringIO(PROGRESS)))
+        self.assertEqual([b["frame"] for b in blocks], ["30", "90"])
+        self.assertEqual(blocks[-1]["progress"], "end")
+
+    def test_reports_progress_and_returns_stats(self):
+        updates = []
+        popen = fake_popen(PROGRESS)
+        with patch("reel_generator.ffmpeg_progress.subprocess.Popen", popen):
+            stats = run_ffmpeg(
+                ["ffmpeg", "-y", "out.mp4"], "final", duration=6.0,
+                on_progress=updates.append, log_dir=self.test_dir,
+            )
+
+        cmd = popen.call_args[0][0]
+        self.assertEqual(cmd[:4], ["ffmpeg", "-progress", "pipe:1", "-nostats"])
+        self.assertEqual([u["percent"] for u in updates], [100 / 6, 50.0])
+        self.assertEqual((stats.stage, stats.frames, stats.out_time), ("final", 90, 3.0))
+        self.assertGreater(stats.fps, 0)
+        self.assertIn("fps", stats.as_dict())
+
+    def test_failure_raises_with_stderr_tail_and_log(self):
+        stderr = "".join(f"line {i}\n" for i in range(500)) + "No such filter\n"
+        with patch("reel_generator.ffmpeg_progress.subprocess.Popen", fake_popen("", stderr, 1)):
+            with self.assertRaises(RuntimeError) as ctx:
+                run_ffmpeg(["ffmpeg", "-y", "out.mp4"], "final", log_dir=self.test_dir)
+        message = str(ctx.exception)
+        self.assertIn("No such filter", message)
+        self.assertNotIn("line 10\n", message)
+        (log,) = os.listdir(self.test_dir)
+        self.assertIn(log, message)
+        with open(os.path.join(self.test_dir, log)) as f:
+            self.assertEqual(f.read(), stderr)
+
+    def test_log_rotates_and_old_logs_are_pruned(self):
+        for _ in range(3):
+            log = StderrLog("segment 1", self.test_dir, max_mb=0.001, keep=2)
+            log.drain(io.StringIO("x" * 700 + "\n" + "y" * 700 + "\n"))
+        names = sorted(os.listdir(self.test_dir))
+        self.assertEqual(len(names), 4)  # two renders, each with one rotation
+        self.assertTrue(os.path.basename(log.path).split("_", 2)[2].startswith("segment_1_"))
+        with open(log.path + ".1") as f:
+            self.assertEqual(f.read(), "x" * 700 + "\n" + "y" * 700 + "\n")
+
+
+# Stands in for FFmpeg: reads every pipe:N input and reports the bytes of
+# each as frame=<first input bytes> * 1000 + <second input bytes>
+READ_PIPES = """
+import sys
+sizes = [len(open(int(a[5:]), "rb").read()) for a in sys.argv[1:] if a.startswith("pipe:") and a != "pipe:1"]
+print(f"frame={sizes[0] * 1000 + sizes[1]}")
+print("progress=end")
+"""
+
+
+class TestFramePipes(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_in_memory_inputs_are_piped(self):
+        fake_ffmpeg = os.path.join(self.test_dir, "ffmpeg")
+        with open(fake_ffmpeg, "w") as f:
+            f.write(f"#!{sys.executable}\n{READ_PIPES}")
+        os.chmod(fake_ffmpeg, 0o755)
+        dot = Image.new("RGBA", (2, 2), (255, 255, 255, 255))
+        track = RawFrames((4, 4), [(None, 2), ((dot, (1, 1)), 3)], fps=30)
+        still = RawFrames.still(dot)
+        self.assertEqual(track.input_options()[-4:], ["-s", "4x4", "-framerate", "30"])
+        stats = run_ffmpeg([fake_ffmpeg, "-i", track, "-i", still], "pipes", log_dir=None)
+        # 5 frames of 4x4 RGBA, then one 2x2 frame
+        self.assertEqual(stats.frames, 5 * 64 * 1000 + 16)
+
+    def test_frames_are_written_in_order(self):
+        dot = Image.new("RGBA", (2, 2), (255, 0, 0, 255))
+        track = RawFrames((4, 4), [(None, 1), ((dot, (2, 2)), 2)])
+        read_fd, write_fd = os.pipe()
+        track.write(write_fd)
+        with open(read_fd, "rb") as f:
+            data = f.read()
+        frame = 4 * 4 * 4
+        self.assertEqual(len(data), 3 * frame)
+        self.assertEqual(data[:frame], bytes(frame))
+        second = Image.frombytes("RGBA", (4, 4), data[frame:2 * frame])
+        self.assertEqual(second.getpixel((3, 3)), (255, 0, 0, 255))
+        self.assertEqual(second.getpixel((1, 1)), (0, 0, 0, 0))
+        self.assertEqual(data[frame:2 * frame], data[2 * frame:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from reel_generator.filter_graph import FilterGraph, filter_names
+
+
+class TestFilterGraph(unittest.TestCase):
+    def test_identical_inputs_are_opened_once(self):
+        graph = FilterGraph()
+        title = graph.input("title_seg_0.png")
+        self.assertEqual(graph.input("./title_seg_0.png"), title)
+        # Same file with different input options is a different input
+        looped = graph.input("title_seg_0.png", "-loop", "1", "-t", "3")
+        self.assertNotEqual(looped, title)
+        self.assertEqual(
+            graph.input_args,
+            ["-i", "title_seg_0.png", "-loop", "1", "-t", "3", "-i", "title_seg_0.png"],
+        )
+        self.assertEqual(graph.stats()["deduped_inputs"], 1)
+
+    def test_script_and_stats(self):
+        graph = FilterGraph()
+        a, b = graph.input("a.mp4"), graph.input("b.mp4")
+        graph.add([f"{a}:v"], ["fps=30", "setsar=1"], "v0")
+        graph.add([f"{b}:v"], ["fps=30", "setsar=1"], "v1")
+        graph.add(["v0", "v1"], "xfade=transition=fadeblack:duration=1.0:offset=2.00", "v_join")
+        graph.add(["v_join", f"{a}:v"], "overlay=0:0:enable='between(t,1,2)'", "v_final")
+        self.assertEqual(graph.render().split(";\n")[2], "[v0][v1]xfade=transition=fadeblack:duration=1.0:offset=2.00[v_join]")
+
+        stats = graph.stats()
+        self.assertEqual((stats["inputs"], stats["nodes"]), (2, 4))
+        self.assertEqual((stats["xfade"], stats["overlay"], stats["fps"]), (1, 1, 2))
+
+        tmp = tempfile.mkdtemp()
+        try:
+            path = graph.write_script(os.path.join(tmp, "graph.txt"))
+            with open(path) as f:
+                self.assertEqual(f.read(), graph.render() + "\n")
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_duplicate_label_rejected(self):
+        graph = FilterGraph()
+        graph.add(["0:v"], "null", "v0")
+        with self.assertRaises(ValueError):
+            graph.add(["1:v"], "null", "v0")
+
+    def test_multi_output_node(self):
+        graph = FilterGraph()
+        self.assertEqual(graph.add(["v_final"], "split=2", ["v_out0", "v_out1"]), ["v_out0", "v_out1"])
+        self.assertEqual(graph.render(), "[v_final]split=2[v_out0][v_out1]")
+        with self.assertRaises(ValueError):
+            graph.add(["v_out0"], "null", "v_out1")
+
+    def test_filter_names_ignore_quoted_commas(self):
+        self.assertEqual(
+            filter_names("scale=2:2,zoompan=z='min(zoom+0.0008,1.15)':d=1,setsar=1"),
+            ["scale", "zoompan", "setsar"],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from PIL import Image, ImageDraw
+
+from reel_generator.fonts import find_font, get_font, text_bbox
+
+
+class TestFontRegistry(unittest.TestCase):
+    def test_fonts_are_loaded_once_per_size(self):
+        self.assertIs(get_font(40), get_font(40))
+        self.assertIsNot(get_font(40), get_font(56))
+
+    def test_missing_explicit_path_falls_back(self):
+        self.assertEqual(find_font("/nonexistent/font.ttf"), find_font())
+
+    def test_measurements_match_textbbox(self):
+        draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        for text in ["Officials", "Officials confirmed the road", "Yes."]:
+            self.assertEqual(text_bbox(text, 40), draw.textbbox((0, 0), text, font=get_font(40)))
+
+    def test_measurements_are_cached(self):
+        text_bbox.cache_clear()
+        text_bbox("Bridge opens", 56)
+        text_bbox("Bridge opens", 56)
+        self.assertEqual(text_bbox.cache_info().hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
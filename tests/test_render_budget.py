@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from reel_generator.render_budget import RenderBudget, Slot, available_cpus, cgroup_cpu_quota
+
+
+class TestRenderBudget(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write(self, name, text):
+        path = os.path.join(self.test_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_cgroup_quota_v2_and_v1(self):
+        self.assertIsNone(cgroup_cpu_quota(self.test_dir))
+        self._write("cpu/cpu.cfs_quota_us", "150000\n")
+        self._write("cpu/cpu.cfs_period_us", "100000\n")
+        self.assertEqual(cgroup_cpu_quota(self.test_dir), 1.5)
+        self._write("cpu.max", "max 100000\n")
+        self.assertIsNone(cgroup_cpu_quota(self.test_dir))
+        self._write("cpu.max", "200000 100000\n")
+        self.assertEqual(cgroup_cpu_quota(self.test_dir), 2.0)
+        self.assertEqual(available_cpus(self.test_dir), min(2, len(os.sched_getaffinity(0))))
+
+    def test_threads_are_assigned_per_stage(self):
+        cmd = [
+            "ffmpeg", "-y", "-loop", "1", "-i", "a.png", "-i", "b.mp4",
+            "-filter_complex_script", "graph.txt",
+            "-map", "[v0]", "-c:v", "libx264", "-preset", "medium", "one.mp4",
+            "-map", "[v1]", "-c:v", "libx264", "-threads", "3", "two.mp4",
+            "-map", "[a]", "-c:v", "copy", "three.mp4",
+        ]
+        out = RenderBudget.apply(cmd, Slot(6))
+        self.assertEqual(out[:3], ["ffmpeg", "-filter_complex_threads", "6"])
+        self.assertIn("-loop 1 -threads 2 -i a.png -threads 2 -i b.mp4", " ".join(out))
+        self.assertIn("-c:v libx264 -threads 6 -preset medium one.mp4", " ".join(out))
+        # An encoder's own thread count and stream copies are left alone
+        self.assertIn("-c:v libx264 -threads 3 two.mp4", " ".join(out))
+        self.assertIn("-c:v copy three.mp4", " ".join(out))
+
+    def test_slots_share_cpus_and_cap_jobs(self):
+        budget = RenderBudget(cpus=8, max_jobs=2)
+        self.assertEqual(budget.plan(5), (2, 4))
+        admitted = []
+
+        def third():
+            with budget.slot():
+                admitted.append(1)
+
+        with budget.slot() as first:
+            with budget.slot() as second:
+                waiter = threading.Thread(target=third)
+                waiter.start()
+                waiter.join(0.1)
+                self.assertTrue(waiter.is_alive())  # third render queues
+            self.assertEqual((first.threads, second.threads), (8, 4))
+        waiter.join(1)
+        self.assertEqual(admitted, [1])
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "CPU pinning is Linux-only")
+    def test_pinned_slots_get_disjoint_cpus(self):
+        budget = RenderBudget(cpus=4, max_jobs=4, pin=True)
+        budget._free_cpus = [0, 1, 2, 3]
+        with budget.slot() as first, budget.slot() as second:
+            self.assertEqual(first.cpu_ids, [0, 1, 2, 3])
+            # Everything is held by the first render: the second runs unpinned
+            self.assertEqual((second.cpu_ids, second.threads), ([], 2))
+        with budget.slot() as again:
+            self.assertEqual(again.cpu_ids, [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,528 @@
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+
+from reel_generator.clip_cache import ClipCache, kenburns_filter
+from reel_generator.ffmpeg_progress import RenderStats
+from reel_generator.filter_graph import FilterGraph
+from reel_generator.frame_pipe import RawFrames
+from reel_generator.overlay_layers import enable_expr, flatten_layers, layer_windows
+from reel_generator.render_profile import OutputSpec, crop_to_aspect, get_profile
+from reel_generator.sprites import Sprite, make_sprite, save_sprite, sprite_box
+from reel_generator.video_builder import VideoBuilder
+
+
+class TestCaptionTrack(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.script = "Breaking news today. The bridge is open."
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_static_windows_split_by_word_count(self):
+        windows = VideoBuilder._caption_windows(self.script, 2, 3.0, 10.0)
+        self.assertEqual(len(windows), 2)
+        # 3 words vs 4 words over a 7s window
+        self.assertAlmostEqual(windows[0][0], 3.0)
+        self.assertAlmostEqual(windows[0][1], 6.0)
+        self.assertAlmostEqual(windows[1][1], 10.0)
+
+    def test_typewriter_windows_are_contiguous(self):
+        windows = VideoBuilder._caption_windows(self.script, 7, 3.0, 10.0)
+        self.assertEqual(len(windows), 7)
+        for prev, nxt in zip(windows, windows[1:]):
+            self.assertAlmostEqual(prev[1], nxt[0])
+        self.assertAlmostEqual(windows[-1][1], 10.0)
+
+    def test_track_fills_gaps_with_blank_frames(self):
+        captions = []
+        for i in range(2):
+            path = os.path.join(self.test_dir, f"caption_{i}.png")
+            img = Image.new("RGBA", (1080, 1920), (0, 0, 0, 0))
+            img.paste((255, 255, 255, 255), (100 + i, 1441, 900, 1500 + 40 * i))
+            img.save(path)
+            captions.append(path)
+        track, band = VideoBuilder()._write_caption_track(
+            captions, [(3.0, 5.0), (6.0, 8.0)], self.test_dir
+        )
+        with open(track) as f:
+            lines = f.read().splitlines()
+
+        self.assertEqual(lines[0], "ffconcat version 1.0")
+        durations = [float(l.split()[1]) for l in lines if l.startswith("duration")]
+        # blank 3s, caption 2s, blank 1s, caption 2s, trailing blank
+        self.assertEqual(durations[:4], [3.0, 2.0, 1.0, 2.0])
+        self.assertIn("caption_blank.png", lines[-1])
+        # Union of both captions' pixels, widened to even coordinates
+        self.assertEqual(band, (100, 1440, 800, 100))
+
+    def test_in_memory_track_matches_the_file_track(self):
+        sprites = []
+        for i, (x, y) in enumerate([(200, 1400), (300, 1500)]):
+            sprite = make_sprite(Image.new("RGBA", (100, 20), (255, 255, 255, 255)), (1080, 1920), (x, y))
+            sprites.append(sprite)
+        track, band = VideoBuilder()._caption_track_frames(sprites, [(3.0, 5.0), (6.0, 8.0)])
+        self.assertEqual(band, (200, 1400, 200, 120))
+        self.assertEqual(track.size, (200, 120))
+        # 30 fps: blank 90 frames, caption 60, blank 30, caption 60, trailing blank
+        self.assertEqual([count for _, count in track.runs], [90, 60, 30, 60, 1])
+        self.assertEqual(track.runs[3][0][1], (100, 100))
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_track_rebases_sprites_onto_the_band(self):
+        captions = []
+        for i, (x, y) in enumerate([(200, 1400), (300, 1500)]):
+            path = os.path.join(self.test_dir, f"caption_{i}.png")
+            img = Image.new("RGBA", (100, 20), (255, 255, 255, 255))
+            save_sprite(img, path, (1080, 1920), (x, y))
+            captions.append(path)
+        track, band = VideoBuilder()._write_caption_track(
+            captions, [(3.0, 5.0), (5.0, 8.0)], self.test_dir
+        )
+        self.assertEqual(band, (200, 1400, 200, 120))
+        with open(track) as f:
+            frames = [l.split("'")[1] for l in f if l.startswith("file")]
+        for path in frames:
+            with Image.open(path) as im:
+                self.assertEqual(im.size, (200, 120))
+        with Image.open(frames[2]) as im:
+            self.assertEqual(im.getpixel((100, 100)), (255, 255, 255, 255))
+            self.assertEqual(im.getpixel((0, 0)), (0, 0, 0, 0))
+
+
+class TestRenderProfile(unittest.TestCase):
+    def test_final_keeps_todays_geometry(self):
+        final = get_profile(None)
+        self.assertEqual((final.width, final.height, final.fps, final.preset), (1080, 1920, 30, "medium"))
+        self.assertEqual(final.px(56), 56)
+        zp = kenburns_filter(150, True, final.width, final.height, final.fps)
+        self.assertIn("scale=1280:2275:", zp)
+        self.assertIn("crop=1280:2120,", zp)
+        self.assertIn("z='min(zoom+0.0008,1.15)'", zp)
+
+    def test_preview_scales_layout_and_motion(self):
+        preview = get_profile("preview")
+        self.assertEqual((preview.width, preview.height, preview.fps), (540, 960, 15))
+        self.assertEqual(preview.px(56), 28)
+        zp = kenburns_filter(75, True, preview.width, preview.height, preview.fps)
+        self.assertIn("crop=640:1060,", zp)
+        # Half the frames, double the step: same zoom per second
+        self.assertIn("z='min(zoom+0.0016,1.15)'", zp)
+
+    def test_preview_title_is_preview_sized(self):
+        test_dir = tempfile.mkdtemp()
+        try:
+            path = VideoBuilder()._render_title_png("Bridge opens", test_dir, profile="preview")
+            x, y, w, h = sprite_box(path)
+            # A sprite of the text, placed inside the preview frame
+            self.assertLessEqual(x + w, 540)
+            self.assertLessEqual(y + h, 960)
+            self.assertLess(h, 960 // 2)
+        finally:
+            shutil.rmtree(test_dir)
+
+    def test_builder_fps_overrides_profile_rate(self):
+        config = {"render_profile": "preview"}
+        self.assertEqual(VideoBuilder()._profile(config).fps, 15)
+        profile = VideoBuilder(fps=24)._profile(config)
+        self.assertEqual((profile.width, profile.height, profile.fps), (540, 960, 24))
+
+    def test_unknown_profile_rejected(self):
+        with self.assertRaises(ValueError):
+            get_profile("4k")
+
+
+class TestOverlayLayers(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _layer(self, name, color, box, size=(1080, 1920)):
+        path = os.path.join(self.test_dir, name)
+        img = Image.new("RGBA", size, (0, 0, 0, 0))
+        img.paste(color, box)
+        img.save(path)
+        return path
+
+    def test_windows_group_identical_layer_sets(self):
+        layers = [("a.png", 3.0, 8.0), ("b.png", 8.0, 12.0), ("a.png", 12.0, 15.0), ("frame.png", 0.0, None)]
+        groups = dict(layer_windows(layers))
+        self.assertEqual(groups[(3,)], [(0.0, 3.0), (15.0, None)])
+        self.assertEqual(groups[(0, 3)], [(3.0, 8.0)])
+        self.assertEqual(groups[(1, 3)], [(8.0, 12.0)])
+        self.assertEqual(groups[(2, 3)], [(12.0, 15.0)])
+
+    def test_enable_expression_is_half_open(self):
+        self.assertIsNone(enable_expr([(0.0, None)]))
+        self.assertEqual(
+            enable_expr([(0.0, 3.0), (15.0, None)]),
+            "gte(t,0.00)*lt(t,3.00)+gte(t,15.00)",
+        )
+
+    def test_flatten_composites_in_z_order(self):
+        title = self._layer("title.png", (255, 255, 0, 255), (0, 0, 10, 10))
+        frame = self._layer("frame.png", (255, 0, 0, 255), (5, 5, 20, 20), size=(540, 960))
+        flat = flatten_layers([(title, 3.0, 8.0), (frame, 0.0, None)], (1080, 1920), self.test_dir)
+        self.assertEqual(len(flat), 2)
+        merged, windows = flat[1]
+        self.assertEqual(windows, [(3.0, 8.0)])
+        # Cropped to the merged pixels: the title and the scaled frame (with
+        # a pixel of bicubic bleed)
+        self.assertEqual(sprite_box(merged), (0, 0, 42, 42))
+        with Image.open(merged) as im:
+            self.assertEqual(im.getpixel((2, 2)), (255, 255, 0, 255))
+            # The frame, scaled 2x, sits on top of the title
+            self.assertEqual(im.getpixel((12, 12)), (255, 0, 0, 255))
+
+    def test_single_full_size_layer_is_used_as_is(self):
+        title = self._layer("title.png", (255, 255, 0, 255), (0, 0, 10, 10))
+        self.assertEqual(flatten_layers([(title, 3.0, 8.0)], (1080, 1920), self.test_dir), [(title, [(3.0, 8.0)])])
+
+    def test_in_memory_layers_write_nothing(self):
+        title = make_sprite(Image.new("RGBA", (10, 10), (255, 255, 0, 255)), (1080, 1920), (100, 200))
+        frame = self._layer("frame.png", (255, 0, 0, 255), (0, 0, 1080, 4))
+        files = sorted(os.listdir(self.test_dir))
+        flat = flatten_layers([(title, 3.0, 8.0), (frame, 0.0, None)], (1080, 1920), None)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), files)
+        self.assertEqual(flat[0], (frame, [(0.0, 3.0), (8.0, None)]))
+        merged, windows = flat[1]
+        self.assertIsInstance(merged, Sprite)
+        self.assertEqual(merged.image.getpixel((104, 204)), (255, 255, 0, 255))
+
+        graph = FilterGraph()
+        VideoBuilder._add_layers(graph, "v", [(title, 3.0, 8.0)], None, get_profile("final"))
+        args = graph.input_args
+        self.assertIsInstance(args[-1], RawFrames)
+        self.assertIn("rawvideo", args)
+        self.assertIn("overlay=100:200:enable=", graph.render())
+
+    def test_sprites_composite_at_their_offset(self):
+        title = os.path.join(self.test_dir, "title.png")
+        save_sprite(Image.new("RGBA", (10, 10), (255, 255, 0, 255)), title, (1080, 1920), (100, 200))
+        self.assertEqual(flatten_layers([(title, 0.0, None)], (1080, 1920), self.test_dir), [(title, [(0.0, None)])])
+        frame = self._layer("frame.png", (255, 0, 0, 255), (0, 0, 1080, 4))
+        merged, _ = flatten_layers([(title, 0.0, None), (frame, 0.0, None)], (1080, 1920), self.test_dir)[0]
+        self.assertEqual(sprite_box(merged), (0, 0, 1080, 210))
+        with Image.open(merged) as im:
+            self.assertEqual(im.getpixel((105, 205)), (255, 255, 0, 255))
+
+
+class TestSegmentedDigest(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _config(self):
+        images = [os.path.join(self.test_dir, f"img_{i}.jpg") for i in range(3)]
+        return {
+            "intro_image": "missing_intro.mp4",
+            "outro_image": "missing_outro.mp4",
+            "middle_images": images,
+            "voiceover_audio": "voice.mp3",
+            "use_overlay": False,
+            "segment_render": "parallel",
+            "segments": [
+                {"images": images[:2], "title": "First", "script": "One. Two.", "voice_duration": 5.0},
+                {"images": images[2:], "title": "Second", "script": "Three.", "voice_duration": 7.0},
+            ],
+        }
+
+    def _build(self, voice_duration, fail=None):
+        builder = VideoBuilder(clip_cache=ClipCache(self.test_dir, max_mb=0), mezzanine_dir=None)
+        cmds = []
+
+        def fake_run(cmd, stage, *args, **kwargs):
+            if fail and stage.startswith("segment_"):
+                raise fail
+            cmds.append(cmd)
+            return RenderStats(stage)
+
+        with patch("reel_generator.video_builder.run_ffmpeg", side_effect=fake_run):
+            built = builder.build_video(self._config(), voice_duration, "out.mp4", self.test_dir)
+        return built, cmds
+
+    def test_segments_render_separately_and_stitch_on_voice_boundaries(self):
+        built, cmds = self._build(12.0)
+        self.assertTrue(built)
+
+        *segments, stitch = cmds
+        # Each segment spans its voiceover plus the transition in (and, last, out)
+        self.assertEqual([c[c.index("-frames:v") + 1] for c in segments], ["180", "270"])
+        self.assertIn("-qp", segments[0])
+        with open(stitch[stitch.index("-filter_complex_script") + 1]) as f:
+            graph = f.read()
+        offsets = [float(x) for x in re.findall(r"offset=([\d.]+)", graph)]
+        # intro -> segment 0 at 2s, segment 0 -> 1 one second before its
+        # voiceover starts (3 + 5), outro exactly when the voiceover ends
+        self.assertEqual(offsets, [2.0, 7.0, 15.0])
+
+    def test_segments_off_the_voiceover_render_as_one_graph(self):
+        built, cmds = self._build(13.0)
+        self.assertTrue(built)
+        self.assertEqual(len(cmds), 1)
+        with open(cmds[0][cmds[0].index("-filter_complex_script") + 1]) as f:
+            offsets = [float(x) for x in re.findall(r"offset=([\d.]+)", f.read())]
+        self.assertEqual(offsets[-1], 16.0)
+
+    def test_segment_io_error_fails_the_build(self):
+        built, cmds = self._build(12.0, fail=OSError("No space left on device"))
+        self.assertFalse(built)
+        self.assertEqual(cmds, [])
+
+
+class TestAudioSwap(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.builder = VideoBuilder(
+            clip_cache=ClipCache(self.test_dir, max_mb=0),
+            mezzanine_dir=os.path.join(self.test_dir, "mezzanine"),
+        )
+        self.output = os.path.join(self.test_dir, "reel.mp4")
+        self.config = {
+            "intro_image": "missing_intro.mp4",
+            "outro_image": "missing_outro.mp4",
+            "middle_images": [],
+            "voiceover_audio": "voice_a.mp3",
+            "use_overlay": False,
+            "audio_swap": True,
+        }
+        self.cmds = []
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _build(self, config, voice_duration):
+        def fake_run(cmd, stage, *args, **kwargs):
+            self.cmds.append((stage, cmd))
+            open(cmd[-1], "w").close()
+            return RenderStats(stage)
+
+        self.cmds = []
+        with patch("reel_generator.video_builder.run_ffmpeg", side_effect=fake_run):
+            self.assertTrue(self.builder.build_video(config, voice_duration, self.output, self.test_dir))
+        return [stage for stage, _ in self.cmds]
+
+    def test_new_voiceover_is_remuxed_onto_kept_video(self):
+        self.assertEqual(self._build(self.config, 10.0), ["build_video", "mezzanine"])
+        # Within a frame of the old anchor: the picture is unchanged
+        stages = self._build({**self.config, "voiceover_audio": "voice_b.mp3"}, 10.01)
+        self.assertEqual(stages, ["audio_swap"])
+        cmd = self.cmds[0][1]
+        self.assertIn("voice_b.mp3", cmd)
+        self.assertEqual(cmd[cmd.index("-c:v") + 1], "copy")
+        self.assertIn("atrim=0:10.01", cmd[cmd.index("-af") + 1])
+
+    def test_shifted_anchor_or_new_picture_renders_in_full(self):
+        self._build(self.config, 10.0)
+        self.assertEqual(self._build(self.config, 11.0), ["build_video", "mezzanine"])
+        self.assertEqual(
+            self._build({**self.config, "title": "Bridge opens"}, 11.0),
+            ["build_video", "mezzanine"],
+        )
+
+    def test_no_silent_copy_without_audio_swap(self):
+        config = {**self.config, "audio_swap": False}
+        self.assertEqual(self._build(config, 10.0), ["build_video"])
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "mezzanine")))
+
+    def test_kept_videos_are_evicted_over_budget(self):
+        stale = os.path.join(self.test_dir, "mezzanine", "old_reel_0000.mp4")
+        os.makedirs(os.path.dirname(stale))
+        with open(stale, "wb") as f:
+            f.write(b"\0" * 2 * 1024 * 1024)
+        os.utime(stale, (time.time() - 60, time.time() - 60))
+        with patch("reel_generator.video_builder.MEZZANINE_MAX_MB", 1):
+            self._build(self.config, 10.0)
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(len(os.listdir(os.path.join(self.test_dir, "mezzanine"))), 2)
+
+
+class TestSmartRender(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.builder = VideoBuilder(
+            clip_cache=ClipCache(self.test_dir, max_mb=0),
+            mezzanine_dir=os.path.join(self.test_dir, "mezzanine"),
+        )
+        self.images = []
+        for i in range(3):
+            path = os.path.join(self.test_dir, f"img_{i}.png")
+            Image.new("RGB", (8, 8), (i * 50, 0, 0)).save(path)
+            self.images.append(path)
+        self.config = {
+            "intro_image": "missing_intro.mp4",
+            "outro_image": "missing_outro.mp4",
+            "middle_images": self.images,
+            "voiceover_audio": "voice.mp3",
+            "use_overlay": False,
+            "smart_render": True,
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _build(self):
+        cmds = {}
+
+        def fake_run(cmd, stage, *args, **kwargs):
+            cmds.setdefault(stage, []).append(cmd)
+            if stage == "smart_render":
+                splits = cmd[cmd.index("-segment_frames") + 1].count(",") + 2 if "-segment_frames" in cmd else 1
+                for k in range(splits):
+                    open(cmd[-1] % k, "w").close()
+            else:
+                open(cmd[-1], "w").close()
+            return RenderStats(stage)
+
+        with patch("reel_generator.video_builder.run_ffmpeg", side_effect=fake_run):
+            self.assertTrue(self.builder.build_video(
+                self.config, 10.0, os.path.join(self.test_dir, "reel.mp4"), self.test_dir
+            ))
+        return {stage: runs[-1] for stage, runs in cmds.items()}
+
+    def _caption(self, i, text):
+        path = os.path.join(self.test_dir, f"caption_{i}.png")
+        img = Image.new("RGBA", (200, 40), (255, 255, 255, 255))
+        ImageDraw.Draw(img).text((4, 4), text, fill=(0, 0, 0, 255))
+        save_sprite(img, path, (1080, 1920), (440, 1440))
+        return path
+
+    def test_only_gops_of_the_changed_image_are_encoded(self):
+        # 16s at 30fps in 2s GOPs
+        first = self._build()["smart_render"]
+        self.assertEqual(first[first.index("-frames:v") + 1], "480")
+        self.assertIn("+cgop", first)
+
+        # Nothing changed: the kept GOPs are only muxed
+        self.assertNotIn("smart_render", self._build())
+
+        # Image 2 is on screen 5.67s-10.33s: frames 170-309, GOPs 2-5
+        Image.new("RGB", (8, 8), (0, 0, 255)).save(self.images[1])
+        cmd = self._build()["smart_render"]
+        self.assertEqual(cmd[cmd.index("-frames:v") + 1], "240")
+        with open(cmd[cmd.index("-filter_complex_script") + 1]) as f:
+            graph = f.read()
+        # Only the images on screen in frames 120-359, image 1 from frame 120
+        self.assertNotIn("missing_intro.mp4", cmd)
+        self.assertNotIn("missing_outro.mp4", cmd)
+        self.assertIn("[v1]trim=start_frame=60,", graph)
+        self.assertIn("setpts=PTS+120/(30*TB)", graph)
+        with open(os.path.join(self.test_dir, "smart_gops.txt")) as f:
+            self.assertEqual(len(f.read().splitlines()), 9)
+
+    def test_script_edit_encodes_only_its_captions_gops(self):
+        script = "One two three. Four five six. Seven eight nine."
+        self.config["script"] = script
+        self.config["caption_images"] = [self._caption(i, text) for i, text in
+                                         enumerate(["One two three.", "Four five six.", "Seven eight nine."])]
+        self._build()
+
+        # One word of the second caption, shown 6.33s-9.67s (frames 190-289):
+        # GOPs 3-4, rendered from the transition into image 2 at frame 170
+        self.config["script"] = script.replace("five", "fifty")
+        self._caption(1, "Four fifty six.")
+        cmd = self._build()["smart_render"]
+        self.assertEqual(cmd[cmd.index("-frames:v") + 1], "120")
+        self.assertEqual(cmd[cmd.index("-segment_frames") + 1], "60")
+        with open(cmd[cmd.index("-filter_complex_script") + 1]) as f:
+            self.assertIn("trim=start_frame=10,setpts=PTS-STARTPTS[v_final]", f.read())
+
+    def test_gop_graph_has_no_unconnected_outputs(self):
+        # FFmpeg aborts on a labelled output nothing reads or maps
+        cmd = self._build()["smart_render"]
+        with open(cmd[cmd.index("-filter_complex_script") + 1]) as f:
+            nodes = [re.match(r"((?:\[[^\]]+\])*)(.*?)((?:\[[^\]]+\])+)$", n.strip())
+                     for n in f.read().split(";")]
+        read = {label for n in nodes for label in re.findall(r"\[([^\]]+)\]", n.group(1))}
+        read |= {a[1:-1] for a in cmd if a.startswith("[")}
+        written = {label for n in nodes for label in re.findall(r"\[([^\]]+)\]", n.group(3))}
+        self.assertEqual(written - read, set())
+        self.assertNotIn("voice.mp3", cmd)
+
+    def test_changed_reel_timing_renders_in_full(self):
+        self._build()
+        self.config["middle_images"] = self.images[:2]
+        cmd = self._build()["smart_render"]
+        self.assertEqual(cmd[cmd.index("-frames:v") + 1], "480")
+
+
+class TestAssBackend(unittest.TestCase):
+    def test_missing_libass_fails_before_rendering(self):
+        builder = VideoBuilder(clip_cache=ClipCache(max_mb=0), mezzanine_dir=None)
+        config = {
+            "intro_image": "missing_intro.mp4",
+            "outro_image": "missing_outro.mp4",
+            "middle_images": [],
+            "voiceover_audio": "voice.mp3",
+            "caption_backend": "ass",
+        }
+        with patch("reel_generator.video_builder.has_libass", return_value=False), \
+                patch("reel_generator.video_builder.run_ffmpeg") as run:
+            with self.assertRaisesRegex(RuntimeError, "libass"):
+                builder.build_video(config, 10.0, "reel.mp4", tempfile.gettempdir())
+        run.assert_not_called()
+
+
+class TestRenditions(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_crop_keeps_centre_at_target_aspect(self):
+        self.assertEqual(crop_to_aspect(1080, 1920, 1080, 1080), (1080, 1080))
+        self.assertEqual(crop_to_aspect(1080, 1920, 1920, 1080), (1080, 608))
+        self.assertEqual(crop_to_aspect(1080, 1920, 540, 960), (1080, 1920))
+
+    def test_renditions_and_poster_share_one_pass(self):
+        builder = VideoBuilder(clip_cache=ClipCache(self.test_dir, max_mb=0), mezzanine_dir=None)
+        config = {
+            "intro_image": "missing_intro.mp4",
+            "outro_image": "missing_outro.mp4",
+            "middle_images": [],
+            "voiceover_audio": "voice.mp3",
+            "use_overlay": False,
+            "outputs": [
+                OutputSpec("square.mp4", 1080, 1080),
+                {"path": "proxy.mp4", "width": 540, "height": 960, "bitrate": "1M"},
+            ],
+            "poster": "poster.jpg",
+        }
+        cmds = []
+
+        def fake_run(cmd, stage, *args, **kwargs):
+            cmds.append(cmd)
+            return RenderStats(stage)
+
+        with patch("reel_generator.video_builder.run_ffmpeg", side_effect=fake_run):
+            self.assertTrue(builder.build_video(config, 10.0, "reel.mp4", self.test_dir))
+
+        (cmd,) = cmds
+        with open(cmd[cmd.index("-filter_complex_script") + 1]) as f:
+            graph = f.read()
+        self.assertIn("[v_final]split=4[v_out0][v_out1][v_out2][v_out3]", graph)
+        self.assertIn("[a_delayed]asplit=3[a_out0][a_out1][a_out2]", graph)
+        self.assertIn("[v_out1]crop=1080:1080,scale=1080:1080,setsar=1[v_out1_sized]", graph)
+        self.assertIn("trim=start_frame=120:end_frame=121", graph)
+        maps = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"]
+        self.assertEqual(maps, ["[v_out0]", "[a_out0]", "[v_out1_sized]", "[a_out1]",
+                                "[v_out2_sized]", "[a_out2]", "[v_poster]"])
+        proxy = cmd[cmd.index("square.mp4") + 1:cmd.index("proxy.mp4")]
+        self.assertEqual(proxy[proxy.index("-b:v") + 1], "1M")
+        self.assertEqual(cmd[-1], "poster.jpg")
+
+
+if __name__ == '__main__':
+    unittest.main()